@@ -1,88 +1,58 @@
 import streamlit as st
-import requests
-from datetime import datetime, timedelta
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from datetime import date, datetime, timedelta
+import math
 import sys
 import os
-import pandas as pd
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config import GOOGLE_CLOUD_API_KEY
+from utils.app_core import (
+    degraded_message, get_place_location, get_place_suggestions, initialize_session_state, prefetch_place_details,
+    restore_plan, save_plan, with_popularity
+)
 from utils.places_helper import get_nearby_places, get_place_details, get_place_photo, THEME_TO_PLACE_TYPE
 from utils.hotels_helper import HotelsHelper
-
-def initialize_session_state():
-    if 'selected_place' not in st.session_state:
-        st.session_state.selected_place = None
-    if 'place_details' not in st.session_state:
-        st.session_state.place_details = None
-    if 'selected_hotel' not in st.session_state:
-        st.session_state.selected_hotel = None
-    if 'travel_dates' not in st.session_state:
-        st.session_state.travel_dates = None
-    if 'distance_matrix' not in st.session_state:
-        st.session_state.distance_matrix = None
-    if 'daily_routes' not in st.session_state:
-        st.session_state.daily_routes = None
-
-def get_place_suggestions(query):
-    """Google Places Autocomplete API를 호출하여 장소 추천을 받아옵니다."""
-    if not query:
-        return []
-    
-    base_url = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
-    params = {
-        "input": query,
-        "types": "(regions)",  # 도시로 제한
-        "language": "ko",     # 한글 결과
-        "key": GOOGLE_CLOUD_API_KEY
-    }
-    
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        suggestions = response.json().get("predictions", [])
-        return [{"description": place["description"], 
-                "place_id": place["place_id"]} 
-                for place in suggestions]
-    except Exception as e:
-        st.error(f"장소 검색 중 오류가 발생했습니다: {str(e)}")
-        return []
-
-def get_place_location(place_id):
-    """선택된 장소의 위치 정보를 가져옵니다."""
-    base_url = "https://maps.googleapis.com/maps/api/place/details/json"
-    params = {
-        "place_id": place_id,
-        "fields": "geometry,formatted_address,name",
-        "language": "ko",
-        "key": GOOGLE_CLOUD_API_KEY
-    }
-    
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        result = response.json().get("result", {})
-        if result and "geometry" in result:
-            return {
-                "name": result.get("name"),
-                "address": result.get("formatted_address"),
-                "location": result["geometry"]["location"]
-            }
-    except Exception as e:
-        st.error(f"장소 정보 조회 중 오류가 발생했습니다: {str(e)}")
-    return None
+from utils.budget_optimizer import optimize_plan
+from utils.geo import distances_from
+from utils.image_store import get_image_store
+from utils.opening_hours import get_opening_index
+from utils.review_pipeline import get_review_pipeline
+from utils.perf_dashboard import render_dashboard
+from utils.place_map import day_routes, render_place_map
+from utils.result_store import HOTEL_SORT_OPTIONS, PLACE_SORT_OPTIONS, ResultStore, location_key
+from utils.resilience import degraded_scope, open_circuits
+from utils.tracing import span
 
 def main():
     st.title("여행 계획 도우미 🌎")
+    initialize_session_state(st.session_state)
+    # 검색 결과는 rerun 사이에 보존 (위젯 조작 시 API 재호출 없음)
+    results = ResultStore(st.session_state)
+    
+    # 공유 링크(?plan=<id>)로 들어오면 저장된 계획을 API 호출 없이 복원
+    plan_id = st.query_params.get("plan")
+    if plan_id and st.session_state.get("restored_plan_id") != plan_id:
+        st.session_state.restored_plan_id = plan_id
+        st.session_state.restored_plan = restore_plan(results, st.session_state, plan_id)
+        if st.session_state.restored_plan is None:
+            st.warning("저장된 여행 계획을 찾을 수 없습니다.")
+        else:
+            # 복원한 예산 일정은 입력값이 바뀌기 전까지 다시 계산하지 않음
+            st.session_state.budget_plan_key = budget_plan_key(
+                st.session_state.restored_plan["destination"], st.session_state.restored_plan
+            )
+    restored = st.session_state.get("restored_plan") or {}
     
     # 1. 여행지 선택
     st.subheader("1. 여행지를 선택해주세요")
     destination_query = st.text_input("여행지 검색", key="destination_search")
     
     if destination_query:
-        suggestions = get_place_suggestions(destination_query)
+        suggestions = results.get_or_fetch(
+            "suggestions", destination_query, lambda: get_place_suggestions(destination_query, on_error=st.error)
+        )
         if suggestions:
             descriptions = [s["description"] for s in suggestions]
             selected_index = st.selectbox(
@@ -94,25 +64,29 @@ def main():
             if selected_index is not None:
                 selected_place = suggestions[selected_index]
                 if st.button("이 장소로 선택"):
-                    place_location = get_place_location(selected_place["place_id"])
+                    place_location = get_place_location(selected_place["place_id"], on_error=st.error)
                     if place_location:
                         st.session_state.selected_place = place_location
                         st.success(f"선택된 여행지: {place_location['name']}")
     
-    if 'selected_place' in st.session_state:
+    if st.session_state.selected_place:
         # 2. 여행 날짜 선택
         st.subheader("2. 여행 날짜를 선택해주세요")
         col1, col2 = st.columns(2)
         with col1:
-            start_date = st.date_input("출발일")
+            start_date = st.date_input(
+                "출발일",
+                value=date.fromisoformat(restored["start_date"]) if restored else datetime.now().date()
+            )
         with col2:
             # 출발일로부터 최대 14일까지만 선택 가능
             max_end_date = start_date + timedelta(days=14)
+            default_end_date = date.fromisoformat(restored["end_date"]) if restored else start_date + timedelta(days=2)
             end_date = st.date_input(
                 "도착일",
                 min_value=start_date,
                 max_value=max_end_date,
-                value=min(start_date + timedelta(days=2), max_end_date)
+                value=min(max(default_end_date, start_date), max_end_date)
             )
 
         # 선택된 기간이 14일을 초과하는 경우 경고 메시지 표시
@@ -121,13 +95,14 @@ def main():
             st.warning("여행 기간은 최대 14일까지만 선택 가능합니다.")
         elif duration > 0:
             st.info(f"선택된 여행 기간: {duration}일")
+        st.session_state.travel_dates = [start_date + timedelta(days=x) for x in range(duration + 1)]
         
         # 3. 예산 입력
         st.subheader("3. 예산을 입력해주세요")
         budget = st.number_input(
             "예산 (KRW)",
             min_value=0,
-            value=1000000,
+            value=restored.get("budget", 1000000),
             step=100000,
             format="%d"
         )
@@ -138,30 +113,36 @@ def main():
         selected_themes = st.multiselect(
             "관심있는 테마를 선택해주세요 (최대 3개)",
             themes,
+            default=[theme for theme in restored.get("themes", []) if theme in themes],
             max_selections=3
         )
         
         # 5. 동행자 정보
         st.subheader("5. 동행자 정보를 입력해주세요")
         col1, col2 = st.columns(2)
+        travel_types = ["혼자", "커플/부부", "가족", "친구", "단체"]
         with col1:
             travel_with = st.selectbox(
                 "여행 유형",
-                ["혼자", "커플/부부", "가족", "친구", "단체"]
+                travel_types,
+                index=travel_types.index(restored.get("travel_with", "혼자"))
             )
         with col2:
             if travel_with != "혼자":
-                num_travelers = st.number_input("동행자 수", min_value=2, max_value=10, value=2)
+                num_travelers = st.number_input("동행자 수", min_value=2, max_value=10,
+                                                value=max(restored.get("num_travelers", 2), 2))
             else:
                 num_travelers = 1
         
         # 6. 호텔 검색
         st.subheader("6. 주변 호텔 검색")
         if st.checkbox("호텔 검색하기"):
-            with st.spinner("호텔을 검색중입니다..."):
-                hotels_helper = HotelsHelper()
-                hotels = hotels_helper.search_hotels(
-                    location=st.session_state.selected_place["location"]
+            center = st.session_state.selected_place["location"]
+            hotels_helper = HotelsHelper()
+            with st.spinner("호텔을 검색중입니다..."), span("ui.hotel_search", kind="action"):
+                hotels = results.get_or_fetch(
+                    "hotels", location_key(center),
+                    lambda: with_popularity(hotels_helper.search_hotels(location=center))
                 )
             
             if hotels:
@@ -170,111 +151,100 @@ def main():
                 # 정렬 옵션
                 sort_option = st.selectbox(
                     "정렬 기준",
-                    ["추천순", "리뷰 많은순", "평점 높은순", "거리순", "가격 낮은순"]
+                    list(HOTEL_SORT_OPTIONS)
                 )
                 
                 # 필터 옵션
-                col1, col2, col3 = st.columns(3)
+                col1, col2, col3, col4 = st.columns(4)
                 with col1:
                     min_rating = st.slider("최소 평점", 3.5, 5.0, 3.5, 0.1)
                 with col2:
                     min_reviews = st.slider("최소 리뷰 수", 0, 1000, 100, 50)
                 with col3:
                     max_price_level = st.slider("최대 가격 수준", 1, 4, 4, 1)
+                with col4:
+                    max_distance_km = st.slider("최대 거리 (km)", 1, 5, 5, 1)
                 
-                # 필터링
-                filtered_hotels = [
-                    h for h in hotels 
-                    if float(h.get('rating', 0)) >= min_rating and 
-                    int(h.get('review_count', 0)) >= min_reviews and
-                    int(h.get('price_level', 0)) <= max_price_level
-                ]
-                
-                # 정렬
-                if sort_option == "리뷰 많은순":
-                    filtered_hotels.sort(key=lambda x: int(x.get('review_count', 0)), reverse=True)
-                elif sort_option == "평점 높은순":
-                    filtered_hotels.sort(key=lambda x: float(x.get('rating', 0)), reverse=True)
-                elif sort_option == "거리순":
-                    filtered_hotels.sort(key=lambda x: float(x.get('distance', 0)))
-                elif sort_option == "가격 낮은순":
-                    filtered_hotels.sort(key=lambda x: int(x.get('price_level', 0)))
-                else:  # 추천순
-                    filtered_hotels.sort(key=lambda x: float(x.get('relevance_score', 0)), reverse=True)
+                # 필터링 및 정렬 (미리 정렬된 인덱스에서 조건에 맞는 결과만 선택)
+                filtered_hotels = results.view("hotels", location_key(center), HOTEL_SORT_OPTIONS).select(
+                    sort_option,
+                    minimums={'rating': min_rating, 'review_count': min_reviews},
+                    maximums={'price_level': max_price_level, 'distance': max_distance_km * 1000}
+                )
                 
                 if not filtered_hotels:
                     st.warning("선택한 필터 조건에 맞는 호텔이 없습니다. 조건을 완화해보세요.")
                 else:
+                    # 표시할 호텔 전체를 지도 하나에 (선택한 호텔로 이동)
+                    render_place_map({"hotel": filtered_hotels[:5]}, center=center, key="hotel_map")
+                    
                     # 호텔 목록 표시
+                    # 표시할 호텔들의 리뷰를 한 번에 분석 (캐시된 결과는 재사용)
+                    review_insights = get_review_pipeline().process_many(
+                        (hotel['place_id'], hotel.get('reviews')) for hotel in filtered_hotels[:5]
+                    )
                     for hotel in filtered_hotels[:5]:
                         with st.expander(f"🏨 {hotel['name']} ({hotel.get('rating', 'N/A')}⭐ • {hotel.get('review_count', 0)}개 리뷰)"):
-                            col_left, col_right = st.columns([2, 1])
+                            # 호텔 사진
+                            if hotel.get('photos'):
+                                photo_ref = hotel['photos'][0].get('photo_reference')
+                                if photo_ref:
+                                    photo_url = results.get_or_fetch(
+                                        "hotel_photo", photo_ref,
+                                        lambda: hotels_helper.get_hotel_photo(photo_ref)
+                                    )
+                                    if photo_url:
+                                        st.image(get_image_store().thumbnail(photo_url) or photo_url, use_container_width=True)
                             
-                            with col_left:
-                                # 호텔 사진
-                                if hotel.get('photos'):
-                                    photo_ref = hotel['photos'][0].get('photo_reference')
-                                    if photo_ref:
-                                        photo_url = hotels_helper.get_hotel_photo(photo_ref)
-                                        if photo_url:
-                                            st.image(photo_url, use_container_width=True)
-                                
-                                # 기본 정보
-                                st.write(f"💰 가격 수준: {'💰' * hotel.get('price_level', 0)}")
-                                st.markdown(f"""
-                                📍 **주소**: {hotel.get('address', 'N/A')}  
-                                📞 **전화**: {hotel.get('phone', 'N/A')}  
-                                ⭐ **평점**: {hotel.get('rating', 'N/A')} / 5.0  
-                                👥 **리뷰 수**: {hotel.get('review_count', 0)}개  
-                                📏 **중심지로부터 거리**: {hotel.get('distance', 0)/1000:.1f}km  
-                                """)
-                                
-                                # 영업시간
-                                if hotel.get('opening_hours'):
-                                    st.write("⏰ **영업시간:**")
-                                    for hours in hotel['opening_hours']:
-                                        st.write(hours)
-                                
-                                # 리뷰
-                                if hotel.get('reviews'):
-                                    st.write("💬 **최근 리뷰:**")
-                                    for review in hotel['reviews']:
-                                        st.markdown(f"""
-                                        > ⭐ {review.get('rating', 'N/A')} - {review.get('text', '')}  
-                                        > *{review.get('relative_time_description', '')}*
-                                        ---
-                                        """)
-                                
-                                # 링크
-                                st.write("🔗 **바로가기:**")
-                                cols = st.columns(2)
-                                with cols[0]:
-                                    if hotel.get('website'):
-                                        st.markdown(f"[호텔 웹사이트]({hotel['website']})")
-                                with cols[1]:
-                                    if hotel.get('maps_url'):
-                                        st.markdown(f"[Google Maps]({hotel['maps_url']})")
+                            # 기본 정보
+                            st.write(f"💰 가격 수준: {'💰' * hotel.get('price_level', 0)}")
+                            st.markdown(f"""
+                            📍 **주소**: {hotel.get('address', 'N/A')}  
+                            📞 **전화**: {hotel.get('phone', 'N/A')}  
+                            ⭐ **평점**: {hotel.get('rating', 'N/A')} / 5.0  
+                            👥 **리뷰 수**: {hotel.get('review_count', 0)}개  
+                            📏 **중심지로부터 거리**: {hotel.get('distance', 0)/1000:.1f}km  
+                            """)
+                            
+                            # 영업시간
+                            if hotel.get('opening_hours'):
+                                st.write("⏰ **영업시간:**")
+                                for hours in hotel['opening_hours']:
+                                    st.write(hours)
+                            
+                            # 리뷰
+                            show_review_insight(review_insights.get(hotel['place_id']))
+                            if hotel.get('reviews'):
+                                st.write("💬 **최근 리뷰:**")
+                                for review in hotel['reviews']:
+                                    st.markdown(f"""
+                                    > ⭐ {review.get('rating', 'N/A')} - {review.get('text', '')}  
+                                    > *{review.get('relative_time_description', '')}*
+                                    ---
+                                    """)
                             
-                            with col_right:
-                                # 지도
-                                location = hotel.get('location', None)
-                                if location:
-                                    map_data = pd.DataFrame({
-                                        'lat': [location['lat']],
-                                        'lon': [location['lng']]
-                                    })
-                                    st.map(map_data)
+                            # 링크
+                            st.write("🔗 **바로가기:**")
+                            cols = st.columns(2)
+                            with cols[0]:
+                                if hotel.get('website'):
+                                    st.markdown(f"[호텔 웹사이트]({hotel['website']})")
+                            with cols[1]:
+                                if hotel.get('maps_url'):
+                                    st.markdown(f"[Google Maps]({hotel['maps_url']})")
             else:
                 st.error("호텔을 찾을 수 없습니다. 다시 시도해주세요.")
                 
         # 7. 음식점 검색 섹션 추가
         st.subheader("7. 주변 음식점 검색")
         if st.checkbox("음식점 검색하기"):
-            with st.spinner("주변 음식점을 검색중입니다..."):
+            location = st.session_state.selected_place["location"]
+            food_key = (location_key(location), ("음식/맛집",))
+            with st.spinner("주변 음식점을 검색중입니다..."), span("ui.restaurant_search", kind="action"):
                 # 음식/맛집 테마의 place type들만 사용
-                food_places = get_nearby_places(
-                    st.session_state.selected_place["location"], 
-                    ["음식/맛집"]  # THEME_TO_PLACE_TYPE에서 음식/맛집 테마만 선택
+                food_places = results.get_or_fetch(
+                    "places", food_key,
+                    lambda: with_popularity(get_nearby_places(location, ["음식/맛집"]))  # THEME_TO_PLACE_TYPE에서 음식/맛집 테마만 선택
                 )
                 
                 if food_places:
@@ -283,47 +253,57 @@ def main():
                     # 정렬 옵션
                     sort_option = st.selectbox(
                         "정렬 기준",
-                        ["추천순", "리뷰 많은순", "평점 높은순"],
+                        list(PLACE_SORT_OPTIONS),
                         key="food_sort"
                     )
                     
                     # 필터 옵션
-                    col1, col2 = st.columns(2)
+                    col1, col2, col3 = st.columns(3)
                     with col1:
                         min_rating = st.slider("최소 평점", 3.5, 5.0, 3.5, 0.1, key="food_rating")
                     with col2:
                         min_reviews = st.slider("최소 리뷰 수", 0, 1000, 50, 50, key="food_reviews")
+                    with col3:
+                        max_distance_km = st.slider("최대 거리 (km)", 1, 50, 50, 1, key="food_distance")
                     
-                    # 필터링
-                    filtered_places = [
-                        p for p in food_places 
-                        if float(p.get('rating', 0)) >= min_rating and 
-                        int(p.get('user_ratings_total', 0)) >= min_reviews
-                    ]
+                    only_open = st.checkbox("여행 기간에 영업하는 곳만 보기", key="food_open")
                     
-                    # 정렬
-                    if sort_option == "리뷰 많은순":
-                        filtered_places.sort(key=lambda x: int(x.get('user_ratings_total', 0)), reverse=True)
-                    elif sort_option == "평점 높은순":
-                        filtered_places.sort(key=lambda x: float(x.get('rating', 0)), reverse=True)
+                    # 필터링 및 정렬 (상위 30개만 표시)
+                    filtered_places = results.view("places", food_key, PLACE_SORT_OPTIONS).select(
+                        sort_option,
+                        minimums={'rating': min_rating, 'user_ratings_total': min_reviews},
+                        maximums={'distance': max_distance_km * 1000},
+                        limit=30
+                    )
+                    if only_open:
+                        prefetch_place_details(results, filtered_places)
+                        filtered_places = get_opening_index().filter_open(filtered_places, st.session_state.travel_dates)
                     
                     if not filtered_places:
                         st.warning("선택한 필터 조건에 맞는 음식점이 없습니다. 조건을 완화해보세요.")
                     else:
+                        render_place_map({"restaurant": filtered_places}, center=location, key="food_map")
+                        
                         # 음식점 목록 표시
-                        for place in filtered_places[:30]:  # 상위 30개만 표시
+                        for place in filtered_places:
                             with st.expander(f"🍽️ {place['name']} ({place.get('rating', 'N/A')}⭐)"):
                                 col1, col2 = st.columns([2, 1])
                                 
                                 with col1:
                                     # 음식점 사진
                                     if "photo_reference" in place:
-                                        photo_url = get_place_photo(place["photo_reference"])
+                                        photo_url = results.get_or_fetch(
+                                            "place_photo", place["photo_reference"],
+                                            lambda: get_place_photo(place["photo_reference"])
+                                        )
                                         if photo_url:
-                                            st.image(photo_url, width=300)
+                                            st.image(get_image_store().thumbnail(photo_url) or photo_url, width=300)
                                     
                                     # 상세 정보 가져오기
-                                    details = get_place_details(place['place_id'])
+                                    details = results.get_or_fetch(
+                                        "place_details", place['place_id'],
+                                        lambda: get_place_details(place['place_id'])
+                                    )
                                     if details:
                                         st.write("---")
                                         st.write(f"📍 주소: {details['address']}")
@@ -340,6 +320,9 @@ def main():
                                             st.write(f"💰 가격 수준: {'💰' * price_level}")
                                         
                                         # 리뷰
+                                        show_review_insight(get_review_pipeline().process(
+                                            place['place_id'], details.get('all_reviews')
+                                        ))
                                         if details['reviews']:
                                             st.write("💬 추천 리뷰:")
                                             for review in details['reviews']:
@@ -352,6 +335,8 @@ def main():
                                 with col2:
                                     st.write(f"⭐ 평점: {place.get('rating', 'N/A')} / 5.0")
                                     st.write(f"👥 리뷰 수: {place.get('user_ratings_total', 0)}개")
+                                    if place.get('distance') is not None:
+                                        st.write(f"📏 중심지로부터: {place['distance']/1000:.1f}km")
                                     if details and details.get('website'):
                                         st.markdown(f"🌐 [웹사이트]({details['website']})")
                 else:
@@ -359,20 +344,28 @@ def main():
         
         # 8. 관광지 검색
         st.subheader("8. 주변 관광지 검색")
+        attraction_open = st.checkbox("여행 기간에 영업하는 곳만 보기", key="attraction_open")
         if st.button("관광지 검색하기", type="primary"):
-            if not selected_themes:
-                st.warning("최소 하나의 여행 테마를 선택해주세요.")
-                return
-                
-            with st.spinner("주변 관광지를 검색중입니다..."):
-                nearby_places = get_nearby_places(
-                    st.session_state.selected_place["location"], 
-                    selected_themes
+            st.session_state.show_places = True
+        
+        if st.session_state.get('show_places') and not selected_themes:
+            # 검색 상태가 유지되므로 아래 섹션까지 멈추지 않도록 경고만 표시
+            st.warning("최소 하나의 여행 테마를 선택해주세요.")
+        elif st.session_state.get('show_places'):
+            with st.spinner("주변 관광지를 검색중입니다..."), span("ui.attraction_search", kind="action"):
+                location = st.session_state.selected_place["location"]
+                nearby_places = results.get_or_fetch(
+                    "places", (location_key(location), tuple(selected_themes)),
+                    lambda: with_popularity(get_nearby_places(location, selected_themes))
                 )
+                if nearby_places and attraction_open:
+                    prefetch_place_details(results, nearby_places)
+                    nearby_places = get_opening_index().filter_open(nearby_places, st.session_state.travel_dates)
                 
                 if nearby_places:
                     place_count = len(nearby_places)
                     st.success(f"✨ {place_count}개의 관광지를 찾았습니다!")
+                    render_place_map({"attraction": nearby_places}, center=location, key="attraction_map")
                     
                     for place in nearby_places:
                         with st.expander(f"🏷️ {place['name']} ({place.get('rating', 'N/A')}⭐)"):
@@ -380,10 +373,16 @@ def main():
                             
                             with col1:
                                 if "photo_reference" in place:
-                                    photo_url = get_place_photo(place["photo_reference"])
+                                    photo_url = results.get_or_fetch(
+                                        "place_photo", place["photo_reference"],
+                                        lambda: get_place_photo(place["photo_reference"])
+                                    )
                                     if photo_url:
-                                        st.image(photo_url, width=300)
-                                details = get_place_details(place['place_id'])
+                                        st.image(get_image_store().thumbnail(photo_url) or photo_url, width=300)
+                                details = results.get_or_fetch(
+                                    "place_details", place['place_id'],
+                                    lambda: get_place_details(place['place_id'])
+                                )
                                 if details:
                                     st.write("---")
                                     st.write(f"📍 주소: {details['address']}")
@@ -391,6 +390,9 @@ def main():
                                         st.write("⏰ 영업시간:")
                                         for hours in details['opening_hours']:
                                             st.write(hours)
+                                    show_review_insight(get_review_pipeline().process(
+                                        place['place_id'], details.get('all_reviews')
+                                    ))
                                     if details['reviews']:
                                         st.write("💬 리뷰:")
                                         for review in details['reviews']:
@@ -402,12 +404,144 @@ def main():
                             with col2:
                                 st.write(f"유형: {place['place_type']}")
                                 st.write(f"평가: {place.get('user_ratings_total', 0)}개")
-                                st.write(f"위도: {place['location']['lat']:.5f}")
-                                st.write(f"경도: {place['location']['lng']:.5f}")
+                                if place.get('distance') is not None:
+                                    st.write(f"📏 중심지로부터: {place['distance']/1000:.1f}km")
                 else:
                     st.warning("검색된 관광지가 없습니다. 다른 테마를 선택해보세요.")
+        
+        # 9. 예산 맞춤 일정 추천
+        st.subheader("9. 예산 맞춤 일정 추천")
+        plan_options = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "budget": int(budget),
+            "themes": selected_themes,
+            "travel_with": travel_with,
+            "num_travelers": int(num_travelers)
+        }
+        use_budget_plan = st.checkbox("예산에 맞춰 호텔과 방문지 고르기", value=bool(restored.get("plan_costs")))
+        if use_budget_plan:
+            use_opening_hours = st.checkbox("영업일에 맞춰 날짜 배정 (장소 상세 정보 조회)")
+            if not selected_themes:
+                st.warning("최소 하나의 여행 테마를 선택해주세요.")
+                return
+            
+            center = st.session_state.selected_place["location"]
+            plan_key = budget_plan_key(st.session_state.selected_place, plan_options, use_opening_hours)
+            plan = st.session_state.get("budget_plan")
+            if plan is None or st.session_state.get("budget_plan_key") != plan_key:
+                with degraded_scope() as degraded:
+                    plan = compute_budget_plan(results, center, plan_options, max(duration, 0), use_opening_hours)
+                st.session_state.budget_plan = plan
+                # 장애 중에 만든 일정은 복구 후 다시 계산
+                st.session_state.budget_plan_key = None if degraded or open_circuits() else plan_key
             
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("예상 총비용", f"{plan['total_cost']:,}원")
+            with col2:
+                st.metric("숙박비", f"{plan['hotel_cost']:,}원")
+            with col3:
+                st.metric("남는 예산", f"{plan['budget'] - plan['total_cost']:,}원")
+            st.caption("비용은 가격 수준(price_level)으로 추정한 값입니다 (2인 1실, 관광지 1인 입장료 기준).")
             
+            if plan['hotel']:
+                st.write(f"🏨 **추천 호텔**: {plan['hotel']['name']} ({plan['hotel'].get('rating', 'N/A')}⭐)")
+            elif duration > 0:
+                st.warning("예산 안에서 묵을 수 있는 호텔을 찾지 못했습니다.")
+            
+            if not plan['places']:
+                st.warning("예산 안에서 방문할 수 있는 장소가 없습니다. 예산이나 테마를 조정해보세요.")
+            hotel_distances = {}
+            if plan['hotel'] and plan['hotel'].get('location') and plan['places']:
+                # 추천 호텔을 기준으로 방문지 거리 표시 (장소 dict는 결과 저장소와 공유되므로 따로 보관)
+                distances = distances_from(plan['hotel']['location'], plan['places']).tolist()
+                hotel_distances = {place['place_id']: distance for place, distance in zip(plan['places'], distances)
+                                   if not math.isnan(distance)}
+            def place_label(place):
+                if place['place_id'] not in hotel_distances:
+                    return place['name']
+                return f"{place['name']} (호텔에서 {hotel_distances[place['place_id']]/1000:.1f}km)"
+            for day, day_places in enumerate(plan['daily_places'], start=1):
+                if day_places:
+                    st.write(f"**{day}일차**: " + " → ".join(place_label(place) for place in day_places))
+            if plan['places']:
+                # 추천 호텔과 방문지, 날짜별 이동 경로를 지도 하나에
+                render_place_map(
+                    {"hotel": [plan['hotel']] if plan['hotel'] else [], "stop": plan['places']},
+                    center=center, routes=day_routes(plan['daily_places'], plan['hotel']), key="plan_map"
+                )
+        
+        # 10. 계획 저장 및 공유
+        st.subheader("10. 여행 계획 저장")
+        if st.button("계획 저장하고 공유 링크 만들기"):
+            with span("ui.save_plan", kind="action"):
+                plan_id = save_plan(results, st.session_state.selected_place, plan_options,
+                                    st.session_state.get("budget_plan") if use_budget_plan else None)
+            # 방금 저장한 계획은 다시 복원하지 않도록 표시
+            st.session_state.restored_plan_id = plan_id
+            st.query_params["plan"] = plan_id
+            st.success(f"저장되었습니다. 이 페이지 주소(?plan={plan_id})로 언제든 계획을 다시 열 수 있습니다.")
+
+def budget_plan_key(place, options, use_opening_hours=False):
+    """예산 일정을 다시 계산해야 하는지 비교하는 입력값 (여행지, 위젯 값, 영업일 반영 여부)"""
+    return (location_key(place["location"]), options["start_date"], options["end_date"], int(options["budget"]),
+            tuple(options["themes"]), int(options["num_travelers"]), use_opening_hours)
+
+def compute_budget_plan(results, center, options, nights, use_opening_hours):
+    """호텔/관광지 후보를 (저장소에 없으면) 검색하고 예산에 맞는 일정을 계산합니다."""
+    hotels_helper = HotelsHelper()
+    themes = options["themes"]
+    with st.spinner("예산에 맞는 일정을 계산중입니다..."), span("ui.budget_plan", kind="action"):
+        hotels = results.get_or_fetch(
+            "hotels", location_key(center),
+            lambda: with_popularity(hotels_helper.search_hotels(location=center))
+        )
+        candidates = results.get_or_fetch(
+            "places", (location_key(center), tuple(themes)),
+            lambda: with_popularity(get_nearby_places(center, themes))
+        )
+        can_visit = None
+        if use_opening_hours and candidates:
+            prefetch_place_details(results, candidates)
+            index = get_opening_index()
+            travel_dates = st.session_state.travel_dates
+            can_visit = lambda place, day: index.can_visit(place['place_id'], travel_dates[day])
+        return optimize_plan(
+            hotels or [], candidates or [], options["budget"],
+            party_size=options["num_travelers"], nights=nights, can_visit=can_visit
+        )
+
+def show_review_insight(insight):
+    """리뷰 분석 결과(키워드, 감성, 요약)를 표시합니다."""
+    if not insight or not insight['review_count']:
+        return
+    sentiment_icon = {"긍정": "😊", "중립": "😐", "부정": "😞"}[insight['sentiment_label']]
+    st.write(f"{sentiment_icon} **리뷰 분위기**: {insight['sentiment_label']} ({insight['sentiment']:+.2f})")
+    if insight['keywords']:
+        st.write("🔑 **키워드**: " + ", ".join(f"#{keyword}" for keyword in insight['keywords']))
+    if insight['summary']:
+        st.caption(f"📝 {insight['summary']}")
+
+def current_session_id():
+    """현재 Streamlit 세션 ID (대시보드의 세션별 집계에 사용)"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else ""
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # 관리자 모드(NAVI_ADMIN=1)에서만 성능 대시보드 페이지 노출
+    page = "여행 계획"
+    if os.environ.get("NAVI_ADMIN"):
+        page = st.sidebar.radio("페이지", ["여행 계획", "성능 대시보드"])
+    
+    if page == "성능 대시보드":
+        render_dashboard()
+    else:
+        # 스크립트 재실행(rerun) 한 번을 하나의 사용자 동작으로 기록
+        degraded_notice = st.empty()
+        with span("ui.rerun", kind="action", session_id=current_session_id()), degraded_scope() as degraded:
+            main()
+        # 외부 API 장애로 실패했거나 오래된 결과를 보여준 경우 (degraded mode)
+        message = degraded_message(degraded | open_circuits())
+        if message:
+            degraded_notice.warning(message)
\ No newline at end of file
@@ -1,91 +1,176 @@
-from googleapiclient.discovery import build
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 import numpy as np
+import argparse
+import hashlib
+import json
+import os
 import config0
+from utils.batch_runner import Checkpoint, load_catalogue, run_batch, shard_items
+from utils.feature_store import get_feature_store
+from utils.tracing import span, traced
+from utils.video_store import VideoStore, format_timestamp, utc_now
+
+STATS_COLUMNS = ['view_count', 'like_count', 'comment_count']
+# 트렌드 점수를 정규화하는 여행지 단위
+TREND_GROUP_KEYS = ('city', 'specific_place', 'category')
+DEFAULT_CATALOGUE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'destinations.json')
+
+def traced_execute(request, endpoint):
+    """googleapiclient 요청 실행을 client span으로 기록합니다."""
+    with span(endpoint, kind="client", endpoint=endpoint, retries=0) as s:
+        response = request.execute()
+        s.set(status=200, payload_bytes=len(json.dumps(response, ensure_ascii=False).encode('utf-8')))
+        return response
 
 class DetailedDestinationAnalyzer:
-    def __init__(self, api_key):
+    def __init__(self, api_key, store=None, stats_max_age=timedelta(hours=24)):
+        # googleapiclient는 무거우므로 분석기를 만들 때 불러옴
+        from googleapiclient.discovery import build
         self.youtube = build('youtube', 'v3', developerKey=api_key)
+        # store가 주어지면 영상 메타데이터/통계를 실행 간에 재사용
+        self.store = store
+        self.stats_max_age = stats_max_age
+        
+    @traced("youtube.analyze_destination")
+    def analyze_destination(self, place_info, max_results=30, raise_errors=False):
+        """
+        특정 여행지 관련 영상 분석
         
-    def analyze_destination(self, place_info, max_results=30):
-        """특정 여행지 관련 영상 분석"""
+        raise_errors=True이면 API 오류를 빈 결과로 바꾸지 않고 그대로 올립니다
+        (배치에서 실패한 여행지를 완료로 기록하지 않고 다음 실행 때 다시 시도하도록).
+        """
         videos = []
         
         # 한달 전 날짜 계산
-        last_month = datetime.now() - timedelta(days=30)
-        last_month_str = last_month.strftime('%Y-%m-%dT%H:%M:%SZ')
+        run_started_at = utc_now()
+        last_month = run_started_at - timedelta(days=30)
         
         # 검색 쿼리 최적화 (구체적인 장소명 + 도시명으로 검색)
         search_query = f"{place_info['specific_place']} {place_info['city']} 여행"
         
+        # 마지막 성공 실행 이후 게시된 영상만 새로 검색
+        published_after = last_month
+        if self.store is not None:
+            last_run = self.store.get_last_run(search_query)
+            if last_run and last_run > published_after:
+                published_after = last_run
+        
         try:
             request = self.youtube.search().list(
                 part='snippet',
                 q=search_query,
                 type='video',
                 order='relevance',
-                publishedAfter=last_month_str,
+                publishedAfter=format_timestamp(published_after),
                 maxResults=max_results,
                 regionCode='KR',
                 relevanceLanguage='ko'
             )
-            response = request.execute()
+            response = traced_execute(request, 'youtube.search.list')
+            
+            search_rows = [
+                {
+                    'video_id': item['id']['videoId'],
+                    'title': item['snippet']['title'],
+                    'description': item['snippet']['description'],
+                    'published_at': item['snippet']['publishedAt'],
+                    'channel_title': item['snippet']['channelTitle']
+                }
+                for item in response.get('items', [])
+            ]
             
-            # 비디오 상세 정보 수집
-            video_ids = [item['id']['videoId'] for item in response['items']]
-            video_stats = self.get_videos_stats(video_ids)
+            if self.store is not None:
+                # 새 영상 메타데이터는 한 번만 저장하고, 최근 30일 영상 전체를 분석 대상으로 사용
+                self.store.add_videos(search_query, search_rows)
+                search_rows = self.store.get_videos(search_query, published_after=last_month)
             
-            for item, stats in zip(response['items'], video_stats):
-                # 제목이나 설명에 장소명이 포함된 영상만 필터링
-                if (place_info['specific_place'] in item['snippet']['title'].lower() or
-                    place_info['specific_place'] in item['snippet']['description'].lower()):
-                    video_data = {
-                        'specific_place': place_info['specific_place'],
-                        'city': place_info['city'],
-                        'category': place_info['category'],
-                        'title': item['snippet']['title'],
-                        'description': item['snippet']['description'],
-                        'published_at': item['snippet']['publishedAt'],
-                        'view_count': stats['view_count'],
-                        'like_count': stats['like_count'],
-                        'comment_count': stats.get('comment_count', 0),
-                        'channel_title': item['snippet']['channelTitle']
-                    }
-                    videos.append(video_data)
+            if not search_rows:
+                if self.store is not None:
+                    self.store.set_last_run(search_query, run_started_at)
+                return pd.DataFrame(videos)
+            
+            # 검색 결과를 videoId 기준 DataFrame으로 변환
+            search_df = pd.DataFrame(search_rows).drop_duplicates('video_id')
+            video_ids = search_df['video_id'].tolist()
+            
+            # 비디오 통계 수집 (store 사용 시 오래된 통계만 갱신)
+            if self.store is not None:
+                stale_ids = self.store.stale_video_ids(video_ids, self.stats_max_age)
+                if stale_ids:
+                    self.store.update_stats(self.get_videos_stats(stale_ids, raise_errors))
+                video_stats = self.store.get_stats(video_ids)
+                self.store.set_last_run(search_query, run_started_at)
+            else:
+                video_stats = self.get_videos_stats(video_ids, raise_errors)
+            
+            # 비디오 통계를 videoId로 조인 (통계가 없는 영상도 유지)
+            stats_df = pd.DataFrame.from_dict(
+                video_stats, orient='index', columns=STATS_COLUMNS
+            ).rename_axis('video_id').reset_index()
+            merged = search_df.merge(stats_df, on='video_id', how='left', validate='one_to_one')
+            merged[STATS_COLUMNS] = merged[STATS_COLUMNS].fillna(0).astype('int64')
+            
+            # 제목이나 설명에 장소명이 포함된 영상만 필터링
+            place = place_info['specific_place']
+            mask = (merged['title'].str.lower().str.contains(place, regex=False) |
+                    merged['description'].str.lower().str.contains(place, regex=False))
+            merged = merged[mask].copy()
+            
+            merged.insert(1, 'specific_place', place)
+            merged.insert(2, 'city', place_info['city'])
+            merged.insert(3, 'category', place_info['category'])
+            return merged.reset_index(drop=True)
                     
         except Exception as e:
             print(f"Error analyzing {place_info['specific_place']}: {str(e)}")
+            if raise_errors:
+                raise
             
         return pd.DataFrame(videos)
     
-    def get_videos_stats(self, video_ids):
-        """비디오 통계 수집"""
-        stats = []
-        try:
-            request = self.youtube.videos().list(
-                part='statistics',
-                id=','.join(video_ids)
-            )
-            response = request.execute()
-            
-            for item in response['items']:
-                video_stats = {
-                    'view_count': int(item['statistics'].get('viewCount', 0)),
-                    'like_count': int(item['statistics'].get('likeCount', 0)),
-                    'comment_count': int(item['statistics'].get('commentCount', 0))
-                }
-                stats.append(video_stats)
-        except Exception as e:
-            print(f"Error getting video stats: {str(e)}")
+    @traced("youtube.get_videos_stats")
+    def get_videos_stats(self, video_ids, raise_errors=False):
+        """비디오 통계 수집 (videoId → 통계 dict). raise_errors면 조회 실패 시 예외를 그대로 올림"""
+        stats = {}
+        # videos.list는 한 번에 최대 50개 ID까지 조회 가능
+        for i in range(0, len(video_ids), 50):
+            chunk = video_ids[i:i + 50]
+            try:
+                request = self.youtube.videos().list(
+                    part='statistics',
+                    id=','.join(chunk)
+                )
+                response = traced_execute(request, 'youtube.videos.list')
+                
+                for item in response.get('items', []):
+                    stats[item['id']] = {
+                        'view_count': int(item['statistics'].get('viewCount', 0)),
+                        'like_count': int(item['statistics'].get('likeCount', 0)),
+                        'comment_count': int(item['statistics'].get('commentCount', 0))
+                    }
+            except Exception as e:
+                print(f"Error getting video stats: {str(e)}")
+                if raise_errors:
+                    raise
             
         return stats
     
-    def calculate_trend_score(self, df):
-        """트렌드 점수 계산"""
+    @staticmethod
+    def calculate_trend_score(df, normalize='group', group_keys=TREND_GROUP_KEYS):
+        """
+        트렌드 점수 계산
+        
+        normalize='group'이면 여행지(group_keys)별로, 'global'이면 전체 영상 기준으로
+        조회수/참여도 점수를 정규화합니다. 여러 여행지를 합친 DataFrame에 한 번만 호출합니다.
+        """
         if df.empty:
             return df
+        if normalize not in ('group', 'global'):
+            raise ValueError(f"Unknown normalize mode: {normalize}")
             
+        df = df.copy()
+        
         # 시간 처리
         df['published_at'] = pd.to_datetime(df['published_at']).dt.tz_localize(None)
         now = pd.Timestamp.now().tz_localize(None)
@@ -94,13 +179,26 @@ class DetailedDestinationAnalyzer:
         df['days_ago'] = (now - df['published_at']).dt.total_seconds() / (24 * 60 * 60)
         df['recency_score'] = 1 - (df['days_ago'] / 30).clip(0, 1)
         
+        # 참여도 (좋아요 + 댓글)
+        df['engagement_rate'] = (df['like_count'] + df['comment_count']) / df['view_count'].clip(1)
+        
+        # 정규화 기준값 (그룹별 또는 전체)
+        if normalize == 'group':
+            grouped = df.groupby(list(group_keys), sort=False)
+            view_max = grouped['view_count'].transform('max')
+            engagement_min = grouped['engagement_rate'].transform('min')
+            engagement_max = grouped['engagement_rate'].transform('max')
+        else:
+            view_max = df['view_count'].max()
+            engagement_min = df['engagement_rate'].min()
+            engagement_max = df['engagement_rate'].max()
+        
         # 조회수 점수
-        df['view_score'] = np.log1p(df['view_count']) / np.log1p(df['view_count'].max())
+        df['view_score'] = np.log1p(df['view_count']) / np.log1p(view_max)
         
-        # 참여도 점수 (좋아요 + 댓글)
-        df['engagement_rate'] = (df['like_count'] + df['comment_count']) / df['view_count'].clip(1)
-        df['engagement_score'] = (df['engagement_rate'] - df['engagement_rate'].min()) / \
-                               (df['engagement_rate'].max() - df['engagement_rate'].min()).clip(1e-10)
+        # 참여도 점수
+        df['engagement_score'] = (df['engagement_rate'] - engagement_min) / \
+                               np.clip(engagement_max - engagement_min, 1e-10, None)
         
         # 종합 점수 계산 (가중치 조정 가능)
         df['trend_score'] = (
@@ -111,52 +209,91 @@ class DetailedDestinationAnalyzer:
         
         return df
 
-def main():
+# 배치 실행 시 워커 프로세스마다 하나씩 생성되는 분석기
+_worker_analyzer = None
+
+def destination_key(place_info):
+    return f"{place_info['city']}/{place_info['specific_place']}"
+
+def _result_path(checkpoint_dir, place_info):
+    digest = hashlib.sha1(destination_key(place_info).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(checkpoint_dir, 'results', f"{digest}.csv")
+
+def _init_worker(api_key, db_path, stats_max_age_hours):
+    global _worker_analyzer
+    store = VideoStore(db_path)
+    _worker_analyzer = DetailedDestinationAnalyzer(
+        api_key, store=store, stats_max_age=timedelta(hours=stats_max_age_hours)
+    )
+
+def _analyze_in_worker(place_info):
+    print(f"\n{place_info['city']} - {place_info['specific_place']} 분석 중...")
+    with span("batch.analyze_destination", kind="action", destination=destination_key(place_info)):
+        return _worker_analyzer.analyze_destination(place_info, raise_errors=True)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="YouTube 기반 여행지 트렌드 분석 (배치)")
+    parser.add_argument('--catalogue', default=DEFAULT_CATALOGUE,
+                        help="여행지 목록 파일 (CSV/JSON/JSONL, specific_place/city/category 컬럼)")
+    parser.add_argument('--shard-index', type=int, default=0, help="이 머신이 처리할 샤드 번호")
+    parser.add_argument('--shard-count', type=int, default=1, help="전체 샤드 수")
+    parser.add_argument('--workers', type=int, default=1, help="워커 프로세스 수")
+    parser.add_argument('--checkpoint-dir', default='trend_checkpoint',
+                        help="진행 상황과 여행지별 결과를 저장할 디렉토리")
+    parser.add_argument('--normalize', choices=['group', 'global'], default='group',
+                        help="트렌드 점수 정규화 단위 (여행지별/전체)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     API_KEY = config0.YOUTUBE_DATA
-    analyzer = DetailedDestinationAnalyzer(API_KEY)
-    
-    # 구체적인 여행지 정보 정의
-    destinations = [
-        # 강릉
-        {'specific_place': '정동진시간박물관', 'city': '강릉', 'category': '문화/박물관'},
-        {'specific_place': '안목커피거리', 'city': '강릉', 'category': '카페거리'},
-        {'specific_place': '주문진수산시장', 'city': '강릉', 'category': '전통시장'},
-        {'specific_place': '경포대해변', 'city': '강릉', 'category': '해변'},
-        
-        # 부산
-        {'specific_place': '광안리해수욕장', 'city': '부산', 'category': '해변'},
-        {'specific_place': '송정해수욕장', 'city': '부산', 'category': '해변'},
-        {'specific_place': '감천문화마을', 'city': '부산', 'category': '문화마을'},
-        {'specific_place': '영도대교', 'city': '부산', 'category': '랜드마크'},
-        {'specific_place': '해운대블루라인파크', 'city': '부산', 'category': '액티비티'},
-        
-        # 제주
-        {'specific_place': '비자림', 'city': '제주', 'category': '자연'},
-        {'specific_place': '함덕해수욕장', 'city': '제주', 'category': '해변'},
-        {'specific_place': '카페더콘테나', 'city': '제주', 'category': '카페'},
-        {'specific_place': '천지연폭포', 'city': '제주', 'category': '자연'},
-        {'specific_place': '우도', 'city': '제주', 'category': '섬'},
-        
-        # 전주
-        {'specific_place': '경기전', 'city': '전주', 'category': '문화유적'},
-        {'specific_place': '한옥레일바이크', 'city': '전주', 'category': '액티비티'},
-        {'specific_place': '동문예술거리', 'city': '전주', 'category': '문화거리'}
-    ]
-    
-    all_videos = pd.DataFrame()
-    
-    # 각 여행지별 분석
-    for place_info in destinations:
-        print(f"\n{place_info['city']} - {place_info['specific_place']} 분석 중...")
-        videos_df = analyzer.analyze_destination(place_info)
+    # 영상 메타데이터/통계 캐시 (통계는 STATS_MAX_AGE_HOURS 이후에만 갱신)
+    db_path = getattr(config0, 'YOUTUBE_CACHE_DB', 'youtube_videos.db')
+    stats_max_age_hours = getattr(config0, 'YOUTUBE_STATS_MAX_AGE_HOURS', 24)
+    
+    # 여행지 목록 로드 및 샤딩
+    destinations = load_catalogue(args.catalogue)
+    shard = shard_items(destinations, args.shard_index, args.shard_count, destination_key)
+    print(f"여행지 {len(destinations)}개 중 샤드 {args.shard_index}/{args.shard_count}: {len(shard)}개")
+    
+    checkpoint = Checkpoint(args.checkpoint_dir, name=f"progress-{args.shard_index}-of-{args.shard_count}")
+    os.makedirs(os.path.join(args.checkpoint_dir, 'results'), exist_ok=True)
+    
+    def save_result(place_info, videos_df):
+        # 여행지별 결과를 먼저 저장한 뒤 체크포인트에 완료로 기록
         if not videos_df.empty:
-            videos_df = analyzer.calculate_trend_score(videos_df)
-            all_videos = pd.concat([all_videos, videos_df])
+            path = _result_path(args.checkpoint_dir, place_info)
+            videos_df.to_csv(path + '.tmp', index=False, encoding='utf-8-sig')
+            os.replace(path + '.tmp', path)
+        return {'videos': len(videos_df)}
+    
+    run_batch(
+        shard,
+        _analyze_in_worker,
+        destination_key,
+        checkpoint=checkpoint,
+        workers=args.workers,
+        initializer=_init_worker,
+        initargs=(API_KEY, db_path, stats_max_age_hours),
+        on_result=save_result
+    )
+    
+    # 샤드 내 완료된 여행지 결과를 모아 한 번에 합침
+    frames = []
+    for place_info in shard:
+        path = _result_path(args.checkpoint_dir, place_info)
+        if checkpoint.is_done(destination_key(place_info)) and os.path.exists(path):
+            frames.append(pd.read_csv(path, encoding='utf-8-sig'))
     
-    if all_videos.empty:
+    if not frames:
         print("분석할 데이터가 없습니다.")
         return
-        
+    
+    # 전체 영상에 대해 한 번에 트렌드 점수 계산
+    all_videos = DetailedDestinationAnalyzer.calculate_trend_score(
+        pd.concat(frames, ignore_index=True), normalize=args.normalize
+    )
+    
     # 장소별 종합 분석
     place_trends = all_videos.groupby(['city', 'specific_place', 'category']).agg({
         'trend_score': 'mean',
@@ -193,8 +330,16 @@ def main():
     print(city_category_trends.round(4))
     
     # 결과 저장
-    place_trends.to_csv('trending_specific_places.csv', encoding='utf-8-sig')
-    print("\n분석 결과가 'trending_specific_places.csv'에 저장되었습니다.")
+    output_path = 'trending_specific_places.csv' if args.shard_count == 1 else \
+        f'trending_specific_places-{args.shard_index}-of-{args.shard_count}.csv'
+    place_trends.to_csv(output_path, encoding='utf-8-sig')
+    print(f"\n분석 결과가 '{output_path}'에 저장되었습니다.")
+    
+    # 장소별 YouTube 신호(조회수, 참여율, 최근 게시일)를 feature store에 반영
+    feature_store = get_feature_store()
+    feature_store.ingest_videos(all_videos.to_dict('records'))
+    feature_store.refresh_scores()
+    print(f"인기 점수 저장소 '{feature_store.db_path}'를 갱신했습니다.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,82 +1,27 @@
 import streamlit as st
-import requests
 from datetime import datetime, timedelta
 import sys
 import os
-import pandas as pd
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config import GOOGLE_CLOUD_API_KEY
+from utils.app_core import (
+    degraded_message, get_place_location, get_place_suggestions, initialize_session_state, with_popularity
+)
 from utils.places_helper import get_nearby_places, get_place_details, get_place_photo, THEME_TO_PLACE_TYPE
 from utils.hotels_helper import HotelsHelper
-
-def initialize_session_state():
-    if 'selected_place' not in st.session_state:
-        st.session_state.selected_place = None
-    if 'place_details' not in st.session_state:
-        st.session_state.place_details = None
-    if 'selected_hotel' not in st.session_state:
-        st.session_state.selected_hotel = None
-    if 'travel_dates' not in st.session_state:
-        st.session_state.travel_dates = None
-    if 'distance_matrix' not in st.session_state:
-        st.session_state.distance_matrix = None
-    if 'daily_routes' not in st.session_state:
-        st.session_state.daily_routes = None
-
-def get_place_suggestions(query):
-    """Google Places Autocomplete API를 호출하여 장소 추천을 받아옵니다."""
-    if not query:
-        return []
-    
-    base_url = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
-    params = {
-        "input": query,
-        "types": "(regions)",  # 도시로 제한
-        "language": "ko",     # 한글 결과
-        "key": GOOGLE_CLOUD_API_KEY
-    }
-    
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        suggestions = response.json().get("predictions", [])
-        return [{"description": place["description"], 
-                "place_id": place["place_id"]} 
-                for place in suggestions]
-    except Exception as e:
-        st.error(f"장소 검색 중 오류가 발생했습니다: {str(e)}")
-        return []
-
-def get_place_location(place_id):
-    """선택된 장소의 위치 정보를 가져옵니다."""
-    base_url = "https://maps.googleapis.com/maps/api/place/details/json"
-    params = {
-        "place_id": place_id,
-        "fields": "geometry,formatted_address,name",
-        "language": "ko",
-        "key": GOOGLE_CLOUD_API_KEY
-    }
-    
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        result = response.json().get("result", {})
-        if result and "geometry" in result:
-            return {
-                "name": result.get("name"),
-                "address": result.get("formatted_address"),
-                "location": result["geometry"]["location"]
-            }
-    except Exception as e:
-        st.error(f"장소 정보 조회 중 오류가 발생했습니다: {str(e)}")
-    return None
+from utils.image_store import get_image_store
+from utils.place_map import render_place_map
+from utils.result_store import HOTEL_SORT_OPTIONS, ResultStore, location_key
+from utils.resilience import degraded_scope, open_circuits
+from utils.tracing import span
 
 def main():
     st.title("여행 계획 도우미 🌎")
-    initialize_session_state()
+    initialize_session_state(st.session_state)
+    # 검색 결과는 rerun 사이에 보존 (위젯 조작 시 API 재호출 없음)
+    results = ResultStore(st.session_state)
     
     # HotelsHelper 인스턴스 생성
     hotels_helper = HotelsHelper()
@@ -86,7 +31,9 @@ def main():
     destination_query = st.text_input("여행지 검색", key="destination_search")
     
     if destination_query:
-        suggestions = get_place_suggestions(destination_query)
+        suggestions = results.get_or_fetch(
+            "suggestions", destination_query, lambda: get_place_suggestions(destination_query, on_error=st.error)
+        )
         if suggestions:
             descriptions = [s["description"] for s in suggestions]
             selected_index = st.selectbox(
@@ -99,7 +46,7 @@ def main():
             if selected_index is not None:
                 selected_place = suggestions[selected_index]
                 if st.button("이 장소로 선택"):
-                    place_location = get_place_location(selected_place["place_id"])
+                    place_location = get_place_location(selected_place["place_id"], on_error=st.error)
                     if place_location:
                         st.session_state.selected_place = place_location
                         st.success(f"선택된 여행지: {place_location['name']}")
@@ -167,10 +114,16 @@ def main():
         # 6. 호텔 검색
         st.subheader("6. 주변 호텔 검색")
                 
+        # 버튼은 한 번만 눌러도 결과가 유지되도록 세션 상태에 기록
         if st.button("호텔 검색하기", type='primary'):
-            with st.spinner("호텔을 검색중입니다..."):
-                hotels = hotels_helper.search_hotels(
-                    location=st.session_state.selected_place["location"]
+            st.session_state.show_hotels = True
+        
+        if st.session_state.get('show_hotels'):
+            center = st.session_state.selected_place["location"]
+            with st.spinner("호텔을 검색중입니다..."), span("ui.hotel_search", kind="action"):
+                hotels = results.get_or_fetch(
+                    "hotels", location_key(center),
+                    lambda: with_popularity(hotels_helper.search_hotels(location=center))
                 )
                 
                 if hotels:
@@ -179,7 +132,7 @@ def main():
                     # 정렬 옵션
                     sort_option = st.selectbox(
                         "정렬 기준",
-                        ["추천순", "리뷰 많은순", "평점 높은순", "거리순", "가격 낮은순"]
+                        list(HOTEL_SORT_OPTIONS)
                     )
                     
                     # 필터 옵션
@@ -191,44 +144,34 @@ def main():
                     with col3:
                         max_price_level = st.slider("최대 가격 수준", 1, 4, 4, 1)
                     
-                    # 정렬 및 필터링
-                    filtered_hotels = [
-                        h for h in hotels 
-                        if float(h.get('rating', 0)) >= min_rating and 
-                        int(h.get('review_count', 0)) >= min_reviews and
-                        int(h.get('price_level', 0)) <= max_price_level
-                    ]
-                    
-                    if sort_option == "리뷰 많은순":
-                        filtered_hotels.sort(key=lambda x: int(x.get('review_count', 0)), reverse=True)
-                    elif sort_option == "평점 높은순":
-                        filtered_hotels.sort(key=lambda x: float(x.get('rating', 0)), reverse=True)
-                    elif sort_option == "거리순":
-                        filtered_hotels.sort(key=lambda x: float(x.get('distance', 0)))
-                    elif sort_option == "가격 낮은순":
-                        filtered_hotels.sort(key=lambda x: int(x.get('price_level', 0)))
-                    else:  # 추천순
-                        filtered_hotels.sort(key=lambda x: float(x.get('relevance_score', 0)), reverse=True)
+                    # 정렬 및 필터링 (미리 정렬된 인덱스에서 조건에 맞는 결과만 선택)
+                    filtered_hotels = results.view("hotels", location_key(center), HOTEL_SORT_OPTIONS).select(
+                        sort_option,
+                        minimums={'rating': min_rating, 'review_count': min_reviews},
+                        maximums={'price_level': max_price_level}
+                    )
                     
                     if not filtered_hotels:
                         st.warning("선택한 필터 조건에 맞는 호텔이 없습니다. 조건을 완화해보세요.")
-                        return
-                    
-                    # 호텔 표시
-                    for hotel in filtered_hotels[:5]:
-                        with st.expander(
-                            f"🏨 {hotel['name']} ({hotel.get('rating', 'N/A')}⭐ • {hotel.get('review_count', 0)}개 리뷰)"
-                        ):
-                            cols = st.columns([2, 1])
-                            
-                            with cols[0]:
+                    else:
+                        # 표시할 호텔 전체를 지도 하나에 (선택한 호텔로 이동)
+                        render_place_map({"hotel": filtered_hotels[:5]}, center=center, key="hotel_map")
+                        
+                        # 호텔 표시
+                        for hotel in filtered_hotels[:5]:
+                            with st.expander(
+                                f"🏨 {hotel['name']} ({hotel.get('rating', 'N/A')}⭐ • {hotel.get('review_count', 0)}개 리뷰)"
+                            ):
                                 # 호텔 사진 표시
                                 if hotel.get('photos'):
                                     photo_ref = hotel['photos'][0].get('photo_reference')
                                     if photo_ref:
-                                        photo_url = hotels_helper.get_hotel_photo(photo_ref)
+                                        photo_url = results.get_or_fetch(
+                                            "hotel_photo", photo_ref,
+                                            lambda: hotels_helper.get_hotel_photo(photo_ref)
+                                        )
                                         if photo_url:
-                                            st.image(photo_url, width=400)
+                                            st.image(get_image_store().thumbnail(photo_url) or photo_url, width=400)
                                 
                                 # 가격 수준 표시
                                 price_level = hotel.get('price_level', 0)
@@ -264,16 +207,6 @@ def main():
                                     st.markdown(f"[호텔 웹사이트]({hotel['website']})")
                                 if hotel.get('maps_url'):
                                     st.markdown(f"[Google Maps]({hotel['maps_url']})")
-                            
-                            with cols[1]:
-                                # 지도 표시
-                                location = hotel.get('location', None)
-                                if location:
-                                    map_data = pd.DataFrame({
-                                        'lat': [location['lat']],
-                                        'lon': [location['lng']]
-                                    })
-                                    st.map(map_data)
                 
                 else:
                     st.error("호텔 검색 중 오류가 발생했습니다. 다시 시도해주세요.")
@@ -281,19 +214,24 @@ def main():
         # 7. 관광지 검색
         st.subheader("7. 주변 관광지 검색")
         if st.button("관광지 검색하기", type="primary"):
+            st.session_state.show_places = True
+        
+        if st.session_state.get('show_places'):
             if not selected_themes:
                 st.warning("최소 하나의 여행 테마를 선택해주세요.")
                 return
                 
-            with st.spinner("주변 관광지를 검색중입니다..."):
-                nearby_places = get_nearby_places(
-                    st.session_state.selected_place["location"], 
-                    selected_themes
+            with st.spinner("주변 관광지를 검색중입니다..."), span("ui.attraction_search", kind="action"):
+                location = st.session_state.selected_place["location"]
+                nearby_places = results.get_or_fetch(
+                    "places", (location_key(location), tuple(selected_themes)),
+                    lambda: with_popularity(get_nearby_places(location, selected_themes))
                 )
                 
                 if nearby_places:
                     place_count = len(nearby_places)
                     st.success(f"✨ {place_count}개의 관광지를 찾았습니다!")
+                    render_place_map({"attraction": nearby_places}, center=location, key="attraction_map")
                     
                     for place in nearby_places:
                         with st.expander(f"🏷️ {place['name']} ({place.get('rating', 'N/A')}⭐)"):
@@ -301,10 +239,16 @@ def main():
                             
                             with col1:
                                 if "photo_reference" in place:
-                                    photo_url = get_place_photo(place["photo_reference"])
+                                    photo_url = results.get_or_fetch(
+                                        "place_photo", place["photo_reference"],
+                                        lambda: get_place_photo(place["photo_reference"])
+                                    )
                                     if photo_url:
-                                        st.image(photo_url, width=300)
-                                details = get_place_details(place['place_id'])
+                                        st.image(get_image_store().thumbnail(photo_url) or photo_url, width=300)
+                                details = results.get_or_fetch(
+                                    "place_details", place['place_id'],
+                                    lambda: get_place_details(place['place_id'])
+                                )
                                 if details:
                                     st.write("---")
                                     st.write(f"📍 주소: {details['address']}")
@@ -321,7 +265,10 @@ def main():
                                 st.write(f"가격 수준: {price_text}")
                                 
                                 if st.button("상세 정보 보기", key=f"details_{place['place_id']}"):
-                                    details = get_place_details(place['place_id'])
+                                    details = results.get_or_fetch(
+                                        "place_details", place['place_id'],
+                                        lambda: get_place_details(place['place_id'])
+                                    )
                                     if details:
                                         st.write("---")
                                         st.write(f"📍 주소: {details['address']}")
@@ -337,10 +284,17 @@ def main():
                             with col2:
                                 st.write(f"유형: {place['place_type']}")
                                 st.write(f"평가: {place.get('user_ratings_total', 0)}개")
-                                st.write(f"위도: {place['location']['lat']:.5f}")
-                                st.write(f"경도: {place['location']['lng']:.5f}")
+                                if place.get('distance') is not None:
+                                    st.write(f"📏 중심지로부터: {place['distance']/1000:.1f}km")
                 else:
                     st.warning("검색된 관광지가 없습니다. 다른 테마를 선택해보세요.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # 스크립트 재실행(rerun) 한 번을 하나의 사용자 동작으로 기록
+    degraded_notice = st.empty()
+    with span("ui.rerun", kind="action"), degraded_scope() as degraded:
+        main()
+    # 외부 API 장애로 실패했거나 오래된 결과를 보여준 경우 (degraded mode)
+    message = degraded_message(degraded | open_circuits())
+    if message:
+        degraded_notice.warning(message)
\ No newline at end of file
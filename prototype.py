@@ -1,11 +1,40 @@
+from __future__ import annotations
+
 import os
 import json
-import gradio as gr
-import pandas as pd
 from datetime import datetime, timedelta
-import requests
 from typing import Dict, List, Tuple
 import config0
+from utils.cache import get_cache
+from utils.entity_resolution import get_entity_index, naver_record
+from utils.image_store import get_image_store
+from utils.lazy import lazy_module
+from utils.resilience import StaleCache
+from utils.tracing import span, traced, traced_request
+
+# 트렌드 데이터 처리 시점에 불러옴 (UI 시작 시간 단축)
+pd = lazy_module("pandas")
+
+# 데이터랩 응답은 하루 단위로 갱신되므로 같은 요청은 몇 시간 동안 재사용
+TREND_CACHE_TTL = 6 * 60 * 60
+# 데이터랩 장애 때 대신 사용할 오래된 응답 보관 기간
+TREND_STALE_TTL = 7 * 24 * 60 * 60
+TREND_ENDPOINT = "naver.datalab.search"
+
+def trend_cache_key(body: Dict) -> str:
+    """
+    데이터랩 요청의 캐시 키 (검색어, 필터, 기간).
+    오늘까지의 기간은 날짜 대신 일수로 나타내 날짜가 바뀌어도 같은 키가 되도록 합니다
+    (장애 중에 전날 받은 응답을 오래된 값으로 사용할 수 있도록).
+    """
+    key = {name: value for name, value in body.items() if name not in ("startDate", "endDate")}
+    if body["endDate"] == datetime.now().strftime("%Y-%m-%d"):
+        start = datetime.strptime(body["startDate"], "%Y-%m-%d")
+        end = datetime.strptime(body["endDate"], "%Y-%m-%d")
+        key["recentDays"] = (end - start).days
+    else:
+        key["period"] = [body["startDate"], body["endDate"]]
+    return json.dumps(key, ensure_ascii=False, sort_keys=True)
 
 class TravelTrendAnalyzer:
     def __init__(self):
@@ -20,6 +49,9 @@ class TravelTrendAnalyzer:
             "X-Naver-Client-Id": config0.NAVER_CAFE_CLIENT_ID,
             "X-Naver-Client-Secret": config0.NAVER_CAFE_CLIENT_SECRET
         }
+        # 데이터랩 응답 캐시 (오래된 응답은 바로 사용하고 백그라운드에서 갱신)
+        self.trend_cache = StaleCache(get_cache("trend_data", ttl=TREND_STALE_TTL, maxsize=4096),
+                                      fresh_ttl=TREND_CACHE_TTL, endpoint=TREND_ENDPOINT)
         # Tour API 지역 코드
         self.area_codes = {
             '서울': '1', '인천': '2', '대전': '3', '대구': '4',
@@ -37,11 +69,14 @@ class TravelTrendAnalyzer:
             '전라남도': '전남', '제주특별자치도': '제주'
         }
 
+    @traced("trends.get_location_details")
     def get_location_details(self, location: str) -> Dict:
         """네이버 검색 API로 장소 상세 정보 획득"""
         try:
-            response = requests.get(
+            response = traced_request(
+                "GET",
                 f"{self.naver_search_url}/local",
+                endpoint="naver.search.local",
                 headers=self.search_headers,
                 params={"query": location, "display": 5}
             )
@@ -57,24 +92,39 @@ class TravelTrendAnalyzer:
                     normalized_sido = self.sido_mapping.get(sido)
                     area_code = self.area_codes.get(normalized_sido) if normalized_sido else None
                     
-                    return {
+                    details = {
                         "title": item.get('title', '').replace('<b>', '').replace('</b>', ''),
                         "address": address,
                         "area_code": area_code,
                         "image": item.get('image', ''),
-                        "link": item.get('link', '')
+                        "link": item.get('link', ''),
+                        "location": self._naver_location(item)
                     }
+                    # 다른 출처(Google, YouTube 등)의 같은 장소와 연결
+                    get_entity_index().add("naver", **naver_record(details, city=normalized_sido))
+                    return details
             return None
         except Exception as e:
             print(f"Error getting location details: {str(e)}")
             return None
 
+    @staticmethod
+    def _naver_location(item: Dict) -> Dict:
+        """지역 검색 결과의 mapx/mapy(WGS84 × 10^7)를 위치로 변환 (구형 KATEC 좌표면 None)"""
+        try:
+            mapx, mapy = int(item.get('mapx', 0)), int(item.get('mapy', 0))
+        except (TypeError, ValueError):
+            return None
+        if mapx < 10 ** 8 or mapy < 10 ** 7:
+            return None
+        return {"lat": mapy / 1e7, "lng": mapx / 1e7}
+
+    @traced("trends.get_trend_data")
     def get_trend_data(self, keywords: List[str], start_date: str, end_date: str, 
                       age: str = None, gender: str = None) -> pd.DataFrame:
         """네이버 데이터랩 API로 트렌드 데이터 수집"""
         keyword_chunks = [keywords[i:i + 5] for i in range(0, len(keywords), 5)]
         all_results = []
-        
         for chunk in keyword_chunks:
             body = {
                 "startDate": start_date,
@@ -93,30 +143,36 @@ class TravelTrendAnalyzer:
                 body["ages"] = [age]
             if gender:
                 body["gender"] = gender
-                
-            try:
-                response = requests.post(
-                    self.naver_trend_url,
-                    headers=self.trend_headers,
-                    json=body
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    df = self._process_trend_data(result)
-                    if df is not None:
-                        all_results.append(df)
-                else:
-                    print(f"Error {response.status_code}: {response.text}")
-                    
-            except Exception as e:
-                print(f"Error making request: {str(e)}")
-                continue
+            
+            result = self.trend_cache.get_or_fetch(trend_cache_key(body), lambda body=body: self._fetch_trend(body))
+            if result is not None:
+                df = self._process_trend_data(result)
+                if df is not None:
+                    all_results.append(df)
             
         if all_results:
             return pd.concat(all_results, ignore_index=True)
         return None
 
+    def _fetch_trend(self, body: Dict) -> Dict:
+        """데이터랩 요청 하나 (실패하면 None)"""
+        try:
+            response = traced_request(
+                "POST",
+                self.naver_trend_url,
+                endpoint=TREND_ENDPOINT,
+                headers=self.trend_headers,
+                json=body
+            )
+            
+            if response.status_code == 200:
+                return response.json()
+            print(f"Error {response.status_code}: {response.text}")
+                
+        except Exception as e:
+            print(f"Error making request: {str(e)}")
+        return None
+
     def _process_trend_data(self, raw_data: Dict) -> pd.DataFrame:
         """트렌드 데이터 처리"""
         try:
@@ -133,6 +189,20 @@ class TravelTrendAnalyzer:
             print(f"Error processing trend data: {str(e)}")
             return None
 
+    @traced("trends.get_place_trends")
+    def get_place_trends(self, place_names: List[str], days: int = 30) -> Dict[str, float]:
+        """
+        장소명별 최근 검색 트렌드 평균값.
+        데이터랩은 요청(최대 5개 검색어)마다 최댓값을 100으로 맞추므로 요청 간 비교는 근사치입니다.
+        """
+        end_date = datetime.now().strftime("%Y-%m-%d")
+        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        trend_data = self.get_trend_data(place_names, start_date, end_date)
+        if trend_data is None:
+            return {}
+        return trend_data.groupby('location')['value'].mean().to_dict()
+
+    @traced("trends.get_top_locations")
     def get_top_locations(self) -> Dict:
         """인기 여행지 정보 수집"""
         end_date = datetime.now().strftime("%Y-%m-%d")
@@ -204,9 +274,15 @@ class TravelTrendAnalyzer:
         return results
 
 def create_trend_ui():
+    import gradio as gr
+    
     analyzer = TravelTrendAnalyzer()
     
     def update_trends():
+        with span("ui.refresh_trends", kind="action"):
+            return _update_trends()
+    
+    def _update_trends():
         results = analyzer.get_top_locations()
         
         output_text = "🔥 현재 인기 여행지 TOP 4\n"
@@ -234,8 +310,13 @@ def create_trend_ui():
                 output_text += f"  위치: {details['address']}\n"
                 output_text += f"  지역 코드: {details['area_code']}\n"
         
-        image_urls = [item["details"]["image"] for item in results["current_hot"] if item["details"]["image"]]
-        return output_text, image_urls
+        # 모든 추천 여행지 이미지를 썸네일로 받아 중복 이미지 제거
+        all_items = results["current_hot"] + [
+            item for group in ("age_based", "seasonal")
+            for locations in results[group].values() for item in locations
+        ]
+        image_urls = [item["details"]["image"] for item in all_items if item["details"]["image"]]
+        return output_text, get_image_store().gallery(image_urls)
 
     with gr.Blocks() as interface:
         gr.Markdown("# 여행 트렌드 분석")
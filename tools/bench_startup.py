@@ -0,0 +1,77 @@
+"""
+진입점 모듈의 import(콜드 스타트) 시간을 측정합니다.
+
+사용법:
+    python tools/bench_startup.py                 # 모든 진입점
+    python tools/bench_startup.py app demo -n 10  # 특정 모듈, 10회 반복
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ["app", "demo", "app2", "prototype", "imagedemo"]
+
+
+def measure_import(module: str, repeat: int) -> list:
+    """새 인터프리터에서 모듈을 import하는 데 걸린 시간(ms) 목록"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+        timings.append(elapsed)
+    return timings
+
+
+def heaviest_imports(module: str, top: int) -> list:
+    """-X importtime 출력에서 누적 시간이 가장 긴 최상위 import 목록"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # 하위 import는 이름 앞에 공백 두 칸씩 들여쓰기됨
+        if len(name) - len(name.lstrip()) == 1:
+            rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="진입점 콜드 스타트 벤치마크")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="모듈별로 표시할 무거운 import 수")
+    args = parser.parse_args()
+
+    baseline = statistics.median(measure_import("sys", args.repeat))
+    print(f"인터프리터 기본 시작 시간: {baseline:.0f}ms\n")
+
+    for module in args.modules:
+        try:
+            timings = measure_import(module, args.repeat)
+        except RuntimeError as e:
+            print(f"{module}: {e}\n")
+            continue
+        median = statistics.median(timings)
+        print(f"{module}: median {median:.0f}ms (import만 {median - baseline:.0f}ms), "
+              f"min {min(timings):.0f}ms, max {max(timings):.0f}ms")
+        for cumulative_us, name in heaviest_imports(module, args.top):
+            print(f"    {cumulative_us / 1000:8.1f}ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Google Places/Geocoding API를 흉내 내는 로컬 HTTP 서버 (부하 테스트용).
+
+요청(경로 + key를 뺀 파라미터)별로 녹화된 응답이 있으면 그대로 돌려주고, 없으면 파라미터로 시드를 정한
+결정적인 가짜 응답을 만듭니다. --record-from을 주면 녹화가 없는 요청을 실제 API로 보내 응답을 녹화합니다.
+앱/도구는 NAVI_GOOGLE_API_BASE=http://127.0.0.1:8765 로 이 서버를 가리키면 됩니다.
+
+사용법:
+    python tools/fake_places_api.py --port 8765 --latency 80
+    python tools/fake_places_api.py --recordings recordings --record-from https://maps.googleapis.com
+    curl http://127.0.0.1:8765/_stats    # 경로별 요청 수
+    curl "http://127.0.0.1:8765/_faults?error_rate=1&latency=3000"   # 장애 흉내 (503 / 느린 응답)
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from utils.query_planner import SUPPORTED_PLACE_TYPES
+
+RESULTS_PER_PAGE = 20
+# 1x1 투명 GIF (사진 요청 응답)
+PIXEL_GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+NAME_PARTS = ["한빛", "바다", "솔숲", "노을", "별빛", "구름", "산들", "온누리", "푸른", "하늘"]
+REVIEW_TEXTS = [
+    "직원들이 정말 친절하고 깨끗해서 다시 오고 싶어요. 위치도 좋았습니다.",
+    "가격 대비 만족스러웠고 경치가 아름다워요. 주차는 조금 불편했어요.",
+    "사람이 너무 많아서 시끄러웠지만 분위기는 좋았습니다. 추천합니다.",
+    "기대했던 것보다 별로였어요. 대기 시간이 길고 좁았습니다.",
+]
+
+
+def request_key(route: str, params: Dict[str, str]) -> str:
+    """녹화 파일 이름 (API 키는 제외)"""
+    payload = json.dumps([route, sorted((k, v) for k, v in params.items() if k != "key")], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _rng(*parts) -> random.Random:
+    seed = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return random.Random(int(seed[:16], 16))
+
+
+def _fake_place_id(*parts) -> str:
+    return "fake_" + hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:20]
+
+
+def _parse_location(value: str) -> Tuple[float, float]:
+    lat, lng = value.split(",")
+    return float(lat), float(lng)
+
+
+class FakeGoogleApi:
+    """경로별 가짜 응답 생성기. 같은 파라미터에는 항상 같은 응답을 만듭니다."""
+
+    def __init__(self, pages: int = 1):
+        self.pages = pages
+        # 상세 정보 요청에 일관된 위치/이름을 주기 위해 Nearby 결과를 기억
+        self._places: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def respond(self, route: str, params: Dict[str, str], base_url: str) -> Tuple[int, Dict, bytes]:
+        """(상태 코드, 헤더, 본문)"""
+        if route.endswith("/place/photo"):
+            reference = params.get("photoreference") or params.get("photo_reference", "")
+            return 302, {"Location": f"{base_url}/_photos/{reference}.gif"}, b""
+        if route.startswith("/_photos/"):
+            return 200, {"Content-Type": "image/gif"}, PIXEL_GIF
+
+        handlers = {
+            "/maps/api/place/autocomplete/json": self.autocomplete,
+            "/maps/api/place/details/json": self.details,
+            "/maps/api/place/nearbysearch/json": self.nearby,
+            "/maps/api/geocode/json": self.geocode,
+        }
+        handler = handlers.get(route)
+        if handler is None:
+            return 404, {}, b""
+        body = json.dumps(handler(params), ensure_ascii=False).encode("utf-8")
+        return 200, {"Content-Type": "application/json; charset=utf-8"}, body
+
+    def autocomplete(self, params: Dict[str, str]) -> Dict:
+        query = params.get("input", "")
+        rng = _rng("autocomplete", query)
+        predictions = []
+        for i in range(5):
+            place_id = _fake_place_id("city", query, i)
+            with self._lock:
+                self._places.setdefault(place_id, {
+                    "name": query if i == 0 else f"{query} {NAME_PARTS[i]}",
+                    "lat": round(33.5 + rng.random() * 4.5, 6),
+                    "lng": round(126.5 + rng.random() * 3.0, 6),
+                })
+            predictions.append({"description": f"대한민국 {self._places[place_id]['name']}", "place_id": place_id})
+        return {"status": "OK", "predictions": predictions}
+
+    def geocode(self, params: Dict[str, str]) -> Dict:
+        lat, lng = _parse_location(params.get("latlng", "0,0"))
+        size = _rng("geocode", round(lat, 2), round(lng, 2)).choice([0.1, 0.3, 0.6])
+        return {"status": "OK", "results": [{
+            "types": ["locality", "political"],
+            "geometry": {"viewport": {
+                "northeast": {"lat": lat + size / 2, "lng": lng + size / 2},
+                "southwest": {"lat": lat - size / 2, "lng": lng - size / 2},
+            }}
+        }]}
+
+    def nearby(self, params: Dict[str, str]) -> Dict:
+        place_type = params.get("type")
+        if place_type and place_type not in SUPPORTED_PLACE_TYPES:
+            return {"status": "INVALID_REQUEST", "results": []}
+        lat, lng = _parse_location(params.get("location", "0,0"))
+        query = place_type or params.get("keyword", "")
+        page = int(params.get("pagetoken", "0").rsplit(":", 1)[-1]) if params.get("pagetoken") else 0
+
+        results = []
+        for i in range(RESULTS_PER_PAGE):
+            index = page * RESULTS_PER_PAGE + i
+            rng = _rng("nearby", round(lat, 3), round(lng, 3), query, index)
+            place_id = _fake_place_id("place", round(lat, 3), round(lng, 3), query, index)
+            place = {
+                "name": f"{rng.choice(NAME_PARTS)}{rng.choice(NAME_PARTS)} {query} {index + 1}",
+                "lat": round(lat + rng.uniform(-0.05, 0.05), 6),
+                "lng": round(lng + rng.uniform(-0.05, 0.05), 6),
+                "rating": round(rng.uniform(3.5, 5.0), 1),
+                "user_ratings_total": rng.randint(20, 8000),
+                "price_level": rng.randint(1, 4),
+                "types": [place_type or "point_of_interest", "establishment"],
+            }
+            with self._lock:
+                self._places.setdefault(place_id, place)
+            results.append({
+                "place_id": place_id,
+                "name": place["name"],
+                "geometry": {"location": {"lat": place["lat"], "lng": place["lng"]}},
+                "rating": place["rating"],
+                "user_ratings_total": place["user_ratings_total"],
+                "price_level": place["price_level"],
+                "types": place["types"],
+                "business_status": "OPERATIONAL",
+                "photos": [{"photo_reference": f"photo_{place_id}"}],
+            })
+
+        data = {"status": "OK", "results": results}
+        if page + 1 < self.pages:
+            data["next_page_token"] = f"{query}:{page + 1}"
+        return data
+
+    def details(self, params: Dict[str, str]) -> Dict:
+        place_id = params.get("place_id", "")
+        rng = _rng("details", place_id)
+        with self._lock:
+            place = self._places.get(place_id)
+        if place is None:
+            place = {"name": f"장소 {place_id[-6:]}", "lat": 37.5665, "lng": 126.978,
+                     "rating": 4.2, "user_ratings_total": 300, "price_level": 2}
+        closed_day = rng.choice([None, 1, 2])
+        periods = [
+            {"open": {"day": day, "time": "0900"}, "close": {"day": day, "time": "2100"}}
+            for day in range(7) if day != closed_day
+        ]
+        return {"status": "OK", "result": {
+            "name": place["name"],
+            "formatted_address": f"대한민국 {place['name']}로 {rng.randint(1, 300)}",
+            "geometry": {"location": {"lat": place["lat"], "lng": place["lng"]}},
+            "rating": place.get("rating"),
+            "user_ratings_total": place.get("user_ratings_total"),
+            "price_level": place.get("price_level"),
+            "opening_hours": {
+                "periods": periods,
+                "weekday_text": [f"{day}요일: 오전 9:00~오후 9:00" for day in "월화수목금토일"],
+            },
+            "reviews": [
+                {"text": text, "rating": rng.randint(2, 5), "relative_time_description": "1주 전"}
+                for text in rng.sample(REVIEW_TEXTS, 3)
+            ],
+            "photos": [{"photo_reference": f"photo_{place_id}_{i}"} for i in range(3)],
+            "website": "https://example.com",
+            "url": f"https://maps.google.com/?cid={place_id}",
+            "formatted_phone_number": "02-000-0000",
+        }}
+
+
+class Recordings:
+    """녹화 디렉토리: <request_key>.json = {"route", "params", "status", "headers", "body"}"""
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, route: str, params: Dict[str, str]) -> str:
+        return os.path.join(self.directory, request_key(route, params) + ".json")
+
+    def load(self, route: str, params: Dict[str, str]) -> Optional[Tuple[int, Dict, bytes]]:
+        if not self.directory:
+            return None
+        path = self._path(route, params)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        return record["status"], record["headers"], record["body"].encode("utf-8")
+
+    def save(self, route: str, params: Dict[str, str], status: int, headers: Dict, body: bytes):
+        record = {
+            "route": route,
+            "params": {k: v for k, v in params.items() if k != "key"},
+            "status": status,
+            "headers": headers,
+            "body": body.decode("utf-8"),
+        }
+        with open(self._path(route, params), "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+
+
+def make_handler(fake: FakeGoogleApi, recordings: Recordings, record_from: Optional[str],
+                 latency_ms: float, stats: Counter, faults: Dict[str, float]):
+    stats_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, headers: Dict, body: bytes):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _proxy(self, route: str, params: Dict[str, str]) -> Tuple[int, Dict, bytes]:
+            import requests
+
+            response = requests.get(record_from.rstrip("/") + route, params=params, allow_redirects=False)
+            headers = {"Content-Type": response.headers.get("Content-Type", "application/json")}
+            if "Location" in response.headers:
+                headers["Location"] = response.headers["Location"]
+            return response.status_code, headers, response.content
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            route, params = url.path, dict(parse_qsl(url.query))
+            if route == "/_stats":
+                with stats_lock:
+                    self._send(200, {"Content-Type": "application/json"}, json.dumps(stats).encode("utf-8"))
+                return
+            if route == "/_faults":
+                # 실행 중에 장애를 켜고 끔 (error_rate: 503 응답 비율, latency: 추가 지연 ms)
+                faults.update({name: float(value) for name, value in params.items() if name in faults})
+                self._send(200, {"Content-Type": "application/json"}, json.dumps(faults).encode("utf-8"))
+                return
+            with stats_lock:
+                stats[route] += 1
+
+            delay_ms = latency_ms * random.uniform(0.5, 1.5) + faults["latency"]
+            if delay_ms and not route.startswith("/_photos/"):
+                # 실제 API처럼 지연에 ±50% 변동을 줌
+                time.sleep(delay_ms / 1000)
+            if faults["error_rate"] and random.random() < faults["error_rate"]:
+                self._send(503, {"Content-Type": "text/plain"}, b"Service Unavailable")
+                return
+
+            response = recordings.load(route, params)
+            if response is None and record_from and not route.startswith("/_"):
+                response = self._proxy(route, params)
+                recordings.save(route, params, *response)
+            if response is None:
+                base_url = f"http://{self.headers.get('Host', '127.0.0.1')}"
+                response = fake.respond(route, params, base_url)
+            self._send(*response)
+
+    return Handler
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, recordings: Optional[str] = None,
+                 record_from: Optional[str] = None, latency_ms: float = 0, pages: int = 1,
+                 error_rate: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    백그라운드 스레드에서 서버를 시작하고 (서버, base URL)을 반환합니다 (port=0이면 빈 포트).
+    server.faults를 바꾸면 실행 중에 장애(503 비율, 추가 지연)를 흉내 낼 수 있습니다.
+    """
+    stats: Counter = Counter()
+    faults = {"error_rate": error_rate, "latency": 0.0}
+    handler = make_handler(FakeGoogleApi(pages=pages), Recordings(recordings), record_from, latency_ms, stats, faults)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stats = stats
+    server.faults = faults
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화/가짜 응답 Google Places API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recordings", help="녹화된 응답 디렉토리")
+    parser.add_argument("--record-from", help="녹화가 없을 때 요청을 보낼 실제 API 주소 (응답을 녹화)")
+    parser.add_argument("--latency", type=float, default=0, help="응답마다 더할 평균 지연 (ms)")
+    parser.add_argument("--pages", type=int, default=1, help="Nearby Search 가짜 응답의 페이지 수 (최대 3)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503으로 응답할 요청 비율 (0~1)")
+    args = parser.parse_args()
+
+    if args.record_from and not args.recordings:
+        parser.error("--record-from requires --recordings")
+    server, base_url = start_server(args.host, args.port, args.recordings, args.record_from,
+                                    args.latency, min(max(args.pages, 1), 3), args.error_rate)
+    print(f"Fake Google API listening on {base_url} (NAVI_GOOGLE_API_BASE={base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
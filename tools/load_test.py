@@ -0,0 +1,282 @@
+"""
+여행 계획 앱(app.py)의 사용자 흐름을 여러 가상 사용자로 동시에 실행하는 부하 테스트.
+
+가상 사용자는 app.py와 같은 헬퍼와 ResultStore를 써서 여행지 검색(autocomplete) → 여행지 선택 →
+호텔 검색 → 음식점 검색 → 관광지 검색 → 필터/정렬 변경을 반복합니다. 반복마다 새 세션(새 방문자)이며,
+프로세스 공유 캐시는 실제 앱 인스턴스처럼 모든 사용자가 함께 씁니다 (NAVI_CACHE_BACKEND도 그대로 적용).
+
+--api-base를 주지 않으면 tools/fake_places_api.py 서버를 프로세스 안에서 띄워 사용합니다. 사용자 수가 많으면
+가짜 서버도 같은 GIL을 쓰므로, 정확한 수치가 필요할 때는 서버를 따로 띄우고 --api-base로 지정하세요.
+
+사용법:
+    python tools/load_test.py --users 20 --iterations 5 --think-time 1.0
+    python tools/load_test.py --users 50 --duration 120 --latency 80 --json load_report.json
+    python tools/load_test.py --users 10 --api-base http://127.0.0.1:8765   # 따로 띄운 가짜 서버
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+CITIES = ["부산", "제주", "서울", "강릉", "경주", "전주", "여수", "속초"]
+STEPS = ["autocomplete", "select_location", "hotel_search", "restaurant_search",
+         "attraction_search", "filter_change"]
+
+
+def rss_mb() -> float:
+    """현재 프로세스의 RSS (MB). /proc이 없으면 최대 RSS로 대신합니다."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ApiCallCounter:
+    """client span(외부 API 호출)을 trace별로 셉니다 (가상 사용자 반복 하나 = trace 하나)."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        if span.kind == "client":
+            with self._lock:
+                self.calls[span.trace_id] += 1
+
+
+class LoadTest:
+    """가상 사용자 흐름 실행과 단계별 지연/오류 집계"""
+
+    def __init__(self, think_time: float, seed: int = 0):
+        # API 주소(NAVI_GOOGLE_API_BASE)가 정해진 뒤에 불러와야 함
+        from utils import app_core, places_helper
+        from utils.hotels_helper import HotelsHelper
+
+        self.app_core = app_core
+        self.places_helper = places_helper
+        self.hotels_helper = HotelsHelper()
+        self.think_time = think_time
+        self.seed = seed
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.iterations = 0
+        self.degraded_flows = 0
+        self.api_calls = ApiCallCounter()
+        self._lock = threading.Lock()
+
+    def _think(self, rng: random.Random):
+        if self.think_time > 0:
+            time.sleep(rng.expovariate(1 / self.think_time))
+
+    def _step(self, name: str, func):
+        start = time.perf_counter()
+        try:
+            return func()
+        except Exception:
+            with self._lock:
+                self.errors[name] += 1
+            raise
+        finally:
+            with self._lock:
+                self.latencies[name].append((time.perf_counter() - start) * 1000)
+
+    def run_flow(self, user: int, iteration: int):
+        """app.py의 1~8단계를 한 번 실행합니다."""
+        from utils.resilience import degraded_scope
+        from utils.result_store import HOTEL_SORT_OPTIONS, PLACE_SORT_OPTIONS, ResultStore, location_key
+        from utils.tracing import span
+
+        app_core, places_helper = self.app_core, self.places_helper
+        rng = random.Random(f"{self.seed}:{user}:{iteration}")
+        results = ResultStore({})
+        city = rng.choice(CITIES)
+
+        with span("loadtest.flow", kind="action", user=user, iteration=iteration), degraded_scope() as degraded:
+            suggestions = self._step("autocomplete", lambda: results.get_or_fetch(
+                "suggestions", city, lambda: app_core.get_place_suggestions(city)
+            ))
+            if not suggestions:
+                raise RuntimeError(f"no suggestions for {city}")
+            self._think(rng)
+
+            place = self._step("select_location",
+                               lambda: app_core.get_place_location(suggestions[0]["place_id"]))
+            if not place:
+                raise RuntimeError(f"location not found for {city}")
+            center = place["location"]
+            self._think(rng)
+
+            self._step("hotel_search", lambda: results.get_or_fetch(
+                "hotels", location_key(center),
+                lambda: app_core.with_popularity(self.hotels_helper.search_hotels(location=center))
+            ))
+            self._think(rng)
+
+            food_key = (location_key(center), app_core.FOOD_THEMES)
+            self._step("restaurant_search", lambda: results.get_or_fetch(
+                "places", food_key,
+                lambda: app_core.with_popularity(
+                    places_helper.get_nearby_places(center, list(app_core.FOOD_THEMES)))
+            ))
+            self._think(rng)
+
+            themes = rng.sample([theme for theme in places_helper.THEME_TO_PLACE_TYPE
+                                 if theme not in app_core.FOOD_THEMES], rng.randint(1, 3))
+            themes_key = (location_key(center), tuple(themes))
+            self._step("attraction_search", lambda: results.get_or_fetch(
+                "places", themes_key,
+                lambda: app_core.with_popularity(places_helper.get_nearby_places(center, themes))
+            ))
+            self._think(rng)
+
+            # 정렬/필터 위젯을 몇 번 바꾸는 동작 (rerun마다 저장된 결과만 다시 선택)
+            def change_filters():
+                for _ in range(5):
+                    hotel_view = results.view("hotels", location_key(center), HOTEL_SORT_OPTIONS)
+                    if hotel_view:
+                        hotel_view.select(rng.choice(list(HOTEL_SORT_OPTIONS)),
+                                          minimums={"rating": rng.choice([3.5, 4.0, 4.5]),
+                                                    "review_count": rng.choice([0, 100, 500])},
+                                          maximums={"price_level": rng.randint(1, 4)})
+                    food_view = results.view("places", food_key, PLACE_SORT_OPTIONS)
+                    if food_view:
+                        food_view.select(rng.choice(list(PLACE_SORT_OPTIONS)),
+                                         minimums={"rating": rng.choice([3.5, 4.0, 4.5]),
+                                                   "user_ratings_total": rng.choice([0, 50, 500])},
+                                         limit=30)
+            self._step("filter_change", change_filters)
+
+        with self._lock:
+            self.iterations += 1
+            self.degraded_flows += bool(degraded)
+
+    def run_user(self, user: int, iterations: Optional[int], deadline: Optional[float]):
+        iteration = 0
+        while (iterations is None or iteration < iterations) and (deadline is None or time.time() < deadline):
+            try:
+                self.run_flow(user, iteration)
+            except Exception as e:
+                with self._lock:
+                    self.errors["flow"] += 1
+                print(f"[user {user}] flow failed: {e}", file=sys.stderr)
+            iteration += 1
+
+    def run(self, users: int, iterations: Optional[int], duration: Optional[float],
+            ramp_up: float = 0.0) -> Dict:
+        from utils.resilience import open_circuits
+        from utils.tracing import add_exporter, percentile, remove_exporter
+
+        add_exporter(self.api_calls)
+        rss_start = rss_mb()
+        deadline = time.time() + duration if duration else None
+        threads = []
+        started = time.perf_counter()
+        for user in range(users):
+            thread = threading.Thread(target=self.run_user, args=(user, iterations, deadline), daemon=True)
+            thread.start()
+            threads.append(thread)
+            if ramp_up and users > 1:
+                time.sleep(ramp_up / (users - 1))
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        remove_exporter(self.api_calls)
+
+        flow_calls = list(self.api_calls.calls.values())
+        return {
+            "users": users,
+            "iterations": self.iterations,
+            "elapsed_s": round(elapsed, 2),
+            "flows_per_s": round(self.iterations / elapsed, 3) if elapsed else 0.0,
+            "steps": {
+                step: {
+                    "count": len(self.latencies[step]),
+                    "p50_ms": round(percentile(self.latencies[step], 50), 1),
+                    "p95_ms": round(percentile(self.latencies[step], 95), 1),
+                    "p99_ms": round(percentile(self.latencies[step], 99), 1),
+                    "max_ms": round(max(self.latencies[step]), 1) if self.latencies[step] else 0.0,
+                    "errors": self.errors[step],
+                }
+                for step in STEPS
+            },
+            "flow_errors": self.errors["flow"],
+            "api_calls_total": sum(flow_calls),
+            "api_calls_per_flow": round(sum(flow_calls) / len(flow_calls), 1) if flow_calls else 0.0,
+            "api_calls_per_user": round(sum(flow_calls) / users, 1) if users else 0.0,
+            "degraded_flows": self.degraded_flows,
+            "open_circuits": sorted(open_circuits()),
+            "rss_start_mb": round(rss_start, 1),
+            "rss_end_mb": round(rss_mb(), 1),
+        }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"가상 사용자 {report['users']}명, 흐름 {report['iterations']}회, {report['elapsed_s']}초 "
+        f"→ 처리량 {report['flows_per_s']} 흐름/초 (실패 {report['flow_errors']})",
+        f"API 호출: 총 {report['api_calls_total']}회, 흐름당 {report['api_calls_per_flow']}회, "
+        f"사용자당 {report['api_calls_per_user']}회",
+        f"degraded 흐름: {report['degraded_flows']}회, 열린 회로: {', '.join(report['open_circuits']) or '없음'}",
+        f"메모리(RSS): {report['rss_start_mb']}MB → {report['rss_end_mb']}MB "
+        f"({report['rss_end_mb'] - report['rss_start_mb']:+.1f}MB)",
+        "",
+    ]
+    header = f"{'단계':<20} {'count':>6} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'maxms':>9} {'errors':>6}"
+    lines += [header, "-" * len(header)]
+    for step, row in report["steps"].items():
+        lines.append(f"{step:<20} {row['count']:>6} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+                     f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f} {row['errors']:>6}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여행 계획 앱 동시 사용자 부하 테스트")
+    parser.add_argument("--users", type=int, default=10, help="가상 사용자 수")
+    parser.add_argument("--iterations", type=int, help="사용자별 반복 횟수 (기본: --duration이 없으면 3)")
+    parser.add_argument("--duration", type=float, help="테스트 시간 (초)")
+    parser.add_argument("--think-time", type=float, default=1.0, help="단계 사이 평균 대기 시간 (초, 지수 분포)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="모든 사용자가 시작하기까지 걸리는 시간 (초)")
+    parser.add_argument("--api-base", help="Google API 주소 (기본: 내장 가짜 서버)")
+    parser.add_argument("--recordings", help="내장 가짜 서버가 사용할 녹화 응답 디렉토리")
+    parser.add_argument("--latency", type=float, default=50, help="내장 가짜 서버의 평균 응답 지연 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="내장 가짜 서버가 503으로 응답할 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    iterations = args.iterations if args.iterations or args.duration else 3
+    server = None
+    api_base = args.api_base
+    if api_base is None:
+        from tools.fake_places_api import start_server
+        server, api_base = start_server(recordings=args.recordings, latency_ms=args.latency,
+                                        error_rate=args.error_rate)
+    os.environ["NAVI_GOOGLE_API_BASE"] = api_base
+    print(f"API: {api_base}")
+
+    report = LoadTest(args.think_time, seed=args.seed).run(args.users, iterations, args.duration, args.ramp_up)
+    if server is not None:
+        report["fake_api_requests"] = dict(server.stats)
+        server.shutdown()
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import logging
+import sys
+import os
+from typing import Callable, Dict, List, MutableMapping, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import GOOGLE_CLOUD_API_KEY
+from utils.feature_store import get_feature_store
+from utils.places_helper import AUTOCOMPLETE_URL, PLACE_DETAILS_URL
+from utils.plan_store import get_plan_store, place_ids
+from utils.result_store import location_key
+from utils.tracing import traced, traced_request
+
+logger = logging.getLogger(__name__)
+
+# 세션 상태 기본값 (Streamlit 플래너 공통)
+SESSION_DEFAULTS = {
+    "selected_place": None,
+    "place_details": None,
+    "selected_hotel": None,
+    "travel_dates": None,
+    "distance_matrix": None,
+    "daily_routes": None,
+}
+
+FOOD_THEMES = ("음식/맛집",)
+
+# 엔드포인트 이름의 앞부분 → 화면에 표시할 서비스 이름
+SERVICE_LABELS = {
+    "google": "Google 지도",
+    "naver": "네이버",
+    "kakao": "카카오",
+    "image": "이미지",
+}
+
+# 계획의 place_id 참조 키 → 공유 장소 테이블의 kind
+PLAN_PLACE_KINDS = {
+    "hotel": ["hotels", "plan_hotel"],
+    "place": ["restaurants", "attractions", "plan_daily_places"],
+    "details": ["details"],
+}
+
+
+def initialize_session_state(session_state: MutableMapping):
+    for key, value in SESSION_DEFAULTS.items():
+        if key not in session_state:
+            session_state[key] = value
+
+
+def with_popularity(places: List[Dict]) -> List[Dict]:
+    """
+    검색 결과의 평점/리뷰 수를 feature store에 기록하고 종합 인기 점수(popularity_score)를 붙입니다.
+    """
+    if places:
+        store = get_feature_store()
+        store.ingest_google_places(places)
+        store.annotate(places)
+    return places
+
+
+def degraded_message(endpoints) -> Optional[str]:
+    """장애 중인 엔드포인트가 있으면 화면 상단에 표시할 안내 문구"""
+    services = sorted({SERVICE_LABELS.get(endpoint.split(".")[0], endpoint) for endpoint in endpoints})
+    if not services:
+        return None
+    return (f"⚠️ {', '.join(services)} 응답이 원활하지 않아 일부 결과가 최신이 아니거나 빠져 있을 수 있습니다. "
+            "잠시 후 다시 시도해주세요.")
+
+
+def prefetch_place_details(results, places: List[Dict]):
+    """
+    상세 정보가 없는 장소들을 동시에 조회해 결과 저장소(ResultStore)에 넣고 영업시간을 색인합니다.
+    """
+    # 비동기 클라이언트(httpx)는 필요할 때만 불러옴 (앱 시작 시간 유지)
+    from utils.async_places import get_places_client
+    from utils.opening_hours import get_opening_index
+
+    missing = [place["place_id"] for place in places
+               if results.get("place_details", place["place_id"]) is None]
+    if missing:
+        for place_id, details in get_places_client().get_place_details_many(missing).items():
+            results.put("place_details", place_id, details)
+
+    index = get_opening_index()
+    for place in places:
+        details = results.get("place_details", place["place_id"])
+        if details:
+            index.add(place["place_id"], details.get("opening_periods"))
+
+
+def save_plan(results, selected_place: Dict, options: Dict, budget_plan: Optional[Dict] = None) -> str:
+    """
+    현재 세션의 계획을 저장하고 공유용 plan_id를 반환합니다.
+
+    options는 위젯 값(start_date, end_date, budget, themes, travel_with, num_travelers)이며,
+    검색 결과와 상세 정보는 세션의 ResultStore에 있는 것만 place_id로 참조합니다.
+    """
+    center = location_key(selected_place["location"])
+    hotels = results.get("hotels", center) or []
+    restaurants = results.get("places", (center, FOOD_THEMES)) or []
+    attractions = results.get("places", (center, tuple(options["themes"]))) or []
+    details = [
+        {**detail, "place_id": place_id}
+        for place_id in dict.fromkeys(place_ids(restaurants) + place_ids(attractions))
+        for detail in [results.get("place_details", place_id)] if detail
+    ]
+
+    plan = {
+        "destination": selected_place,
+        **options,
+        "hotels": place_ids(hotels),
+        "restaurants": place_ids(restaurants),
+        "attractions": place_ids(attractions),
+        "details": place_ids(details),
+    }
+    if budget_plan:
+        plan["plan_hotel"] = budget_plan["hotel"]["place_id"] if budget_plan["hotel"] else None
+        plan["plan_daily_places"] = [place_ids(day) for day in budget_plan["daily_places"]]
+        plan["plan_costs"] = {key: budget_plan[key] for key in ("hotel_cost", "places_cost", "total_cost", "budget")}
+
+    return get_plan_store().save(plan, places={
+        "hotel": hotels, "place": restaurants + attractions, "details": details
+    })
+
+
+def restore_plan(results, session_state: MutableMapping, plan_id: str) -> Optional[Dict]:
+    """
+    저장된 계획을 불러와 검색 결과를 ResultStore에, 여행지와 예산 일정을 세션 상태에 넣습니다.
+    API를 호출하지 않으며, 계획이 없으면 None을 반환합니다.
+    """
+    plan, places = get_plan_store().load(plan_id, PLAN_PLACE_KINDS)
+    if plan is None:
+        return None
+
+    def resolve(kind, ids):
+        return [places[kind][place_id] for place_id in ids or [] if place_id in places[kind]]
+
+    center = location_key(plan["destination"]["location"])
+    results.put("hotels", center, resolve("hotel", plan["hotels"]))
+    results.put("places", (center, FOOD_THEMES), resolve("place", plan["restaurants"]))
+    results.put("places", (center, tuple(plan["themes"])), resolve("place", plan["attractions"]))
+    for place_id, detail in places["details"].items():
+        results.put("place_details", place_id, detail)
+
+    session_state["selected_place"] = plan["destination"]
+    session_state["budget_plan"] = None
+    if plan.get("plan_costs"):
+        hotel = resolve("hotel", [plan["plan_hotel"]]) if plan["plan_hotel"] else []
+        daily_places = [resolve("place", day) for day in plan["plan_daily_places"]]
+        session_state["budget_plan"] = {
+            "hotel": hotel[0] if hotel else None,
+            "places": [place for day in daily_places for place in day],
+            "daily_places": daily_places,
+            **plan["plan_costs"]
+        }
+    return plan
+
+
+@traced("app.get_place_suggestions")
+def get_place_suggestions(query: str, on_error: Optional[Callable[[str], None]] = None) -> List[Dict]:
+    """Google Places Autocomplete API를 호출하여 장소 추천을 받아옵니다."""
+    if not query:
+        return []
+
+    base_url = AUTOCOMPLETE_URL
+    params = {
+        "input": query,
+        "types": "(regions)",  # 도시로 제한
+        "language": "ko",     # 한글 결과
+        "key": GOOGLE_CLOUD_API_KEY
+    }
+
+    try:
+        response = traced_request("GET", base_url, endpoint="google.places.autocomplete", params=params)
+        response.raise_for_status()
+        suggestions = response.json().get("predictions", [])
+        return [{"description": place["description"],
+                "place_id": place["place_id"]}
+                for place in suggestions]
+    except Exception as e:
+        logger.error(f"Error fetching place suggestions: {str(e)}")
+        if on_error:
+            on_error(f"장소 검색 중 오류가 발생했습니다: {str(e)}")
+        return []
+
+
+@traced("app.get_place_location")
+def get_place_location(place_id: str, on_error: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
+    """선택된 장소의 위치 정보를 가져옵니다."""
+    base_url = PLACE_DETAILS_URL
+    params = {
+        "place_id": place_id,
+        "fields": "geometry,formatted_address,name",
+        "language": "ko",
+        "key": GOOGLE_CLOUD_API_KEY
+    }
+
+    try:
+        response = traced_request("GET", base_url, endpoint="google.places.details", params=params)
+        response.raise_for_status()
+        result = response.json().get("result", {})
+        if result and "geometry" in result:
+            return {
+                "name": result.get("name"),
+                "address": result.get("formatted_address"),
+                "location": result["geometry"]["location"]
+            }
+    except Exception as e:
+        logger.error(f"Error fetching place location: {str(e)}")
+        if on_error:
+            on_error(f"장소 정보 조회 중 오류가 발생했습니다: {str(e)}")
+    return None
@@ -0,0 +1,411 @@
+"""
+Google Places API 비동기 클라이언트.
+
+하나의 httpx.AsyncClient(연결 풀)를 공유하고, 동시 요청 수는 세마포어로 제한합니다.
+파싱/점수 계산은 places_helper, hotels_helper와 같은 함수를 사용하므로 결과 형식이 동일합니다.
+
+Example:
+    async with AsyncPlacesClient(max_concurrency=20) as client:
+        places, hotels = await asyncio.gather(
+            client.get_nearby_places(location, ["박물관", "관광명소"]),
+            client.search_hotels(location)
+        )
+
+    # 동기 코드(Streamlit 등)에서는 PlacesClient를 사용
+    client = get_places_client()
+    places = client.get_nearby_places(location, ["박물관"])
+"""
+import asyncio
+import logging
+import sys
+import os
+import threading
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import GOOGLE_CLOUD_API_KEY
+from utils.geo import annotate_distances, distances_from
+from utils.hotels_helper import HOTEL_DETAILS_FIELDS, HotelsHelper
+from utils.candidate_pool import (
+    HOTEL_MAX_PAGES, HOTEL_RADIUS, LODGING_QUERY, NEARBY_ENDPOINT, sweep_cache, sweep_key
+)
+from utils.places_helper import (
+    AUTOCOMPLETE_URL, DEFAULT_CITY_RADIUS, GEOCODE_URL, MAX_RESULTS_PER_TYPE, NEARBY_EMPTY_STATUSES,
+    NEARBY_SEARCH_URL, PLACE_DETAILS_FIELDS, PLACE_DETAILS_URL, PLACE_PHOTO_URL, city_radius_cache, city_radius_key,
+    parse_nearby_place, parse_place_details, radius_from_geocode, rank_places
+)
+from utils.query_planner import NearbyQuery, get_query_planner
+from utils.resilience import CircuitOpenError, get_breaker, mark_degraded
+from utils.tracing import is_upstream_failure, span
+
+logger = logging.getLogger(__name__)
+
+
+# next_page_token은 발급 직후 바로 사용할 수 없어 잠시 기다려야 함
+PAGE_TOKEN_DELAY = 2.0
+
+
+class AsyncPlacesClient:
+    """
+    Places API 비동기 클라이언트입니다.
+
+    get_nearby_places는 place type별 검색을 동시에 실행하고, 모든 type을 초기 반경으로 검색해
+    type당 60개로 자릅니다. 요청별 결과는 동기 버전과 같은 후보 풀(candidate_pool) 캐시에 저장됩니다.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 20,
+                 timeout: float = 10.0, page_delay: float = PAGE_TOKEN_DELAY):
+        self.api_key = api_key or GOOGLE_CLOUD_API_KEY
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.page_delay = page_delay
+        self._hotels = HotelsHelper()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncPlacesClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        # 클라이언트와 세마포어는 실행 중인 이벤트 루프에 묶이므로 첫 요청 시 생성
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_concurrency,
+                                  max_keepalive_connections=self.max_concurrency)
+            self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _get(self, url: str, endpoint: str, params: Dict,
+                   follow_redirects: bool = True) -> httpx.Response:
+        client = self._ensure_client()
+        breaker = get_breaker(endpoint)
+        async with self._semaphore:
+            with span(endpoint, kind="client", endpoint=endpoint, method="GET", retries=0) as s:
+                # 동기 traced_request와 같은 엔드포인트별 회로 차단기 사용
+                if not breaker.allow():
+                    s.set(circuit="open")
+                    mark_degraded(endpoint)
+                    raise CircuitOpenError(f"{endpoint} circuit is open")
+                try:
+                    response = await client.get(url, params=params, follow_redirects=follow_redirects)
+                except httpx.HTTPError:
+                    breaker.record_failure()
+                    mark_degraded(endpoint)
+                    raise
+                except BaseException:
+                    # 취소(CancelledError) 등: 시험 요청 표시를 풀어 회로가 half_open에 묶이지 않도록
+                    breaker.release()
+                    raise
+                if is_upstream_failure(response.status_code):
+                    breaker.record_failure()
+                    mark_degraded(endpoint)
+                else:
+                    breaker.record_success()
+                s.set(status=response.status_code, payload_bytes=len(response.content))
+                return response
+
+    async def get_place_suggestions(self, query: str) -> List[Dict]:
+        """Autocomplete로 도시(지역) 후보를 가져옵니다."""
+        if not query:
+            return []
+        params = {
+            "input": query,
+            "types": "(regions)",
+            "language": "ko",
+            "key": self.api_key
+        }
+        try:
+            response = await self._get(AUTOCOMPLETE_URL, "google.places.autocomplete", params)
+            response.raise_for_status()
+            return [{"description": place["description"], "place_id": place["place_id"]}
+                    for place in response.json().get("predictions", [])]
+        except Exception as e:
+            logger.error(f"Error fetching place suggestions: {str(e)}")
+            return []
+
+    async def get_place_location(self, place_id: str) -> Optional[Dict]:
+        """장소의 이름, 주소, 위치를 가져옵니다."""
+        params = {
+            "place_id": place_id,
+            "fields": "geometry,formatted_address,name",
+            "language": "ko",
+            "key": self.api_key
+        }
+        try:
+            response = await self._get(PLACE_DETAILS_URL, "google.places.details", params)
+            response.raise_for_status()
+            result = response.json().get("result", {})
+            if result and "geometry" in result:
+                return {
+                    "name": result.get("name"),
+                    "address": result.get("formatted_address"),
+                    "location": result["geometry"]["location"]
+                }
+        except Exception as e:
+            logger.error(f"Error fetching place location: {str(e)}")
+        return None
+
+    async def calculate_city_radius(self, location: Dict[str, float]) -> int:
+        """도시 크기에 따라 적절한 검색 반경을 계산합니다 (동기 버전과 같은 캐시 사용)."""
+        cache = city_radius_cache()
+        radius = cache.get(city_radius_key(location))
+        if radius is not None:
+            return radius
+        params = {
+            "latlng": f"{location['lat']},{location['lng']}",
+            "key": self.api_key
+        }
+        try:
+            response = await self._get(GEOCODE_URL, "google.geocode", params)
+            radius = radius_from_geocode(response.json())
+            if radius is not None:
+                cache.set(city_radius_key(location), radius)
+                return radius
+        except Exception as e:
+            logger.error(f"Error calculating city radius: {str(e)}")
+        return DEFAULT_CITY_RADIUS
+
+    async def _nearby_pages(self, params: Dict, max_pages: Optional[int] = None,
+                            max_results: int = MAX_RESULTS_PER_TYPE) -> List[Dict]:
+        """
+        next_page_token을 따라가며 Nearby Search 결과를 모읍니다.
+        첫 페이지가 실패하면(OVER_QUERY_LIMIT 등) 결과 없음과 구분되도록 예외를 내고,
+        다음 페이지가 실패하면 이미 받은 페이지만 반환합니다.
+        """
+        results = []
+        params = dict(params)
+        pages = 0
+        while True:
+            try:
+                response = await self._get(NEARBY_SEARCH_URL, "google.places.nearbysearch", params)
+                response.raise_for_status()
+                data = response.json()
+                status = data.get("status")
+                if status not in NEARBY_EMPTY_STATUSES and status != "OK":
+                    raise RuntimeError(f"Nearby Search failed: {status}")
+            except Exception as e:
+                if pages == 0:
+                    raise
+                # 다음 페이지 실패는 이미 받은 결과만 사용 (동기 search_nearby와 같음)
+                logger.error(f"Error fetching next page: {str(e)}")
+                break
+            if status != "OK":
+                break
+            results.extend(data.get("results", []))
+            pages += 1
+
+            next_page_token = data.get("next_page_token")
+            if (not next_page_token or len(results) >= max_results
+                    or (max_pages is not None and pages >= max_pages)):
+                break
+            # 대기하는 동안 세마포어를 잡고 있지 않음
+            await asyncio.sleep(self.page_delay)
+            params["pagetoken"] = next_page_token
+        return results[:max_results]
+
+    async def _nearby_query(self, location: Dict[str, float], radius: int, query: NearbyQuery,
+                            max_pages: Optional[int] = None) -> List[Dict]:
+        """
+        요청 하나의 결과 (동기 버전과 같은 후보 풀 sweep 캐시를 먼저 확인).
+        오래된 sweep은 다시 검색하되, 회로가 열려 있거나 검색이 실패하면 오래된 sweep을 사용합니다.
+        """
+        sweeps = sweep_cache()
+        key = sweep_key(location, query, radius)
+        stale, fresh = sweeps.lookup(key)
+        if stale is not None and (fresh or sweeps.circuit_open()):
+            if not fresh:
+                mark_degraded(NEARBY_ENDPOINT)
+            return stale
+        params = {
+            "location": f"{location['lat']},{location['lng']}",
+            "radius": radius,
+            **query.params(),
+            "language": "ko",
+            "key": self.api_key
+        }
+        try:
+            results = await self._nearby_pages(params, max_pages=max_pages)
+        except Exception as e:
+            logger.error(f"Error fetching places for type {query.label}: {str(e)}")
+            if stale is not None:
+                mark_degraded(NEARBY_ENDPOINT)
+                return stale
+            return []
+        get_query_planner().record(location, query, len(results))
+        places = [parse_nearby_place(place, query.label) for place in results]
+        sweeps.set(key, places)
+        return places
+
+    async def get_nearby_places(self, location: Dict[str, float], selected_themes: List[str]) -> List[Dict]:
+        """선택된 위치 주변의 관광지를 요청 계획(query_planner)의 요청별로 동시에 검색합니다."""
+        with span("places.get_nearby_places"):
+            radius = await self.calculate_city_radius(location)
+            batches = await asyncio.gather(*(
+                self._nearby_query(location, radius, query)
+                for query in get_query_planner().plan(selected_themes, location)
+            ))
+            ranked = [dict(place) for place in rank_places([place for batch in batches for place in batch])]
+            return annotate_distances(ranked, location)
+
+    async def get_place_details(self, place_id: str) -> Optional[Dict]:
+        """특정 장소의 상세 정보를 가져옵니다."""
+        params = {
+            "place_id": place_id,
+            "fields": PLACE_DETAILS_FIELDS,
+            "language": "ko",
+            "key": self.api_key
+        }
+        with span("places.get_place_details"):
+            try:
+                response = await self._get(PLACE_DETAILS_URL, "google.places.details", params)
+                response.raise_for_status()
+                data = response.json()
+                # OVER_QUERY_LIMIT 등은 빈 상세 정보가 캐시되지 않도록 None (동기 버전과 같음)
+                if data.get("status") != "OK" or "result" not in data:
+                    logger.error(f"Place details unavailable for {place_id}: {data.get('status')}")
+                    return None
+                return parse_place_details(data["result"])
+            except Exception as e:
+                logger.error(f"Error fetching place details: {str(e)}")
+                return None
+
+    async def get_place_details_many(self, place_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """여러 장소의 상세 정보를 동시에 가져옵니다."""
+        details = await asyncio.gather(*(self.get_place_details(place_id) for place_id in place_ids))
+        return dict(zip(place_ids, details))
+
+    async def get_place_photo(self, photo_reference: str, max_width: int = 400) -> Optional[str]:
+        """장소 사진의 URL을 가져옵니다 (302 리다이렉트의 Location)."""
+        params = {
+            "photoreference": photo_reference,
+            "maxwidth": max_width,
+            "key": self.api_key
+        }
+        try:
+            response = await self._get(PLACE_PHOTO_URL, "google.places.photo", params, follow_redirects=False)
+            if response.status_code == 302:
+                return response.headers["Location"]
+        except Exception as e:
+            logger.error(f"Error fetching photo: {str(e)}")
+        return None
+
+    async def _get_hotel_details(self, place_id: str) -> Optional[Dict]:
+        params = {
+            "place_id": place_id,
+            "fields": HOTEL_DETAILS_FIELDS,
+            "key": self.api_key,
+            "language": "ko"
+        }
+        try:
+            response = await self._get(PLACE_DETAILS_URL, "google.places.details", params)
+            data = response.json()
+            if data.get("status") == "OK" and "result" in data:
+                return data["result"]
+        except Exception as e:
+            logger.error(f"Error fetching hotel details: {str(e)}")
+        return None
+
+    async def search_hotels(self, location: Dict[str, float], radius: int = HOTEL_RADIUS) -> List[Dict]:
+        """주어진 위치의 호텔을 검색하고 상세 정보는 동시에 가져옵니다."""
+        with span("hotels.search_hotels"):
+            try:
+                candidates = [
+                    place for place in await self._nearby_query(location, radius, LODGING_QUERY,
+                                                                max_pages=HOTEL_MAX_PAGES)
+                    if self._hotels._passes_basic_filter(place)
+                ]
+                details = await asyncio.gather(*(
+                    self._get_hotel_details(place["place_id"]) for place in candidates
+                ))
+                distances = distances_from(location, candidates).tolist() if candidates else []
+                hotels = [
+                    self._hotels._build_hotel_info(place, detail, distance)
+                    for place, detail, distance in zip(candidates, details, distances) if detail
+                ]
+                return self._hotels._top_hotels(hotels)
+            except Exception as e:
+                logger.error(f"Error searching hotels: {str(e)}")
+                return []
+
+    async def get_hotel_photo(self, photo_reference: str, max_width: int = 800) -> Optional[str]:
+        """호텔 사진 URL을 가져옵니다 (리다이렉트를 따라간 최종 URL)."""
+        params = {
+            "maxwidth": max_width,
+            "photo_reference": photo_reference,
+            "key": self.api_key
+        }
+        try:
+            response = await self._get(PLACE_PHOTO_URL, "google.places.photo", params)
+            if response.status_code == 200:
+                return str(response.url)
+        except Exception as e:
+            logger.error(f"Error fetching hotel photo: {str(e)}")
+        return None
+
+
+class PlacesClient:
+    """
+    AsyncPlacesClient의 동기 래퍼입니다.
+
+    백그라운드 스레드에서 이벤트 루프 하나를 계속 돌리므로 호출이 끝나도 연결 풀이 유지됩니다.
+    호출 스레드의 tracing 컨텍스트는 run_coroutine_threadsafe를 통해 그대로 전달됩니다.
+    """
+
+    def __init__(self, **client_kwargs):
+        self._async = AsyncPlacesClient(**client_kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="places-client", daemon=True)
+        self._thread.start()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        self._run(self._async.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def calculate_city_radius(self, location: Dict[str, float]) -> int:
+        return self._run(self._async.calculate_city_radius(location))
+
+    def get_nearby_places(self, location: Dict[str, float], selected_themes: List[str]) -> List[Dict]:
+        return self._run(self._async.get_nearby_places(location, selected_themes))
+
+    def get_place_details(self, place_id: str) -> Optional[Dict]:
+        return self._run(self._async.get_place_details(place_id))
+
+    def get_place_details_many(self, place_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        return self._run(self._async.get_place_details_many(place_ids))
+
+    def get_place_photo(self, photo_reference: str, max_width: int = 400) -> Optional[str]:
+        return self._run(self._async.get_place_photo(photo_reference, max_width))
+
+    def search_hotels(self, location: Dict[str, float], radius: int = HOTEL_RADIUS) -> List[Dict]:
+        return self._run(self._async.search_hotels(location, radius))
+
+    def get_hotel_photo(self, photo_reference: str, max_width: int = 800) -> Optional[str]:
+        return self._run(self._async.get_hotel_photo(photo_reference, max_width))
+
+
+_places_client: Optional[PlacesClient] = None
+_places_client_lock = threading.Lock()
+
+
+def get_places_client() -> PlacesClient:
+    """프로세스 전체에서 공유하는 PlacesClient"""
+    global _places_client
+    with _places_client_lock:
+        if _places_client is None:
+            _places_client = PlacesClient()
+        return _places_client
@@ -0,0 +1,274 @@
+"""
+여러 도시의 여행 계획을 한 번에 생성하는 배치 API와 CLI.
+
+요청(도시, 날짜, 테마, 예산, 인원)마다 위치 → 관광지/음식점/호텔 → 예산 맞춤 일정 순으로 만들며,
+요청들은 하나의 AsyncPlacesClient를 공유해 동시에 처리됩니다. 같은 도시/테마 조회는
+진행 중인 요청을 공유하고(dedup), 결과는 Streamlit 앱과 같은 프로세스 캐시(results.*)에 저장합니다.
+
+사용법:
+    python -m utils.batch_planner plans.jsonl -o plans_out.jsonl --concurrency 20
+    python -m utils.batch_planner plans.jsonl --checkpoint-dir plan_checkpoint   # 중단 후 이어서 실행
+
+입력 JSONL 한 줄 예시:
+    {"request_id": "c-001", "city": "부산", "start_date": "2025-05-01", "end_date": "2025-05-03",
+     "themes": ["관광명소", "자연/아웃도어"], "budget": 1000000, "party_size": 2}
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import os
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.async_places import AsyncPlacesClient
+from utils.batch_runner import Checkpoint, load_catalogue
+from utils.budget_optimizer import optimize_plan
+from utils.cache import get_cache
+from utils.places_helper import THEME_TO_PLACE_TYPE
+from utils.result_store import location_key
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+FOOD_THEMES = ("음식/맛집",)
+DEFAULT_DAYS = 2
+MAX_DAYS = 14
+MEALS_PER_DAY = 2
+
+
+def request_key(request: Dict) -> str:
+    """요청 ID (없으면 요청 내용의 해시)"""
+    if request.get("request_id"):
+        return str(request["request_id"])
+    payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_request(raw: Dict) -> Dict:
+    """
+    입력 요청을 검증하고 기본값을 채웁니다.
+    날짜가 없으면 days(기본 2일)로 기간을 정하며, 여행 기간은 앱과 같이 최대 14일입니다.
+    """
+    city = (raw.get("city") or "").strip()
+    if not city:
+        raise ValueError("city is required")
+
+    start = date.fromisoformat(raw["start_date"]) if raw.get("start_date") else None
+    if raw.get("end_date"):
+        if start is None:
+            raise ValueError("end_date requires start_date")
+        days = (date.fromisoformat(raw["end_date"]) - start).days
+    else:
+        days = int(raw.get("days", DEFAULT_DAYS))
+    if not 0 <= days <= MAX_DAYS:
+        raise ValueError(f"trip length must be between 0 and {MAX_DAYS} days")
+
+    themes = [theme for theme in raw.get("themes", []) if theme in THEME_TO_PLACE_TYPE]
+    unknown = set(raw.get("themes", [])) - set(themes)
+    if unknown:
+        logger.warning(f"Ignoring unknown themes: {sorted(unknown)}")
+
+    return {
+        "request_id": request_key(raw),
+        "city": city,
+        "start_date": start.isoformat() if start else None,
+        "days": days,
+        "themes": themes or ["관광명소"],
+        "budget": int(raw.get("budget", 1000000)),
+        "party_size": max(1, int(raw.get("party_size", 1)))
+    }
+
+
+def compact_place(place: Dict) -> Dict:
+    """출력용으로 장소 정보 중 필요한 필드만 남깁니다."""
+    return {
+        key: place[key]
+        for key in ("place_id", "name", "rating", "user_ratings_total", "review_count",
+                    "place_type", "price_level", "location", "address")
+        if key in place
+    }
+
+
+def build_itinerary(request: Dict, daily_attractions: List[List[Dict]], restaurants: List[Dict]) -> List[Dict]:
+    """
+    날짜별 관광지(optimize_plan의 daily_places)에 점수순 음식점을 나눠 붙입니다 (당일치기도 하루로 계산).
+    같은 음식점이 여러 날에 중복되지 않으며, 후보가 부족하면 뒤쪽 날짜가 비게 됩니다.
+    """
+    start = date.fromisoformat(request["start_date"]) if request["start_date"] else None
+    itinerary = []
+    for day in range(max(request["days"], 1)):
+        itinerary.append({
+            "day": day + 1,
+            "date": (start + timedelta(days=day)).isoformat() if start else None,
+            "attractions": [compact_place(p) for p in
+                            (daily_attractions[day] if day < len(daily_attractions) else [])],
+            "meals": [compact_place(p) for p in
+                      restaurants[day * MEALS_PER_DAY:(day + 1) * MEALS_PER_DAY]]
+        })
+    return itinerary
+
+
+class BatchPlanner:
+    """
+    여행 계획 요청을 동시에 처리합니다.
+
+    조회 결과는 get_cache("results.<namespace>")에 저장되어 요청 간, 그리고 같은 프로세스의
+    Streamlit 세션과 공유되며, 동시에 들어온 같은 조회는 한 번만 호출됩니다.
+    """
+
+    def __init__(self, client: Optional[AsyncPlacesClient] = None, concurrency: int = 20,
+                 shared_ttl: float = 3600):
+        self.client = client or AsyncPlacesClient()
+        self.concurrency = concurrency
+        self.shared_ttl = shared_ttl
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+    async def _shared(self, namespace: str, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """공유 캐시 → 진행 중인 동일 조회 → 새 조회 순으로 결과를 가져옵니다."""
+        cache = get_cache(f"results.{namespace}", ttl=self.shared_ttl)
+        inflight_key = (namespace, key)
+        while True:
+            value = cache.get(key)
+            if value is not None:
+                return value
+            future = self._inflight.get(inflight_key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 조회하던 작업이 취소되었으면 직접 다시 조회하고, 이 작업이 취소되었으면 그대로 전파
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            value = await fetch()
+            if value:
+                cache.set(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 쪽이 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                # 취소 등으로 결과 없이 끝나면 기다리던 작업들이 멈춰 있지 않도록
+                future.cancel()
+            del self._inflight[inflight_key]
+
+    async def resolve_location(self, city: str) -> Optional[Dict]:
+        async def fetch():
+            suggestions = await self.client.get_place_suggestions(city)
+            if not suggestions:
+                return None
+            return await self.client.get_place_location(suggestions[0]["place_id"])
+        return await self._shared("city_location", city, fetch)
+
+    async def plan(self, raw: Dict) -> Dict:
+        """요청 하나의 여행 계획을 만듭니다. 실패하면 status가 "error"인 결과를 반환합니다."""
+        try:
+            request = normalize_request(raw)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"request_id": request_key(raw), "status": "error", "error": f"invalid request: {e}"}
+
+        with span("batch.plan", kind="action", request_id=request["request_id"], city=request["city"]):
+            try:
+                place = await self.resolve_location(request["city"])
+                if not place:
+                    return {**request, "status": "error", "error": "location not found"}
+
+                center = place["location"]
+                attractions, restaurants, hotels = await asyncio.gather(
+                    self._shared("places", (location_key(center), tuple(request["themes"])),
+                                 lambda: self.client.get_nearby_places(center, request["themes"])),
+                    self._shared("places", (location_key(center), FOOD_THEMES),
+                                 lambda: self.client.get_nearby_places(center, list(FOOD_THEMES))),
+                    self._shared("hotels", location_key(center),
+                                 lambda: self.client.search_hotels(center))
+                )
+            except Exception as e:
+                logger.error(f"Error planning {request['request_id']}: {str(e)}")
+                return {**request, "status": "error", "error": str(e)}
+
+        # 최적화는 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        budget_plan = await asyncio.to_thread(
+            optimize_plan, hotels or [], attractions or [], request["budget"],
+            party_size=request["party_size"], nights=request["days"]
+        )
+        return {
+            **request,
+            "status": "ok",
+            "destination": place,
+            "hotel": compact_place(budget_plan["hotel"]) if budget_plan["hotel"] else None,
+            "estimated_cost": {key: budget_plan[key] for key in ("hotel_cost", "places_cost", "total_cost")},
+            "itinerary": build_itinerary(request, budget_plan["daily_places"], restaurants or [])
+        }
+
+    async def plan_many(self, requests: Iterable[Dict]) -> AsyncIterator[Dict]:
+        """요청들을 최대 concurrency개씩 동시에 처리하며 끝나는 순서대로 결과를 내보냅니다."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(raw):
+            async with semaphore:
+                return await self.plan(raw)
+
+        tasks = [asyncio.ensure_future(bounded(raw)) for raw in requests]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def run_plans(requests: List[Dict], output, concurrency: int = 20,
+                    checkpoint: Optional[Checkpoint] = None) -> int:
+    """계획을 생성하여 output에 JSONL로 한 줄씩 기록합니다. 성공한 요청 수를 반환합니다."""
+    if checkpoint is not None:
+        requests = [raw for raw in requests if not checkpoint.is_done(request_key(raw))]
+
+    succeeded = 0
+    async with AsyncPlacesClient(max_concurrency=concurrency * 4) as client:
+        planner = BatchPlanner(client, concurrency=concurrency)
+        async for result in planner.plan_many(requests):
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            if result["status"] == "ok":
+                succeeded += 1
+                # 실패한 요청은 기록하지 않아 다음 실행 때 다시 시도됨
+                if checkpoint is not None:
+                    checkpoint.mark_done(result["request_id"])
+    return succeeded
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="여행 계획 배치 생성")
+    parser.add_argument("requests", help="요청 목록 (JSONL, JSON 또는 CSV)")
+    parser.add_argument("-o", "--output", help="결과 JSONL 경로 (기본: 표준 출력)")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시에 처리할 요청 수")
+    parser.add_argument("--checkpoint-dir", help="완료된 요청을 기록할 디렉토리 (이어서 실행)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    requests = load_catalogue(args.requests)
+    checkpoint = Checkpoint(args.checkpoint_dir, "plans") if args.checkpoint_dir else None
+
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        succeeded = asyncio.run(run_plans(requests, output, args.concurrency, checkpoint))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    logger.info(f"Planned {succeeded}/{len(requests)} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import csv
+import json
+import logging
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def load_catalogue(path: str) -> List[Dict]:
+    """
+    CSV, JSON 또는 JSONL 파일에서 작업 목록(여행지 등)을 읽어옵니다.
+
+    JSON 파일은 dict 리스트이거나 {"items": [...]} 형태여야 합니다.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8-sig") as f:
+        if ext == ".csv":
+            return [
+                {key: value.strip() for key, value in row.items() if key}
+                for row in csv.DictReader(f)
+            ]
+        if ext == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        if ext == ".json":
+            data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("items", [])
+            return list(data)
+    raise ValueError(f"Unsupported catalogue format: {path}")
+
+
+def shard_items(items: Iterable, shard_index: int, shard_count: int,
+                key_fn: Callable[[Any], str]) -> List:
+    """
+    작업 키의 CRC32 값으로 샤드를 나눕니다.
+    (파이썬 hash()와 달리 프로세스/머신이 달라도 같은 결과를 보장)
+    """
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid shard {shard_index}/{shard_count}")
+    return [
+        item for item in items
+        if zlib.crc32(key_fn(item).encode("utf-8")) % shard_count == shard_index
+    ]
+
+
+class Checkpoint:
+    """
+    완료된 작업 키를 JSONL 파일에 기록하여 중단 후 이어서 실행할 수 있게 합니다.
+    """
+
+    def __init__(self, directory: str, name: str = "progress"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self._done = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 기록 도중 중단된 마지막 줄은 무시
+                        continue
+                    self._done[record["key"]] = record
+
+    def is_done(self, key: str) -> bool:
+        return key in self._done
+
+    @property
+    def done_keys(self) -> List[str]:
+        return list(self._done)
+
+    def mark_done(self, key: str, **info):
+        record = {"key": key, **info}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._done[key] = record
+
+
+def run_batch(items: List, task_fn: Callable[[Any], Any], key_fn: Callable[[Any], str],
+              checkpoint: Optional[Checkpoint] = None, workers: int = 1,
+              initializer: Optional[Callable] = None, initargs: tuple = (),
+              on_result: Optional[Callable[[Any, Any], Optional[Dict]]] = None) -> int:
+    """
+    작업 목록을 실행하고, 완료될 때마다 on_result 호출 후 체크포인트에 기록합니다.
+
+    workers > 1이면 프로세스 풀에서 실행하므로 task_fn/initializer는 모듈 최상위 함수여야 합니다.
+    실패한 작업은 기록하지 않으므로 다음 실행 때 다시 시도됩니다.
+
+    Returns:
+        이번 실행에서 완료된 작업 수
+    """
+    pending = [item for item in items if checkpoint is None or not checkpoint.is_done(key_fn(item))]
+    if checkpoint is not None and len(pending) < len(items):
+        logger.info(f"Skipping {len(items) - len(pending)} completed items from checkpoint")
+
+    completed = 0
+
+    def finish(item, result):
+        nonlocal completed
+        info = on_result(item, result) if on_result else None
+        if checkpoint is not None:
+            checkpoint.mark_done(key_fn(item), **(info or {}))
+        completed += 1
+
+    if workers <= 1:
+        if initializer:
+            initializer(*initargs)
+        for item in pending:
+            try:
+                result = task_fn(item)
+            except Exception as e:
+                logger.error(f"Error processing {key_fn(item)}: {str(e)}")
+                continue
+            finish(item, result)
+        return completed
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        futures = {executor.submit(task_fn, item): item for item in pending}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error processing {key_fn(item)}: {str(e)}")
+                continue
+            finish(item, result)
+    return completed
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.lazy import lazy_module
+from utils.places_helper import calculate_place_score
+from utils.tracing import traced
+
+np = lazy_module("numpy")
+
+# price_level(0~4) → 예상 비용 (KRW)
+HOTEL_NIGHTLY_COST = {0: 50000, 1: 70000, 2: 120000, 3: 220000, 4: 400000}  # 객실 1박
+PLACE_VISIT_COST = {0: 0, 1: 10000, 2: 25000, 3: 50000, 4: 100000}          # 1인 1회 방문
+UNKNOWN_HOTEL_LEVEL = 2
+UNKNOWN_PLACE_COST = 10000  # price_level이 없는 관광지 (입장료 등)
+
+GUESTS_PER_ROOM = 2
+PLACES_PER_DAY = 3
+
+# 예산을 최대 MAX_CAPACITY_UNITS 칸으로 나눠 DP (칸 크기는 최소 1,000원)
+MIN_UNIT = 1000
+MAX_CAPACITY_UNITS = 1000
+MAX_DP_CELLS = 30_000_000
+TIME_LIMIT = 0.15
+
+
+def hotel_cost(hotel: Dict, nights: int, party_size: int) -> int:
+    """숙박 기간 전체의 예상 호텔 비용 (2인 1실 기준)"""
+    level = hotel.get("price_level") or UNKNOWN_HOTEL_LEVEL
+    rooms = math.ceil(max(party_size, 1) / GUESTS_PER_ROOM)
+    return HOTEL_NIGHTLY_COST.get(int(level), HOTEL_NIGHTLY_COST[UNKNOWN_HOTEL_LEVEL]) * rooms * nights
+
+
+def place_cost(place: Dict, party_size: int) -> int:
+    """일행 전체의 예상 방문 비용"""
+    level = place.get("price_level")
+    per_person = UNKNOWN_PLACE_COST if level is None else PLACE_VISIT_COST.get(int(level), UNKNOWN_PLACE_COST)
+    return per_person * max(party_size, 1)
+
+
+def place_score(place: Dict) -> float:
+    """관련성 점수 (호텔은 relevance_score, 장소는 평점/리뷰 수 기반 점수)"""
+    if "relevance_score" in place:
+        return float(place["relevance_score"])
+    return max(calculate_place_score(place), 0.0)
+
+
+def _knapsack(costs: np.ndarray, scores: np.ndarray, max_items: int, capacity: int,
+              deadline: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    개수 제한이 있는 0/1 배낭 문제 DP.
+
+    best[k, c]는 비용 c 이하로 정확히 k개를 고를 때의 최대 점수이고,
+    take[i, k, c]는 그 상태에서 i번째 후보를 골랐는지 여부입니다 (역추적용).
+    deadline을 넘기면 None을 반환합니다.
+    """
+    best = np.full((max_items + 1, capacity + 1), -np.inf)
+    best[0, :] = 0.0
+    take = np.zeros((len(costs), max_items + 1, capacity + 1), dtype=bool)
+    for i, (w, v) in enumerate(zip(costs, scores)):
+        if w > capacity:
+            continue
+        candidate = best[:-1, :capacity + 1 - w] + v
+        region = best[1:, w:]
+        improve = candidate > region
+        region[improve] = candidate[improve]
+        take[i, 1:, w:] = improve
+        if time.perf_counter() > deadline:
+            return None
+    return best, take
+
+
+def _backtrack(take: np.ndarray, costs: np.ndarray, count: int, capacity: int) -> List[int]:
+    chosen = []
+    for i in range(len(costs) - 1, -1, -1):
+        if count == 0:
+            break
+        if take[i, count, capacity]:
+            chosen.append(i)
+            capacity -= costs[i]
+            count -= 1
+    return chosen[::-1]
+
+
+def _greedy(costs: List[int], scores: List[float], max_items: int, budget: int) -> List[int]:
+    """점수/비용 비율 순으로 예산이 허락하는 만큼 고르는 근사 해법"""
+    order = sorted(range(len(costs)), key=lambda i: -scores[i] / max(costs[i], 1))
+    chosen, spent = [], 0
+    for i in order:
+        if len(chosen) >= max_items:
+            break
+        if spent + costs[i] <= budget:
+            chosen.append(i)
+            spent += costs[i]
+    return chosen
+
+
+def split_by_day(places: List[Dict], days: int,
+                 can_visit: Optional[Callable[[Dict, int], bool]] = None) -> List[List[Dict]]:
+    """
+    점수순 장소를 날짜별로 번갈아 배정합니다 (하루에 좋은 곳이 몰리지 않도록).
+    can_visit(place, day_index)가 주어지면 방문 가능한 날 중 가장 덜 찬 날에 배정하고,
+    어느 날에도 갈 수 없는 장소는 뺍니다.
+    """
+    ranked = sorted(places, key=place_score, reverse=True)
+    if can_visit is None:
+        return [ranked[day::days] for day in range(days)]
+    daily: List[List[Dict]] = [[] for _ in range(days)]
+    for place in ranked:
+        open_days = [day for day in range(days) if can_visit(place, day)]
+        if open_days:
+            daily[min(open_days, key=lambda day: len(daily[day]))].append(place)
+    return daily
+
+
+@traced("budget.optimize_plan")
+def optimize_plan(hotels: List[Dict], places: List[Dict], budget: int, party_size: int = 1,
+                  nights: int = 1, days: Optional[int] = None, places_per_day: int = PLACES_PER_DAY,
+                  time_limit: float = TIME_LIMIT,
+                  can_visit: Optional[Callable[[Dict, int], bool]] = None) -> Dict:
+    """
+    예산 안에서 호텔 1곳과 날짜별 방문 장소를 골라 관련성 점수 합을 최대화합니다.
+    (호텔 relevance_score × 숙박 일수 + 장소 점수 합)
+
+    장소는 개수 제한(days * places_per_day)이 있는 배낭 문제로 한 번만 풀고, 호텔마다 남은 예산에서
+    가장 좋은 장소 조합을 표에서 찾습니다. 비용은 칸 단위로 올림하므로 결과는 항상 예산 안에 있습니다.
+    문제가 너무 크거나 time_limit을 넘기면 탐욕법으로 대신합니다.
+    can_visit(place, day_index)가 있으면 여행 기간 중 하루도 갈 수 없는 장소는 후보에서 빼고,
+    나머지는 방문 가능한 날에만 배정합니다.
+
+    Returns:
+        {"hotel", "places", "daily_places", "hotel_cost", "places_cost", "total_cost",
+         "budget", "score", "method"} — 예산 안에서 호텔을 고를 수 없으면 hotel은 None
+    """
+    # numpy import(첫 호출)가 time_limit을 써 버리지 않도록 타이머 전에 불러옴
+    np.ndarray
+    deadline = time.perf_counter() + time_limit
+    days = max(days if days is not None else nights, 1)
+    if can_visit is not None:
+        places = [place for place in places if any(can_visit(place, day) for day in range(days))]
+    max_items = min(days * places_per_day, len(places))
+
+    place_costs = [place_cost(place, party_size) for place in places]
+    place_scores = [place_score(place) for place in places]
+    # 숙박이 없거나 호텔 후보가 없으면 호텔 없이 계획. 호텔 점수는 묵는 밤 수만큼 반영
+    hotel_options: List[Tuple[Optional[Dict], int, float]] = [(None, 0, 0.0)]
+    if nights > 0 and hotels:
+        hotel_options = [
+            (hotel, hotel_cost(hotel, nights, party_size), place_score(hotel) * nights)
+            for hotel in hotels
+        ]
+
+    unit = max(MIN_UNIT, math.ceil(budget / MAX_CAPACITY_UNITS))
+    capacity = max(budget, 0) // unit
+    cost_units = np.array([math.ceil(cost / unit) for cost in place_costs], dtype=np.int64)
+
+    table = None
+    if places and len(places) * (max_items + 1) * (capacity + 1) <= MAX_DP_CELLS:
+        table = _knapsack(cost_units, np.array(place_scores), max_items, capacity, deadline)
+
+    def best_places(remaining: int) -> Tuple[float, List[int]]:
+        if table is not None:
+            values, take = table
+            column = values[:, remaining // unit]
+            count = int(np.argmax(column))
+            return float(column[count]), _backtrack(take, cost_units, count, int(remaining // unit))
+        chosen = _greedy(place_costs, place_scores, max_items, remaining)
+        return sum(place_scores[i] for i in chosen), chosen
+
+    best = None
+    for hotel, cost, score in hotel_options:
+        if cost > budget:
+            continue
+        value, chosen = best_places(budget - cost)
+        if best is None or score + value > best[0]:
+            best = (score + value, hotel, cost, chosen)
+
+    if best is None:
+        # 예산으로 묵을 수 있는 호텔이 없으면 장소만 고름
+        value, chosen = best_places(max(budget, 0))
+        best = (value, None, 0, chosen)
+
+    total, hotel, cost, chosen = best
+    selected = [places[i] for i in chosen]
+    places_total = sum(place_costs[i] for i in chosen)
+    return {
+        "hotel": hotel,
+        "places": selected,
+        "daily_places": split_by_day(selected, days, can_visit),
+        "hotel_cost": cost,
+        "places_cost": places_total,
+        "total_cost": cost + places_total,
+        "budget": budget,
+        "score": round(total, 1),
+        "method": "dp" if table is not None else "greedy"
+    }
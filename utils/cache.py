@@ -0,0 +1,232 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    만료 시간(TTL)과 최대 크기를 가진 스레드 안전 메모리 캐시입니다.
+    최대 크기를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, ttl: float = 3600, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _key_text(key: Hashable) -> str:
+    # 캐시 키는 문자열/숫자/None과 그 튜플(NamedTuple 포함)이므로 repr이 프로세스 간에 같음
+    return repr(key)
+
+
+class SQLiteCache:
+    """
+    여러 프로세스가 같은 파일을 공유하는 TTLCache 호환 캐시입니다 (WAL 모드).
+
+    만료 시각은 프로세스 간에 비교할 수 있도록 벽시계(time.time) 기준이며, 값은 pickle로 저장합니다.
+    최대 크기는 prune_interval번 저장할 때마다 만료된 항목과 만료가 가장 가까운 항목을 지워 맞춥니다.
+    """
+
+    def __init__(self, path: str, namespace: str, ttl: float = 3600, maxsize: int = 1024,
+                 prune_interval: int = 256):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, _key_text(key))
+            ).fetchone()
+            if row is not None and row[1] > time.time():
+                self.hits += 1
+                return pickle.loads(row[0])
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, _key_text(key), data, expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.prune_interval == 0:
+                self._prune()
+
+    def _prune(self):
+        self._conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+                           (self.namespace, time.time()))
+        self._conn.execute(
+            """
+            DELETE FROM cache WHERE namespace = ? AND key IN (
+                SELECT key FROM cache WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.namespace, self.namespace, self.maxsize)
+        )
+
+    def delete(self, key: Hashable):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?",
+                               (self.namespace, _key_text(key)))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ? AND expires_at > ?",
+                (self.namespace, time.time())
+            ).fetchone()[0]
+
+
+class RedisCache:
+    """
+    Redis(또는 호환 서버)를 쓰는 TTLCache 호환 캐시입니다. redis 패키지는 처음 생성할 때 불러옵니다.
+    만료는 서버의 TTL(SETEX)로, 최대 크기는 서버의 maxmemory 정책으로 관리합니다.
+    """
+
+    def __init__(self, url: str, namespace: str, ttl: float = 3600, maxsize: int = 1024):
+        import redis
+
+        self.namespace = namespace
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._client = redis.Redis.from_url(url)
+        self._prefix = f"navi:{namespace}:"
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        data = self._client.get(self._prefix + _key_text(key))
+        if data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(data)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._client.set(self._prefix + _key_text(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                         px=int((self.ttl if ttl is None else ttl) * 1000))
+
+    def delete(self, key: Hashable):
+        self._client.delete(self._prefix + _key_text(key))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._client.exists(self._prefix + _key_text(key)) > 0
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=self._prefix + "*"))
+
+
+# 캐시 백엔드 (NAVI_CACHE_BACKEND)
+#   미설정/"memory"          프로세스별 메모리 캐시 (기본)
+#   "sqlite" 또는 "sqlite:///경로"  같은 파일을 쓰는 모든 프로세스가 공유 (기본 경로 navi_cache.db)
+#   "redis://호스트:포트/DB"   Redis 호환 서버를 공유
+DEFAULT_SQLITE_CACHE_PATH = "navi_cache.db"
+
+_caches: Dict[str, Any] = {}
+_caches_lock = threading.Lock()
+
+
+def _create_cache(namespace: str, ttl: float, maxsize: int):
+    backend = os.environ.get("NAVI_CACHE_BACKEND", "memory")
+    if backend == "memory":
+        return TTLCache(ttl=ttl, maxsize=maxsize)
+    if backend == "sqlite" or backend.startswith("sqlite:///"):
+        path = backend[len("sqlite:///"):] or DEFAULT_SQLITE_CACHE_PATH
+        return SQLiteCache(path, namespace, ttl=ttl, maxsize=maxsize)
+    if backend.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(backend, namespace, ttl=ttl, maxsize=maxsize)
+    raise ValueError(f"Unknown NAVI_CACHE_BACKEND: {backend}")
+
+
+def get_cache(namespace: str, ttl: float = 3600, maxsize: int = 1024):
+    """
+    이름별로 공유되는 캐시를 반환합니다. 처음 요청될 때 주어진 설정으로 생성됩니다.
+
+    NAVI_CACHE_BACKEND가 sqlite/redis이면 여러 Streamlit 워커 프로세스가 같은 캐시를 보므로
+    한 워커가 가져온 검색 결과를 다른 워커도 API 호출 없이 사용합니다.
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = _create_cache(namespace, ttl, maxsize)
+        return cache
@@ -0,0 +1,124 @@
+"""
+여행지별 후보 장소 풀.
+
+호텔(6), 음식점(7), 관광지(8), 예산 일정(9) 섹션은 모두 같은 여행지 주변을 Nearby Search로 훑습니다.
+풀은 요청(NearbyQuery) 하나의 결과(sweep)를 여행지·요청·반경별로 공유 캐시에 저장하고,
+섹션이 필요한 요청 중 아직 없는 것만 검색해 풀을 넓힙니다. 그래서
+
+- 검색 반경(geocode)은 여행지마다 한 번만 계산하고
+- 테마를 바꾸면 새로 추가된 type만 검색하며
+- 섹션을 오가거나 같은 여행지를 고른 다른 세션은 검색 요청 없이 풀에서 결과를 만듭니다.
+
+동기(places_helper, hotels_helper)와 비동기(async_places) 클라이언트가 같은 sweep 캐시를 사용합니다.
+SWEEP_TTL이 지난 sweep은 바로 사용하면서 백그라운드에서 갱신하고, Nearby Search 회로가 열려 있는
+동안에는 SWEEP_STALE_TTL까지 오래된 sweep을 그대로 사용합니다 (utils.resilience).
+
+Example:
+    pool = CandidatePool(location)
+    restaurants = pool.places(["음식/맛집"])
+    attractions = pool.places(["박물관", "관광명소"])   # 음식점 sweep은 그대로, 새 type만 검색
+    lodging = pool.lodging()                             # 호텔 검색용 후보 (상세 정보는 hotels_helper)
+"""
+import threading
+from typing import Dict, List, Optional
+
+from utils.cache import get_cache
+from utils.geo import annotate_distances
+from utils.places_helper import calculate_city_radius, parse_nearby_place, rank_places, search_nearby
+from utils.query_planner import NearbyQuery, get_query_planner
+from utils.resilience import StaleCache
+from utils.result_store import location_key
+from utils.tracing import record_cache, span
+
+SWEEP_TTL = 6 * 60 * 60  # 평점/리뷰 수는 천천히 바뀌므로 몇 시간 동안 재사용
+SWEEP_STALE_TTL = 7 * 24 * 60 * 60  # 장애 때 대신 사용할 오래된 sweep 보관 기간
+NEARBY_ENDPOINT = "google.places.nearbysearch"
+LODGING_QUERY = NearbyQuery("lodging")
+HOTEL_RADIUS = 5000
+HOTEL_MAX_PAGES = 2  # 페이지당 20개, 총 40개
+
+SWEEP_LOCK_STRIPES = 64  # 키 해시로 나눠 쓰는 잠금 수 (키별 잠금을 계속 쌓아 두지 않도록 고정)
+
+_sweeps: Optional[StaleCache] = None
+_sweeps_lock = threading.Lock()
+_sweep_locks = [threading.Lock() for _ in range(SWEEP_LOCK_STRIPES)]
+
+
+def sweep_cache() -> StaleCache:
+    """(여행지, 요청, 반경) → 파싱된 장소 목록 (stale-while-revalidate)"""
+    global _sweeps
+    with _sweeps_lock:
+        if _sweeps is None:
+            _sweeps = StaleCache(get_cache("candidate_sweeps", ttl=SWEEP_STALE_TTL, maxsize=8192),
+                                 fresh_ttl=SWEEP_TTL, endpoint=NEARBY_ENDPOINT)
+        return _sweeps
+
+
+def sweep_key(location: Dict[str, float], query: NearbyQuery, radius: int) -> tuple:
+    return (location_key(location), tuple(query), int(radius))
+
+
+def _sweep_lock(key: tuple) -> threading.Lock:
+    """
+    같은 sweep을 여러 세션이 동시에 요청하면 한 번만 검색하도록 키별 잠금.
+    고정된 잠금 중 키 해시로 하나를 고르므로, 드물게 다른 키끼리 같은 잠금을 기다릴 수 있습니다.
+    """
+    return _sweep_locks[hash(key) % SWEEP_LOCK_STRIPES]
+
+
+class CandidatePool:
+    """한 여행지의 후보 장소 풀 (상태는 공유 sweep 캐시에 있으므로 가볍게 만들어 써도 됨)"""
+
+    def __init__(self, location: Dict[str, float]):
+        self.location = location
+        self._radius: Optional[int] = None
+
+    @property
+    def radius(self) -> int:
+        """도시 크기에 따른 검색 반경 (city_radius 캐시를 통해 여행지마다 한 번 계산)"""
+        if self._radius is None:
+            self._radius = calculate_city_radius(self.location)
+        return self._radius
+
+    def sweep(self, query: NearbyQuery, radius: Optional[int] = None,
+              max_pages: Optional[int] = None) -> List[Dict]:
+        """
+        요청 하나의 결과. 풀에 없을 때만 검색하며, 오래된 sweep은 그대로 쓰면서 백그라운드에서 갱신합니다.
+        일시적 오류는 캐시하지 않고 빈 목록을 반환합니다.
+        """
+        radius = radius or self.radius
+        key = sweep_key(self.location, query, radius)
+        sweeps = sweep_cache()
+        fetch = lambda: self._fetch(query, radius, max_pages)
+        with span("places.candidate_sweep", query=query.label, radius=radius):
+            places, fresh = sweeps.lookup(key)
+            record_cache(places is not None)
+            if places is None:
+                with _sweep_lock(key):
+                    places = sweeps.get_or_fetch(key, fetch)
+            elif not fresh:
+                sweeps.get_or_fetch(key, fetch)
+            return places or []
+
+    def _fetch(self, query: NearbyQuery, radius: int, max_pages: Optional[int]) -> Optional[List[Dict]]:
+        try:
+            results = search_nearby(self.location, radius, query, max_pages=max_pages)
+        except Exception as e:
+            print(f"Error fetching places for type {query.label}: {str(e)}")
+            return None
+        get_query_planner().record(self.location, query, len(results))
+        return [parse_nearby_place(place, query.label) for place in results]
+
+    def places(self, selected_themes: List[str], limit: int = 50) -> List[Dict]:
+        """
+        테마에 해당하는 요청들의 sweep을 합쳐 점수순 상위 limit개를 반환합니다.
+        반환 dict는 복사본이므로 화면 쪽에서 필드를 덧붙여도 풀은 바뀌지 않습니다.
+        """
+        queries = get_query_planner().plan(selected_themes, self.location)
+        all_places = [place for query in queries for place in self.sweep(query)]
+        ranked = [dict(place) for place in rank_places(all_places, limit)]
+        return annotate_distances(ranked, self.location)
+
+    def lodging(self, radius: int = HOTEL_RADIUS) -> List[Dict]:
+        """호텔 검색 후보 (lodging sweep, 최대 2페이지)"""
+        return self.sweep(LODGING_QUERY, radius, max_pages=HOTEL_MAX_PAGES)
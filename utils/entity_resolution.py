@@ -0,0 +1,292 @@
+"""
+출처별 장소 레코드(Google place_id, 네이버 지역 검색, 카카오 이미지 검색어, YouTube specific_place)를
+하나의 장소(entity)로 묶는 색인.
+
+이름은 정규화 후 자모 단위 편집 거리로, 위치가 있으면 거리로 비교합니다. 모든 쌍을 비교하지 않도록
+초성 접두어/정규화 이름/위치 격자 블로킹 키를 공유하는 후보하고만 비교합니다.
+
+Example:
+    index = get_entity_index()
+    entity_id = index.add("google", place["place_id"], place["name"], place["location"])
+    index.add("youtube", "광안리해수욕장", "광안리해수욕장", city="부산")
+    index.linked_id(entity_id, "youtube")   # → "광안리해수욕장"
+"""
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.geo import coordinates, haversine_m, haversine_many
+
+# 한글 음절 분해 (유니코드 한글 음절 = 0xAC00 + (초성 * 21 + 중성) * 28 + 종성)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+              "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# 같은 뜻의 장소 유형 표기 통일
+NAME_ALIASES = {
+    "해수욕장": "해변",
+    "뮤지엄": "박물관",
+    "전통시장": "시장",
+}
+
+# 비교 전에 떼어내는 지점 표기
+BRANCH_SUFFIXES = ("본점", "직영점")
+
+GRID_SIZE = 0.01          # 위치 블로킹 격자 (약 1km)
+MAX_DISTANCE_M = 2000     # 이 거리보다 멀면 같은 장소로 보지 않음
+MATCH_THRESHOLD = 0.8     # 위치가 있을 때의 최소 결합 점수
+NAME_ONLY_THRESHOLD = 0.9 # 한쪽에 위치가 없을 때의 최소 이름 유사도
+
+
+def normalize_name(name: str) -> str:
+    """HTML 태그·괄호·공백·기호를 지우고 소문자/NFC로 통일합니다."""
+    name = unicodedata.normalize("NFC", name or "")
+    name = re.sub(r"<[^>]+>", "", name)
+    name = re.sub(r"\([^)]*\)|\[[^\]]*\]", "", name)
+    name = re.sub(r"[\W_]+", "", name.lower())
+    for suffix in BRANCH_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            name = name[:-len(suffix)]
+    for alias, canonical in NAME_ALIASES.items():
+        if name.endswith(alias):
+            name = name[:-len(alias)] + canonical
+            break
+    return name
+
+
+def to_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 풀어 씁니다 (그 외 문자는 그대로)."""
+    jamo = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            offset = code - _HANGUL_BASE
+            jamo.append(_CHOSEONG[offset // 588])
+            jamo.append(_JUNGSEONG[offset % 588 // 28])
+            jamo.append(_JONGSEONG[offset % 28])
+        else:
+            jamo.append(ch)
+    return "".join(jamo)
+
+
+def choseong(text: str) -> str:
+    """한글 음절의 초성만 (그 외 문자는 그대로)"""
+    return "".join(
+        _CHOSEONG[(ord(ch) - _HANGUL_BASE) // 588] if _HANGUL_BASE <= ord(ch) <= _HANGUL_LAST else ch
+        for ch in text
+    )
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def name_similarity(a: str, b: str) -> float:
+    """
+    정규화된 두 이름의 자모 단위 유사도 (0~1).
+    한쪽 이름이 다른 쪽에 포함되면(예: "우도" ⊂ "우도해양도립공원") 0.9로 봅니다.
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    if min(len(a), len(b)) >= 2 and (a in b or b in a):
+        return 0.9
+    jamo_a, jamo_b = to_jamo(a), to_jamo(b)
+    return 1 - edit_distance(jamo_a, jamo_b) / max(len(jamo_a), len(jamo_b))
+
+
+def _grid_cell(location: Dict[str, float]) -> Tuple[int, int]:
+    return (math.floor(location["lat"] / GRID_SIZE), math.floor(location["lng"] / GRID_SIZE))
+
+
+class EntityIndex:
+    """
+    장소 entity 색인입니다.
+
+    entity는 {"entity_id", "name", "normalized", "location", "city", "sources"} dict이며
+    sources는 출처별 ID 목록({"google": [...], "naver": [...], ...})입니다.
+    """
+
+    def __init__(self, max_distance: float = MAX_DISTANCE_M, threshold: float = MATCH_THRESHOLD,
+                 name_only_threshold: float = NAME_ONLY_THRESHOLD):
+        self.max_distance = max_distance
+        self.threshold = threshold
+        self.name_only_threshold = name_only_threshold
+        self.entities: Dict[int, Dict] = {}
+        self._by_source: Dict[Tuple[str, str], int] = {}
+        self._blocks: Dict[Tuple, Set[int]] = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def _name_keys(self, normalized: str) -> List[Tuple]:
+        return [("name", normalized), ("prefix", choseong(normalized[:2]))]
+
+    def _candidates(self, normalized: str, location: Optional[Dict[str, float]]) -> Set[int]:
+        candidates: Set[int] = set()
+        for key in self._name_keys(normalized):
+            candidates |= self._blocks.get(key, set())
+        if location:
+            lat, lng = _grid_cell(location)
+            for dlat in (-1, 0, 1):
+                for dlng in (-1, 0, 1):
+                    candidates |= self._blocks.get(("cell", lat + dlat, lng + dlng), set())
+        return candidates
+
+    def _score(self, entity: Dict, normalized: str, location: Optional[Dict[str, float]],
+               city: Optional[str], distance: Optional[float] = None) -> float:
+        if location and entity["location"]:
+            if distance is None:
+                distance = haversine_m(entity["location"], location)
+            # 거리로 먼저 걸러 자모 편집 거리 계산을 줄임
+            if distance > self.max_distance:
+                return 0.0
+            similarity = name_similarity(entity["normalized"], normalized)
+            score = 0.7 * similarity + 0.3 * (1 - distance / self.max_distance)
+            return score if score >= self.threshold else 0.0
+        # 위치를 비교할 수 없으면 이름이 거의 같고 도시가 다르지 않아야 함
+        if city and entity["city"] and normalize_name(city) != normalize_name(entity["city"]):
+            return 0.0
+        similarity = name_similarity(entity["normalized"], normalized)
+        return similarity if similarity >= self.name_only_threshold else 0.0
+
+    def resolve(self, name: str, location: Optional[Dict[str, float]] = None,
+                city: Optional[str] = None) -> Optional[int]:
+        """가장 잘 맞는 entity_id (없거나, 이름만으로 여러 entity와 맞아 정할 수 없으면 None)"""
+        normalized = normalize_name(name)
+        if not normalized:
+            return None
+        with self._lock:
+            candidates = list(self._candidates(normalized, location))
+            distances: Dict[int, float] = {}
+            if location:
+                # 위치가 있는 후보들의 거리는 한 번에 계산
+                located = [entity_id for entity_id in candidates if self.entities[entity_id]["location"]]
+                if located:
+                    coords = coordinates(self.entities[entity_id]["location"] for entity_id in located)
+                    distances = dict(zip(located, haversine_many(location, coords).tolist()))
+            best_id, best_score = None, 0.0
+            name_only = []
+            for entity_id in candidates:
+                entity = self.entities[entity_id]
+                score = self._score(entity, normalized, location, city, distances.get(entity_id))
+                if score and not (location and entity["location"]):
+                    name_only.append(entity_id)
+                if score > best_score:
+                    best_id, best_score = entity_id, score
+            # 위치를 비교하지 못한 채 이름만으로 여러 entity(다른 도시의 같은 이름 등)와 맞으면
+            # 어느 쪽인지 알 수 없으므로 합치지 않음
+            if best_id in name_only and len(name_only) > 1:
+                return None
+            return best_id
+
+    def add(self, source: str, source_id: str, name: str, location: Optional[Dict[str, float]] = None,
+            city: Optional[str] = None) -> Optional[int]:
+        """
+        출처 레코드를 색인에 넣고 연결된 entity_id를 반환합니다.
+        이미 등록된 (source, source_id)는 다시 비교하지 않습니다.
+        """
+        with self._lock:
+            existing = self._by_source.get((source, source_id))
+            if existing is not None:
+                return existing
+
+            normalized = normalize_name(name)
+            if not normalized:
+                return None
+            entity_id = self.resolve(name, location, city)
+            if entity_id is None:
+                entity_id = len(self.entities)
+                self.entities[entity_id] = {
+                    "entity_id": entity_id,
+                    "name": name,
+                    "normalized": normalized,
+                    "location": location,
+                    "city": city,
+                    "sources": {}
+                }
+                for key in self._name_keys(normalized):
+                    self._blocks[key].add(entity_id)
+            entity = self.entities[entity_id]
+            # 나중에 들어온 레코드가 위치/도시를 채워줄 수 있음
+            if location and not entity["location"]:
+                entity["location"] = location
+            if city and not entity["city"]:
+                entity["city"] = city
+            if entity["location"]:
+                self._blocks[("cell",) + _grid_cell(entity["location"])].add(entity_id)
+
+            entity["sources"].setdefault(source, [])
+            if source_id not in entity["sources"][source]:
+                entity["sources"][source].append(source_id)
+            self._by_source[(source, source_id)] = entity_id
+            return entity_id
+
+    def add_many(self, source: str, records: Iterable[Dict]) -> List[Optional[int]]:
+        """{"source_id", "name", "location"?, "city"?} 레코드들을 한 번에 넣습니다."""
+        return [
+            self.add(source, record["source_id"], record["name"], record.get("location"), record.get("city"))
+            for record in records
+        ]
+
+    def entity_for(self, source: str, source_id: str) -> Optional[Dict]:
+        entity_id = self._by_source.get((source, source_id))
+        return None if entity_id is None else self.entities[entity_id]
+
+    def linked_id(self, entity_id: int, source: str) -> Optional[str]:
+        """entity에 연결된 source의 첫 번째 ID"""
+        ids = self.entities[entity_id]["sources"].get(source)
+        return ids[0] if ids else None
+
+    def link_table(self, sources: Iterable[str]) -> List[Dict]:
+        """entity별 출처 ID 표 (일괄 join용). 각 출처의 첫 번째 ID만 포함합니다."""
+        sources = list(sources)
+        with self._lock:
+            return [
+                {"entity_id": entity_id, "name": entity["name"],
+                 **{source: self.linked_id(entity_id, source) for source in sources}}
+                for entity_id, entity in self.entities.items()
+            ]
+
+
+def google_record(place: Dict) -> Dict:
+    return {"source_id": place["place_id"], "name": place["name"], "location": place.get("location")}
+
+
+def naver_record(item: Dict, city: Optional[str] = None) -> Dict:
+    """네이버 지역 검색 결과 (get_location_details 형식: title, address, location)"""
+    return {
+        "source_id": item.get("link") or normalize_name(item["title"]),
+        "name": item["title"],
+        "location": item.get("location"),
+        "city": city
+    }
+
+
+def kakao_record(query: str, city: Optional[str] = None) -> Dict:
+    """카카오 이미지 검색어 (image_search.normalize_query로 정규화된 값)"""
+    return {"source_id": query, "name": query, "city": city}
+
+
+def youtube_record(row: Dict) -> Dict:
+    """YouTube 분석 대상 (specific_place, city)"""
+    return {"source_id": row["specific_place"], "name": row["specific_place"], "city": row.get("city")}
+
+
+_index = EntityIndex()
+
+
+def get_entity_index() -> EntityIndex:
+    """프로세스 전체에서 공유하는 entity 색인"""
+    return _index
@@ -0,0 +1,380 @@
+import argparse
+import math
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from utils.entity_resolution import EntityIndex, normalize_name
+from utils.video_store import TIMESTAMP_FORMAT, format_timestamp, utc_now
+
+SIGNALS = ["rating", "review_count", "search_trend", "video_views", "video_engagement", "recency"]
+
+# 종합 점수 가중치 (값이 없는 신호는 빼고 나머지 가중치로 다시 나눔)
+SIGNAL_WEIGHTS = {
+    "rating": 0.25,
+    "review_count": 0.25,
+    "search_trend": 0.2,
+    "video_views": 0.15,
+    "video_engagement": 0.05,
+    "recency": 0.1,
+}
+
+# 최근 활동(영상 게시 등)의 반감기 (일)
+RECENCY_HALF_LIFE_DAYS = 30
+# 정규화 구간: 전체 장소 값의 5~95 백분위
+LOW_PERCENTILE, HIGH_PERCENTILE = 5, 95
+
+FEATURE_COLUMNS = ["rating", "review_count", "search_trend", "video_views", "video_engagement", "last_activity_at"]
+
+
+def alias_scope(alias: str, location: Optional[Dict[str, float]], city: Optional[str]) -> str:
+    """
+    별칭 테이블 키. 같은 이름이라도 다른 곳의 장소가 한 행으로 합쳐지지 않도록
+    위치가 있으면 약 1km 격자, 없으면 도시로 범위를 정합니다.
+    """
+    if location:
+        return f"{alias}@{round(location['lat'], 2)},{round(location['lng'], 2)}"
+    if city:
+        return f"{alias}@{normalize_name(city)}"
+    return alias
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def transform_signals(row: Dict, now: datetime) -> Dict[str, float]:
+    """저장된 원시 값을 점수 계산용 신호로 변환 (개수는 log1p, 최근성은 지수 감쇠)"""
+    signals = {}
+    if row.get("rating") is not None:
+        signals["rating"] = float(row["rating"])
+    if row.get("review_count") is not None:
+        signals["review_count"] = math.log1p(row["review_count"])
+    if row.get("search_trend") is not None:
+        signals["search_trend"] = float(row["search_trend"])
+    if row.get("video_views") is not None:
+        signals["video_views"] = math.log1p(row["video_views"])
+    if row.get("video_engagement") is not None:
+        signals["video_engagement"] = float(row["video_engagement"])
+    if row.get("last_activity_at"):
+        days = max((now - _parse_timestamp(row["last_activity_at"])).total_seconds() / 86400, 0)
+        signals["recency"] = 0.5 ** (days / RECENCY_HALF_LIFE_DAYS)
+    return signals
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(index)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (index - lower)
+
+
+def combined_score(signals: Dict[str, float], stats: Dict[str, tuple]) -> Optional[float]:
+    """정규화 구간(stats)으로 각 신호를 0~1로 맞춘 뒤 가중 평균한 0~100 점수"""
+    total, weight_sum = 0.0, 0.0
+    for signal, value in signals.items():
+        if signal == "recency":
+            normalized = value  # 이미 0~1
+        elif signal in stats:
+            low, high = stats[signal]
+            normalized = (value >= high) * 1.0 if high <= low else min(max((value - low) / (high - low), 0.0), 1.0)
+        else:
+            continue
+        total += SIGNAL_WEIGHTS[signal] * normalized
+        weight_sum += SIGNAL_WEIGHTS[signal]
+    return round(100 * total / weight_sum, 2) if weight_sum else None
+
+
+class FeatureStore:
+    """
+    장소별 인기 신호(Google 평점/리뷰 수, 네이버 검색 트렌드, YouTube 조회수/참여율, 최근성)를
+    모아 두는 SQLite 저장소입니다.
+
+    - 출처마다 이름 표기가 달라도 entity 색인으로 같은 장소(place_key)에 합쳐 저장
+      (Google 장소는 place_id, 그 외는 위치 격자나 도시 범위의 이름이 키)
+    - refresh_scores()가 정규화 구간을 계산하고 종합 점수를 미리 저장하므로
+      요청 시에는 조회만 하면 됨 (새로 들어온 장소는 저장된 구간으로 즉시 계산)
+    """
+
+    def __init__(self, db_path: str = "place_features.db"):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._create_tables()
+        self._stats = self._load_stats()
+        self._index = EntityIndex()
+        for row in self._conn.execute("SELECT place_key, name, city, lat, lng FROM place_features"):
+            self._index_row(row)
+
+    def _create_tables(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS place_features (
+                    place_key TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    city TEXT,
+                    lat REAL,
+                    lng REAL,
+                    place_id TEXT,
+                    rating REAL,
+                    review_count INTEGER,
+                    search_trend REAL,
+                    video_views INTEGER,
+                    video_engagement REAL,
+                    last_activity_at TEXT,
+                    updated_at TEXT NOT NULL,
+                    score REAL
+                );
+                CREATE INDEX IF NOT EXISTS place_features_place_id ON place_features (place_id);
+                CREATE TABLE IF NOT EXISTS place_aliases (
+                    alias TEXT PRIMARY KEY,
+                    place_key TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS feature_stats (
+                    signal TEXT PRIMARY KEY,
+                    low REAL NOT NULL,
+                    high REAL NOT NULL,
+                    computed_at TEXT NOT NULL
+                );
+            """)
+
+    def _load_stats(self) -> Dict[str, tuple]:
+        return {row["signal"]: (row["low"], row["high"])
+                for row in self._conn.execute("SELECT signal, low, high FROM feature_stats")}
+
+    def _index_row(self, row):
+        location = {"lat": row["lat"], "lng": row["lng"]} if row["lat"] is not None else None
+        self._index.add("store", row["place_key"], row["name"], location, row["city"])
+
+    def _resolve_key(self, name: str, location: Optional[Dict[str, float]], city: Optional[str],
+                     create: bool, place_id: Optional[str] = None) -> Optional[str]:
+        """
+        place_id → (위치/도시 범위의) 별칭 → entity 색인 순으로 기존 place_key를 찾고,
+        없으면 (create일 때) 새 키를 만듭니다. 이름이 같아도 다른 도시·위치의 장소는 합치지 않습니다.
+        """
+        alias = normalize_name(name)
+        if not alias:
+            return None
+        if place_id:
+            row = self._conn.execute("SELECT place_key FROM place_features WHERE place_id = ?",
+                                     (place_id,)).fetchone()
+            if row:
+                return row["place_key"]
+        scoped_alias = alias_scope(alias, location, city)
+        row = self._conn.execute("SELECT place_key FROM place_aliases WHERE alias = ?", (scoped_alias,)).fetchone()
+        place_key = row["place_key"] if row else None
+        if place_key is None:
+            entity_id = self._index.resolve(name, location, city)
+            if entity_id is not None:
+                place_key = self._index.linked_id(entity_id, "store")
+        if place_key is not None and place_id:
+            # 다른 place_id를 가진 장소(근처의 같은 이름 지점 등)와는 합치지 않음
+            row = self._conn.execute("SELECT place_id FROM place_features WHERE place_key = ?",
+                                     (place_key,)).fetchone()
+            if row and row["place_id"] and row["place_id"] != place_id:
+                place_key = None
+        if place_key is None:
+            if not create:
+                return None
+            place_key = f"google:{place_id}" if place_id else scoped_alias
+        if create:
+            self._conn.execute("INSERT OR IGNORE INTO place_aliases (alias, place_key) VALUES (?, ?)",
+                               (scoped_alias, place_key))
+        return place_key
+
+    def upsert_many(self, records: Iterable[Dict]) -> List[str]:
+        """
+        {"name", "location"?, "city"?, "place_id"?, <FEATURE_COLUMNS 일부>} 레코드를 저장합니다.
+        레코드에 없는(None) 신호는 기존 값을 유지합니다.
+        """
+        updated_at = format_timestamp(utc_now())
+        keys = []
+        with self._lock, self._conn:
+            for record in records:
+                location = record.get("location")
+                place_key = self._resolve_key(record["name"], location, record.get("city"), create=True,
+                                              place_id=record.get("place_id"))
+                if place_key is None:
+                    continue
+                values = [record.get(column) for column in FEATURE_COLUMNS]
+                self._conn.execute(
+                    f"""
+                    INSERT INTO place_features
+                        (place_key, name, city, lat, lng, place_id, {", ".join(FEATURE_COLUMNS)}, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, {", ".join("?" for _ in FEATURE_COLUMNS)}, ?)
+                    ON CONFLICT(place_key) DO UPDATE SET
+                        city = COALESCE(place_features.city, excluded.city),
+                        lat = COALESCE(place_features.lat, excluded.lat),
+                        lng = COALESCE(place_features.lng, excluded.lng),
+                        place_id = COALESCE(excluded.place_id, place_features.place_id),
+                        {", ".join(f"{c} = COALESCE(excluded.{c}, place_features.{c})" for c in FEATURE_COLUMNS)},
+                        updated_at = excluded.updated_at
+                    """,
+                    [place_key, record["name"], record.get("city"),
+                     location["lat"] if location else None, location["lng"] if location else None,
+                     record.get("place_id"), *values, updated_at]
+                )
+                row = self._conn.execute("SELECT place_key, name, city, lat, lng FROM place_features "
+                                         "WHERE place_key = ?", (place_key,)).fetchone()
+                self._index_row(row)
+                keys.append(place_key)
+        return keys
+
+    def ingest_google_places(self, places: Iterable[Dict]) -> List[str]:
+        """get_nearby_places / search_hotels 결과의 평점과 리뷰 수"""
+        return self.upsert_many(
+            {
+                "name": place["name"],
+                "location": place.get("location"),
+                "place_id": place.get("place_id"),
+                "rating": place.get("rating") or None,
+                "review_count": place.get("user_ratings_total", place.get("review_count"))
+            }
+            for place in places
+        )
+
+    def ingest_search_trends(self, trends: Dict[str, float], city: Optional[str] = None) -> List[str]:
+        """네이버 데이터랩 검색어별 평균 트렌드 값 ({검색어: 값})"""
+        return self.upsert_many({"name": name, "city": city, "search_trend": float(value)}
+                                for name, value in trends.items())
+
+    def ingest_videos(self, videos: Iterable[Dict]) -> List[str]:
+        """
+        YouTube 분석 결과 영상 행(specific_place, city, view_count, like_count, comment_count,
+        published_at)을 장소별로 합쳐 저장합니다.
+        """
+        places: Dict[tuple, Dict] = {}
+        for video in videos:
+            key = (video["specific_place"], video.get("city"))
+            place = places.setdefault(key, {"views": 0, "reactions": 0, "latest": None})
+            place["views"] += int(video.get("view_count") or 0)
+            place["reactions"] += int(video.get("like_count") or 0) + int(video.get("comment_count") or 0)
+            published_at = video.get("published_at")
+            if published_at is not None:
+                published_at = format_timestamp(
+                    published_at if isinstance(published_at, datetime)
+                    else datetime.fromisoformat(str(published_at).replace("Z", "+00:00"))
+                )
+                if place["latest"] is None or published_at > place["latest"]:
+                    place["latest"] = published_at
+        return self.upsert_many(
+            {
+                "name": name,
+                "city": city,
+                "video_views": place["views"],
+                "video_engagement": place["reactions"] / place["views"] if place["views"] else None,
+                "last_activity_at": place["latest"]
+            }
+            for (name, city), place in places.items()
+        )
+
+    def refresh_scores(self) -> int:
+        """정규화 구간(백분위)을 다시 계산하고 모든 장소의 종합 점수를 저장합니다."""
+        now = utc_now()
+        with self._lock, self._conn:
+            rows = [dict(row) for row in self._conn.execute("SELECT * FROM place_features")]
+            signals = {row["place_key"]: transform_signals(row, now) for row in rows}
+
+            stats = {}
+            for signal in SIGNALS:
+                if signal == "recency":
+                    continue
+                values = sorted(s[signal] for s in signals.values() if signal in s)
+                if values:
+                    stats[signal] = (_percentile(values, LOW_PERCENTILE), _percentile(values, HIGH_PERCENTILE))
+
+            computed_at = format_timestamp(now)
+            self._conn.execute("DELETE FROM feature_stats")
+            self._conn.executemany(
+                "INSERT INTO feature_stats (signal, low, high, computed_at) VALUES (?, ?, ?, ?)",
+                [(signal, low, high, computed_at) for signal, (low, high) in stats.items()]
+            )
+            self._conn.executemany(
+                "UPDATE place_features SET score = ? WHERE place_key = ?",
+                [(combined_score(s, stats), place_key) for place_key, s in signals.items()]
+            )
+            self._stats = stats
+        return len(rows)
+
+    def score(self, name: str, location: Optional[Dict[str, float]] = None,
+              city: Optional[str] = None, place_id: Optional[str] = None) -> Optional[float]:
+        """장소의 종합 인기 점수 (0~100, 신호가 없으면 None)"""
+        with self._lock:
+            place_key = self._resolve_key(name, location, city, create=False, place_id=place_id)
+            if place_key is None:
+                return None
+            row = self._conn.execute("SELECT * FROM place_features WHERE place_key = ?", (place_key,)).fetchone()
+            if row is None:
+                return None
+            if row["score"] is not None:
+                return row["score"]
+            # 마지막 refresh 이후 들어온 장소는 저장된 정규화 구간으로 계산
+            return combined_score(transform_signals(dict(row), utc_now()), self._stats)
+
+    def annotate(self, places: List[Dict], field: str = "popularity_score") -> List[Dict]:
+        """장소 dict에 종합 인기 점수를 붙입니다 (제자리 수정)."""
+        for place in places:
+            place[field] = self.score(place["name"], place.get("location"), place_id=place.get("place_id"))
+        return places
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        """종합 점수 상위 장소 (refresh_scores 이후 기준)"""
+        rows = self._conn.execute(
+            "SELECT name, city, score FROM place_features WHERE score IS NOT NULL ORDER BY score DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[FeatureStore] = None
+_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    """프로세스 전체에서 공유하는 FeatureStore (경로: NAVI_FEATURE_DB, 기본 place_features.db)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeatureStore(os.environ.get("NAVI_FEATURE_DB", "place_features.db"))
+        return _store
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    사용법:
+        python -m utils.feature_store --trends data/destinations.json   # 네이버 트렌드 수집 후 점수 갱신
+        python -m utils.feature_store --top 20                          # 점수 갱신 후 상위 장소 출력
+    """
+    parser = argparse.ArgumentParser(description="장소 인기 점수 저장소 갱신")
+    parser.add_argument("--trends", help="네이버 검색 트렌드를 수집할 여행지 목록 (specific_place, city)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 장소 수")
+    args = parser.parse_args(argv)
+
+    store = get_feature_store()
+    if args.trends:
+        from prototype import TravelTrendAnalyzer
+        from utils.batch_runner import load_catalogue
+
+        analyzer = TravelTrendAnalyzer()
+        by_city: Dict[Optional[str], List[str]] = {}
+        for item in load_catalogue(args.trends):
+            by_city.setdefault(item.get("city"), []).append(item["specific_place"])
+        for city, names in by_city.items():
+            store.ingest_search_trends(analyzer.get_place_trends(names), city=city)
+
+    print(f"{store.refresh_scores()}개 장소의 점수를 갱신했습니다.")
+    for row in store.top(args.top):
+        print(f"{row['score']:6.2f}  {row['name']} ({row['city'] or '-'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+위치 계산 유틸리티.
+
+후보 장소 전체의 거리를 NumPy haversine으로 한 번에 계산합니다 (수백 개 기준 수십 µs).
+기준점(anchor)은 도시 중심, 선택한 호텔 등 {"lat", "lng"} dict면 무엇이든 됩니다.
+
+Example:
+    annotate_distances(hotels, city_center)                           # hotel["distance"] (미터)
+    distances_from(hotel["location"], places)                         # 장소 dict를 바꾸지 않는 거리 배열
+    nearby = within(places, city_center, 5000)
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+
+EARTH_RADIUS_M = 6371000
+
+
+def haversine_m(a: Dict[str, float], b: Dict[str, float]) -> float:
+    """두 위치 사이의 거리 (미터). 한 쌍만 비교할 때는 NumPy 없이 계산합니다."""
+    lat1, lat2 = math.radians(a["lat"]), math.radians(b["lat"])
+    dlat = lat2 - lat1
+    dlng = math.radians(b["lng"] - a["lng"])
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def coordinates(locations: Iterable[Optional[Dict[str, float]]]) -> "np.ndarray":
+    """위치 dict 목록을 (n, 2) 위도/경도 배열로 (위치가 없으면 NaN)"""
+    coords = [(loc["lat"], loc["lng"]) if loc else (math.nan, math.nan) for loc in locations]
+    return np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def haversine_many(anchor: Dict[str, float], coords: "np.ndarray") -> "np.ndarray":
+    """anchor에서 (n, 2) 좌표 배열까지의 거리 배열 (미터, 좌표가 NaN이면 NaN)"""
+    lat1 = math.radians(anchor["lat"])
+    lat2 = np.radians(coords[:, 0])
+    dlat = lat2 - lat1
+    dlng = np.radians(coords[:, 1] - anchor["lng"])
+    h = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def distance_matrix(a: "np.ndarray", b: "np.ndarray") -> "np.ndarray":
+    """(n, 2)와 (m, 2) 좌표 배열 사이의 (n, m) 거리 행렬 (미터)"""
+    lat1, lat2 = np.radians(a[:, 0])[:, None], np.radians(b[:, 0])[None, :]
+    dlat = lat2 - lat1
+    dlng = np.radians(b[:, 1][None, :] - a[:, 1][:, None])
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def distances_from(anchor: Dict[str, float], places: Sequence[Dict]) -> "np.ndarray":
+    """anchor에서 각 장소(place["location"])까지의 거리 배열 (미터)"""
+    return haversine_many(anchor, coordinates(place.get("location") for place in places))
+
+
+def annotate_distances(places: List[Dict], anchor: Dict[str, float], field: str = "distance") -> List[Dict]:
+    """각 장소에 anchor로부터의 거리(미터, 정수)를 field로 붙입니다. 위치가 없는 장소는 None."""
+    if not places:
+        return places
+    for place, distance in zip(places, distances_from(anchor, places).tolist()):
+        place[field] = None if math.isnan(distance) else int(round(distance))
+    return places
+
+
+def within(places: Sequence[Dict], anchor: Dict[str, float], max_distance: float) -> List[Dict]:
+    """anchor에서 max_distance(미터) 안에 있는 장소만 (원래 순서 유지)"""
+    if not places:
+        return []
+    mask = distances_from(anchor, places) <= max_distance
+    return [place for place, inside in zip(places, mask.tolist()) if inside]
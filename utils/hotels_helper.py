@@ -1,7 +1,14 @@
 from typing import List, Dict, Optional
 import logging
-import requests
 from config import GOOGLE_CLOUD_API_KEY
+from utils.geo import distances_from
+from utils.candidate_pool import HOTEL_RADIUS, CandidatePool
+from utils.places_helper import PLACE_DETAILS_URL, PLACE_PHOTO_URL
+from utils.tracing import traced, traced_request
+
+HOTEL_DETAILS_FIELDS = "name,rating,formatted_address,geometry,photos,price_level," \
+                       "user_ratings_total,reviews,website,url,formatted_phone_number," \
+                       "opening_hours,price_level"
 
 class HotelsHelper:
     def __init__(self):
@@ -55,22 +62,61 @@ class HotelsHelper:
 
         return score
 
+    @staticmethod
+    def _passes_basic_filter(place: Dict) -> bool:
+        """기본 필터링: 최소 리뷰 수와 평점 조건"""
+        return place.get("user_ratings_total", 0) >= 50 and place.get("rating", 0) >= 3.5
+
+    def _build_hotel_info(self, place: Dict, details: Dict, distance: float = 0) -> Dict:
+        """
+        Nearby Search 결과와 상세 정보를 화면 표시용 호텔 dict로 합칩니다.
+        distance는 검색 중심으로부터의 거리(미터)입니다 (Nearby Search는 거리를 주지 않음).
+        """
+        hotel_info = {
+            'place_id': place["place_id"],
+            'name': details.get("name", ""),
+            'rating': details.get("rating", 0),
+            'review_count': details.get("user_ratings_total", 0),
+            'reviews': details.get("reviews", [])[:3],  # 최근 리뷰 3개
+            'address': details.get("formatted_address", ""),
+            'phone': details.get("formatted_phone_number", ""),
+            'website': details.get("website", ""),
+            'maps_url': details.get("url", ""),
+            'price_level': details.get("price_level", 0),
+            'photos': details.get("photos", [])[:5],  # 최대 5장의 사진
+            'location': {
+                'lat': details["geometry"]["location"]["lat"],
+                'lng': details["geometry"]["location"]["lng"]
+            },
+            'distance': int(round(distance)),  # 미터 단위
+            'opening_hours': details.get("opening_hours", {}).get("weekday_text", []),
+            'opening_periods': details.get("opening_hours", {}).get("periods", [])
+        }
+        
+        # relevance score 계산
+        hotel_info['relevance_score'] = self._calculate_relevance_score({**place, 'distance': distance})
+        return hotel_info
+
+    @staticmethod
+    def _top_hotels(hotels: List[Dict], limit: int = 10) -> List[Dict]:
+        """relevance score 기준 상위 호텔"""
+        return sorted(hotels, key=lambda x: x.get('relevance_score', 0), reverse=True)[:limit]
+
+    @traced("hotels.get_hotel_details")
     def _get_hotel_details(self, place_id: str) -> Optional[Dict]:
         """
         특정 호텔의 상세 정보를 가져옵니다.
         """
         try:
-            details_url = "https://maps.googleapis.com/maps/api/place/details/json"
+            details_url = PLACE_DETAILS_URL
             details_params = {
                 "place_id": place_id,
-                "fields": "name,rating,formatted_address,geometry,photos,price_level," \
-                         "user_ratings_total,reviews,website,url,formatted_phone_number," \
-                         "opening_hours,price_level",
+                "fields": HOTEL_DETAILS_FIELDS,
                 "key": GOOGLE_CLOUD_API_KEY,
                 "language": "ko"  # 한국어로 결과 요청
             }
             
-            response = requests.get(details_url, params=details_params)
+            response = traced_request("GET", details_url, endpoint="google.places.details", params=details_params)
             data = response.json()
             
             if data.get("status") == "OK" and "result" in data:
@@ -81,101 +127,51 @@ class HotelsHelper:
             self.logger.error(f"Error fetching hotel details: {str(e)}")
             return None
 
-    def search_hotels(self, location: Dict[str, float], radius: int = 5000) -> List[Dict]:
+    @traced("hotels.search_hotels")
+    def search_hotels(self, location: Dict[str, float], radius: int = HOTEL_RADIUS) -> List[Dict]:
         """
         주어진 위치의 호텔 정보를 검색합니다.
+        주변 숙박시설 목록은 여행지별 후보 풀(candidate_pool)의 lodging sweep을 사용합니다.
         
         Args:
             location: {'lat': float, 'lng': float} 형태의 위치 정보
             radius: 검색 반경 (미터 단위, 기본값 5km)
         """
         try:
-            # 먼저 주변 호텔 검색
-            search_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-            search_params = {
-                "location": f"{location['lat']},{location['lng']}",
-                "radius": radius,
-                "type": "lodging",  # 숙박시설 검색
-                "key": GOOGLE_CLOUD_API_KEY
-            }
+            candidates = [place for place in CandidatePool(location).lodging(radius)
+                          if self._passes_basic_filter(place)]
+            # 후보 전체 거리를 한 번에 계산
+            distances = distances_from(location, candidates).tolist() if candidates else []
             
             hotels = []
-            next_page_token = None
-            
-            # 최대 2페이지까지만 검색 (페이지당 20개, 총 40개)
-            for _ in range(2):
-                if next_page_token:
-                    search_params["pagetoken"] = next_page_token
-                
-                response = requests.get(search_url, params=search_params)
-                data = response.json()
+            for place, distance in zip(candidates, distances):
+                # 호텔 상세 정보 가져오기
+                details = self._get_hotel_details(place["place_id"])
+                if not details:
+                    continue
                 
-                if data.get("status") != "OK":
-                    break
-                
-                for place in data.get("results", []):
-                    # 기본 필터링: 최소 리뷰 수와 평점 조건
-                    if (place.get("user_ratings_total", 0) < 50 or 
-                        place.get("rating", 0) < 3.5):
-                        continue
-                    
-                    # 호텔 상세 정보 가져오기
-                    details = self._get_hotel_details(place["place_id"])
-                    if not details:
-                        continue
-                    
-                    hotel_info = {
-                        'place_id': place["place_id"],
-                        'name': details.get("name", ""),
-                        'rating': details.get("rating", 0),
-                        'review_count': details.get("user_ratings_total", 0),
-                        'reviews': details.get("reviews", [])[:3],  # 최근 리뷰 3개
-                        'address': details.get("formatted_address", ""),
-                        'phone': details.get("formatted_phone_number", ""),
-                        'website': details.get("website", ""),
-                        'maps_url': details.get("url", ""),
-                        'price_level': details.get("price_level", 0),
-                        'photos': details.get("photos", [])[:5],  # 최대 5장의 사진
-                        'location': {
-                            'lat': details["geometry"]["location"]["lat"],
-                            'lng': details["geometry"]["location"]["lng"]
-                        },
-                        'distance': place.get("distance", 0),  # 미터 단위
-                        'opening_hours': details.get("opening_hours", {}).get("weekday_text", [])
-                    }
-                    
-                    # relevance score 계산
-                    hotel_info['relevance_score'] = self._calculate_relevance_score(place)
-                    
-                    hotels.append(hotel_info)
-                
-                next_page_token = data.get("next_page_token")
-                if not next_page_token:
-                    break
-
-            # 정렬: relevance score 기준
-            hotels.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+                hotels.append(self._build_hotel_info(place, details, distance))
 
-            # 상위 10개 호텔 반환
-            return hotels[:10]
+            return self._top_hotels(hotels)
 
         except Exception as e:
             self.logger.error(f"Error searching hotels: {str(e)}")
             return []
 
+    @traced("hotels.get_hotel_photo")
     def get_hotel_photo(self, photo_reference: str, max_width: int = 800) -> Optional[str]:
         """
         호텔 사진 URL을 가져옵니다.
         """
         try:
-            photo_url = "https://maps.googleapis.com/maps/api/place/photo"
+            photo_url = PLACE_PHOTO_URL
             params = {
                 "maxwidth": max_width,
                 "photo_reference": photo_reference,
                 "key": GOOGLE_CLOUD_API_KEY
             }
             
-            response = requests.get(photo_url, params=params)
+            response = traced_request("GET", photo_url, endpoint="google.places.photo", params=params)
             if response.status_code == 200:
                 return response.url
             return None
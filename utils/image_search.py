@@ -0,0 +1,119 @@
+import logging
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from utils.cache import get_cache
+from utils.rate_limit import RateLimiter
+from utils.tracing import propagate, record_cache, span, traced_request
+
+KAKAO_IMAGE_SEARCH_URL = "https://dapi.kakao.com/v2/search/image"
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키로 쓰기 위해 검색어를 정규화합니다 (유니코드 NFC, 공백 정리, 소문자)."""
+    query = unicodedata.normalize("NFC", query or "")
+    query = re.sub(r"<[^>]+>", "", query)  # 네이버 검색 결과의 <b> 태그 등 제거
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class ImageSearchService:
+    """
+    카카오 이미지 검색 API를 여러 장소명에 대해 병렬로 호출하는 서비스입니다.
+
+    - 검색어는 정규화 후 TTL 캐시에 저장되어 반복 조회 시 API를 호출하지 않음
+    - 동시 요청 수는 max_workers, 초당 요청 수는 rate_per_sec로 제한
+    """
+
+    def __init__(self, api_key: Optional[str] = None, size: int = 4,
+                 rate_per_sec: float = 10, max_workers: int = 8,
+                 cache_ttl: float = 24 * 60 * 60, timeout: float = 5):
+        if api_key is None:
+            import config0
+            api_key = config0.KAKAO_RESTAPI
+        self.headers = {"Authorization": "KakaoAK " + api_key}
+        self.size = size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_per_sec, burst=max_workers)
+        self.cache = get_cache("kakao_image_search", ttl=cache_ttl, maxsize=4096)
+        self.logger = logging.getLogger(__name__)
+
+    def _fetch(self, normalized: str) -> Optional[List[Dict]]:
+        self.rate_limiter.acquire()
+        try:
+            response = traced_request(
+                "GET",
+                KAKAO_IMAGE_SEARCH_URL,
+                endpoint="kakao.image_search",
+                headers=self.headers,
+                params={"query": normalized, "size": self.size},
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return response.json().get("documents", [])
+            self.logger.error(f"Kakao image search error {response.status_code}: {normalized}")
+        except Exception as e:
+            self.logger.error(f"Error searching images for {normalized}: {str(e)}")
+        return None
+
+    def search(self, query: str) -> Optional[List[Dict]]:
+        """
+        단일 검색어의 이미지 목록을 반환합니다. 오류 시 None을 반환하며 캐시하지 않습니다.
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return []
+        with span("images.search"):
+            cached = self.cache.get(normalized)
+            record_cache(cached is not None)
+            if cached is not None:
+                return cached
+            documents = self._fetch(normalized)
+            if documents is not None:
+                self.cache.set(normalized, documents)
+            return documents
+
+    def search_many(self, queries: Iterable[str]) -> Dict[str, List[Dict]]:
+        """
+        여러 검색어를 중복 제거 후 병렬로 검색합니다.
+
+        Returns:
+            원래 검색어 → 이미지 목록 (오류가 난 검색어는 빈 리스트)
+        """
+        queries = list(queries)
+        unique = {}
+        for query in queries:
+            unique.setdefault(normalize_query(query), query)
+
+        # 캐시에 없는 검색어만 병렬로 요청
+        results = {}
+        missing = []
+        for normalized in unique:
+            cached = self.cache.get(normalized) if normalized else []
+            if cached is not None:
+                results[normalized] = cached
+            else:
+                missing.append(normalized)
+
+        with span("images.search_many", queries=len(unique), cache_misses=len(missing)):
+            if missing:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                    fetched = executor.map(propagate(self._fetch), missing)
+                    for normalized, documents in zip(missing, fetched):
+                        if documents is not None:
+                            self.cache.set(normalized, documents)
+                        results[normalized] = documents or []
+
+        return {query: results[normalize_query(query)] for query in queries}
+
+    def enrich_places(self, places: List[Dict], name_key: str = "name",
+                      field: str = "images") -> List[Dict]:
+        """
+        장소 dict 목록(get_nearby_places 결과, 트렌드 분석 결과 등)에 이미지 목록을 추가합니다.
+        """
+        images = self.search_many(place.get(name_key, "") for place in places)
+        for place in places:
+            place[field] = images.get(place.get(name_key, ""), [])
+        return places
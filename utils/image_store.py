@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from utils.lazy import lazy_module
+from utils.tracing import propagate, record_cache, span, traced_request
+
+logger = logging.getLogger(__name__)
+
+# 이미지를 실제로 처리할 때만 불러옴 (앱 시작 시간 단축)
+np = lazy_module("numpy")
+Image = lazy_module("PIL.Image")
+
+HASH_SIZE = 8
+_DCT_SIZE = HASH_SIZE * 4
+
+
+@functools.lru_cache(maxsize=None)
+def _dct_matrix(n: int) -> np.ndarray:
+    """DCT-II 변환 행렬"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def perceptual_hash(image: Image.Image) -> int:
+    """
+    pHash: 32x32 흑백 이미지의 저주파 8x8 DCT 계수를 중앙값과 비교한 64비트 해시
+    """
+    pixels = np.asarray(
+        image.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS), dtype=np.float64
+    )
+    dct = _dct_matrix(_DCT_SIZE)
+    coefficients = (dct @ pixels @ dct.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    # DC 성분(0번)은 전체 밝기라서 중앙값 계산에서 제외
+    bits = coefficients > np.median(coefficients[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ImageStore:
+    """
+    원격 이미지를 한 번만 내려받아 크기 제한된 WebP 썸네일로 저장하는 디스크 캐시입니다.
+
+    - 썸네일은 원본 내용의 SHA-256 값으로 저장 (같은 이미지는 URL이 달라도 한 번만 저장)
+    - 새로 저장한 용량이 evict_every_bytes만큼 쌓일 때마다 전체 용량을 확인해, max_bytes를 넘으면
+      가장 오래 사용되지 않은 썸네일부터 삭제
+    - pHash로 출처가 달라도 거의 같은 이미지를 걸러냄
+    """
+
+    def __init__(self, cache_dir: str = "image_cache", max_bytes: int = 200 * 1024 * 1024,
+                 thumbnail_size: int = 640, quality: int = 80,
+                 duplicate_threshold: int = 6, max_workers: int = 8, timeout: float = 10,
+                 evict_every_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # 용량 확인(SUM 쿼리) 간격. 기본은 max_bytes의 5%
+        self.evict_every_bytes = evict_every_bytes or max(max_bytes // 20, 1)
+        self.thumbnail_size = thumbnail_size
+        self.quality = quality
+        self.duplicate_threshold = duplicate_threshold
+        self.max_workers = max_workers
+        self.timeout = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # 첫 저장 때 한 번 확인하도록 (이전 실행에서 용량을 넘긴 채 끝났을 수 있음)
+        self._written_since_evict = self.evict_every_bytes
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS thumbnails (
+                    digest TEXT PRIMARY KEY,
+                    phash TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                );
+            """)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.webp")
+
+    def _lookup(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT t.digest, t.phash FROM urls u JOIN thumbnails t ON t.digest = u.digest "
+                "WHERE u.url = ?", (url,)
+            ).fetchone()
+            if row is None or not os.path.exists(self._path(row["digest"])):
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE thumbnails SET last_access = ? WHERE digest = ?",
+                    (time.time(), row["digest"])
+                )
+        return {"path": self._path(row["digest"]), "phash": int(row["phash"], 16)}
+
+    def _download(self, url: str) -> Optional[Dict]:
+        try:
+            # 회로 차단기는 호스트별 (CDN 하나의 장애가 다른 호스트의 이미지까지 막지 않도록)
+            endpoint = f"image.download.{urlsplit(url).hostname or 'unknown'}"
+            response = traced_request("GET", url, endpoint=endpoint, timeout=self.timeout)
+            response.raise_for_status()
+            content = response.content
+            image = Image.open(io.BytesIO(content))
+            image.load()
+        except Exception as e:
+            logger.error(f"Error downloading image {url}: {str(e)}")
+            return None
+
+        digest = hashlib.sha256(content).hexdigest()
+        phash = perceptual_hash(image)
+        path = self._path(digest)
+
+        written = 0
+        if not os.path.exists(path):
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+            image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            image.save(tmp_path, "WEBP", quality=self.quality)
+            os.replace(tmp_path, path)
+            written = os.path.getsize(path)
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO thumbnails (digest, phash, size, last_access) VALUES (?, ?, ?, ?)",
+                    (digest, f"{phash:016x}", os.path.getsize(path), time.time())
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls (url, digest) VALUES (?, ?)", (url, digest)
+                )
+            self._written_since_evict += written
+            should_evict = self._written_since_evict >= self.evict_every_bytes
+            if should_evict:
+                self._written_since_evict = 0
+        if should_evict:
+            self.evict()
+        return {"path": path, "phash": phash}
+
+    def fetch(self, url: str) -> Optional[Dict]:
+        """
+        URL의 썸네일 경로와 pHash를 반환합니다. 캐시에 없을 때만 내려받습니다.
+        """
+        if not url:
+            return None
+        with span("images.fetch"):
+            entry = self._lookup(url)
+            record_cache(entry is not None)
+            return entry or self._download(url)
+
+    def thumbnail(self, url: str) -> Optional[str]:
+        """URL의 로컬 썸네일 경로를 반환합니다 (실패 시 None)."""
+        entry = self.fetch(url)
+        return entry["path"] if entry else None
+
+    def gallery(self, urls: List[str]) -> List[str]:
+        """
+        여러 이미지를 병렬로 가져와 거의 같은 이미지를 제거한 썸네일 경로 목록을 반환합니다.
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            entries = list(executor.map(propagate(self.fetch), urls))
+
+        kept_paths = []
+        kept_hashes = []
+        for entry in entries:
+            if entry is None or entry["path"] in kept_paths:
+                continue
+            if any(hamming_distance(entry["phash"], h) <= self.duplicate_threshold for h in kept_hashes):
+                continue
+            kept_paths.append(entry["path"])
+            kept_hashes.append(entry["phash"])
+        return kept_paths
+
+    def evict(self):
+        """전체 용량이 max_bytes 이하가 될 때까지 오래 사용되지 않은 썸네일을 삭제합니다."""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute(
+                "SELECT digest, size FROM thumbnails ORDER BY last_access"
+            ).fetchall()
+            evicted = []
+            for row in rows:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._path(row["digest"]))
+                except FileNotFoundError:
+                    pass
+                total -= row["size"]
+                evicted.append(row["digest"])
+            with self._conn:
+                self._conn.executemany("DELETE FROM urls WHERE digest = ?", [(d,) for d in evicted])
+                self._conn.executemany("DELETE FROM thumbnails WHERE digest = ?", [(d,) for d in evicted])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """프로세스 전체에서 공유하는 ImageStore를 반환합니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ImageStore()
+        return _store
@@ -0,0 +1,34 @@
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    처음 속성에 접근할 때 실제로 import되는 모듈 대리 객체입니다.
+
+    Example:
+        pd = lazy_module("pandas")   # 이 시점에는 pandas를 불러오지 않음
+        pd.DataFrame(...)            # 첫 사용 시 import
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_module(name: str) -> LazyModule:
+    """무거운 의존성(pandas, numpy, PIL 등)을 첫 사용 시점까지 늦춰 불러옵니다."""
+    return LazyModule(name)
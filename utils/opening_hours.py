@@ -0,0 +1,151 @@
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+
+# 일정에 넣을 수 있는 방문 시간대 (이 시간 중 잠깐이라도 열려 있으면 방문 가능으로 봄)
+VISIT_WINDOW = (time(9, 0), time(20, 0))
+
+
+def _google_weekday(day: date) -> int:
+    """Places API의 요일 번호 (0=일요일 ~ 6=토요일)"""
+    return (day.weekday() + 1) % 7
+
+
+def _week_minute(day: int, hhmm: str) -> int:
+    return day * DAY_MINUTES + int(hhmm[:2]) * 60 + int(hhmm[2:4])
+
+
+def parse_periods(periods: List[Dict]) -> List[Tuple[int, int]]:
+    """
+    Places API opening_hours.periods를 일요일 00:00 기준 분 단위 구간 목록으로 변환합니다.
+
+    주말을 넘어가는 구간(토요일 밤 → 일요일 새벽)은 둘로 나누고, 겹치는 구간은 합칩니다.
+    close가 없는 period는 24시간 영업을 뜻합니다.
+    """
+    intervals = []
+    for period in periods:
+        opening = period.get("open")
+        if not opening:
+            continue
+        closing = period.get("close")
+        if not closing:
+            return [(0, WEEK_MINUTES)]
+        start = _week_minute(opening["day"], opening["time"])
+        end = _week_minute(closing["day"], closing["time"])
+        if end <= start:
+            intervals.append((start, WEEK_MINUTES))
+            if end > 0:
+                intervals.append((0, end))
+        else:
+            intervals.append((start, end))
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class WeeklySchedule:
+    """
+    한 장소의 주간 영업 구간입니다.
+    시각 조회는 구간 시작값에 대한 이진 탐색이고, 요일별 영업 여부는 7비트 마스크로 바로 확인합니다.
+    """
+
+    __slots__ = ("starts", "ends", "day_mask")
+
+    def __init__(self, intervals: List[Tuple[int, int]]):
+        self.starts = tuple(start for start, _ in intervals)
+        self.ends = tuple(end for _, end in intervals)
+        self.day_mask = 0
+        for start, end in intervals:
+            for day in range(start // DAY_MINUTES, (end - 1) // DAY_MINUTES + 1):
+                self.day_mask |= 1 << day
+
+    @classmethod
+    def from_periods(cls, periods: List[Dict]) -> "WeeklySchedule":
+        return cls(parse_periods(periods))
+
+    def _open_between(self, start: int, end: int) -> bool:
+        # start 이후에 끝나는 첫 구간이 end 전에 시작하면 겹침
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def is_open(self, when: datetime) -> bool:
+        """when 시각에 영업 중인지"""
+        minute = _week_minute(_google_weekday(when.date()), when.strftime("%H%M"))
+        i = bisect_right(self.starts, minute) - 1
+        return i >= 0 and minute < self.ends[i]
+
+    def is_open_on(self, day: date) -> bool:
+        """해당 날짜에 한 번이라도 영업하는지"""
+        return bool(self.day_mask >> _google_weekday(day) & 1)
+
+    def is_open_between(self, day: date, start: time, end: time) -> bool:
+        """해당 날짜의 start~end 사이에 영업하는 시간이 있는지"""
+        if not self.is_open_on(day):
+            return False
+        base = _google_weekday(day) * DAY_MINUTES
+        return self._open_between(base + start.hour * 60 + start.minute,
+                                  base + end.hour * 60 + end.minute)
+
+
+class OpeningHoursIndex:
+    """
+    place_id별 WeeklySchedule 색인입니다.
+
+    상세 정보를 받을 때 한 번만 periods를 파싱해 두고, 이후 rerun에서는 색인만 조회합니다.
+    영업시간 정보가 없는 장소는 알 수 없음(None)으로 보고 필터링에서 제외하지 않습니다.
+    """
+
+    def __init__(self):
+        self._schedules: Dict[str, Optional[WeeklySchedule]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, place_id: str, periods: Optional[List[Dict]]):
+        """이미 색인된 장소는 다시 파싱하지 않습니다."""
+        if place_id in self._schedules:
+            return
+        schedule = WeeklySchedule.from_periods(periods) if periods else None
+        with self._lock:
+            self._schedules[place_id] = schedule
+
+    def __contains__(self, place_id: str) -> bool:
+        return place_id in self._schedules
+
+    def get(self, place_id: str) -> Optional[WeeklySchedule]:
+        return self._schedules.get(place_id)
+
+    def is_open(self, place_id: str, when: datetime) -> Optional[bool]:
+        schedule = self._schedules.get(place_id)
+        return None if schedule is None else schedule.is_open(when)
+
+    def can_visit(self, place_id: str, day: date, window: Tuple[time, time] = VISIT_WINDOW) -> bool:
+        """day의 방문 시간대(window)에 영업하는지 (정보가 없으면 True)"""
+        schedule = self._schedules.get(place_id)
+        return schedule is None or schedule.is_open_between(day, *window)
+
+    def filter_open(self, places: Iterable[Dict], dates: Iterable[date],
+                    window: Tuple[time, time] = VISIT_WINDOW) -> List[Dict]:
+        """dates 중 하루라도 방문 시간대에 영업하는 장소만 남깁니다."""
+        dates = list(dates)
+        if not dates:
+            return list(places)
+        return [
+            place for place in places
+            if any(self.can_visit(place["place_id"], day, window) for day in dates)
+        ]
+
+
+_index = OpeningHoursIndex()
+
+
+def get_opening_index() -> OpeningHoursIndex:
+    """프로세스 전체에서 공유하는 영업시간 색인"""
+    return _index
@@ -0,0 +1,148 @@
+from typing import Dict, List, Optional
+
+from utils.resilience import breaker_states
+from utils.tracing import percentile, recent_spans, summarize
+
+# 엔드포인트별 API 키(쿼터 단위)와 호출당 소모량
+QUOTA_COSTS = {
+    "google.places.autocomplete": ("GOOGLE_CLOUD_API_KEY", 1),
+    "google.places.details": ("GOOGLE_CLOUD_API_KEY", 1),
+    "google.places.nearbysearch": ("GOOGLE_CLOUD_API_KEY", 1),
+    "google.places.photo": ("GOOGLE_CLOUD_API_KEY", 1),
+    "google.geocode": ("GOOGLE_CLOUD_API_KEY", 1),
+    "naver.search.local": ("NAVER_CAFE_CLIENT_ID", 1),
+    "naver.datalab.search": ("NAVER_TREND_CLIENT_ID", 1),
+    "youtube.search.list": ("YOUTUBE_DATA", 100),
+    "youtube.videos.list": ("YOUTUBE_DATA", 1),
+    "kakao.image_search": ("KAKAO_RESTAPI", 1),
+}
+
+
+def helper_latency(spans: List[Dict]) -> List[Dict]:
+    """헬퍼 함수(internal span)별 호출 수와 p50/p95 지연"""
+    summary = summarize([s for s in spans if s["kind"] == "internal"])
+    return [
+        {"helper": name, "calls": row["count"], "p50_ms": row["p50_ms"],
+         "p95_ms": row["p95_ms"], "max_ms": row["max_ms"]}
+        for name, row in sorted(summary.items(), key=lambda item: -item[1]["p95_ms"])
+    ]
+
+
+def calls_per_rerun(spans: List[Dict]) -> List[Dict]:
+    """rerun(ui.rerun span)마다 발생한 외부 API 호출 수"""
+    client_calls: Dict[str, int] = {}
+    for s in spans:
+        if s["kind"] == "client":
+            client_calls[s["trace_id"]] = client_calls.get(s["trace_id"], 0) + 1
+    return [
+        {
+            "session_id": s["attributes"].get("session_id", ""),
+            "start_time": s["start_time"],
+            "duration_ms": round(s["duration_ms"], 1),
+            "api_calls": client_calls.get(s["trace_id"], 0)
+        }
+        for s in spans if s["name"] == "ui.rerun"
+    ]
+
+
+def cache_hit_rates(spans: List[Dict]) -> List[Dict]:
+    """캐시 적중 여부가 기록된 span별 적중률"""
+    rates = []
+    for name, row in summarize(spans).items():
+        if row["cache_hit_rate"] is not None:
+            rates.append({"span": name, "lookups": row["count"], "hit_rate": row["cache_hit_rate"]})
+    return sorted(rates, key=lambda row: row["hit_rate"])
+
+
+def quota_usage(spans: List[Dict]) -> List[Dict]:
+    """API 키별 쿼터 소모량 (버퍼에 남아 있는 호출 기준)"""
+    usage: Dict[str, Dict] = {}
+    for s in spans:
+        if s["kind"] != "client":
+            continue
+        key, cost = QUOTA_COSTS.get(s["attributes"].get("endpoint"), (None, 0))
+        if key is None:
+            continue
+        row = usage.setdefault(key, {"api_key": key, "calls": 0, "units": 0})
+        row["calls"] += 1
+        row["units"] += cost
+    return sorted(usage.values(), key=lambda row: -row["units"])
+
+
+def slowest_sessions(spans: List[Dict], limit: int = 10) -> List[Dict]:
+    """rerun 지연이 가장 큰 세션 목록"""
+    sessions: Dict[str, List[float]] = {}
+    for row in calls_per_rerun(spans):
+        sessions.setdefault(row["session_id"] or "-", []).append(row["duration_ms"])
+    rows = [
+        {
+            "session_id": session_id,
+            "reruns": len(durations),
+            "p95_ms": round(percentile(durations, 95), 1),
+            "max_ms": round(max(durations), 1)
+        }
+        for session_id, durations in sessions.items()
+    ]
+    return sorted(rows, key=lambda row: -row["max_ms"])[:limit]
+
+
+def render_dashboard(spans: Optional[List[Dict]] = None):
+    """Streamlit 성능 대시보드 페이지를 그립니다."""
+    import pandas as pd
+    import streamlit as st
+
+    st.title("성능 대시보드 📈")
+    spans = recent_spans.snapshot() if spans is None else spans
+    st.caption(f"최근 span {len(spans)}개 기준 (프로세스 메모리 링 버퍼)")
+    if st.button("버퍼 비우기"):
+        recent_spans.clear()
+        spans = []
+
+    if not spans:
+        st.info("아직 기록된 호출이 없습니다.")
+        return
+
+    reruns = calls_per_rerun(spans)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("기록된 rerun 수", len(reruns))
+    with col2:
+        api_calls = [row["api_calls"] for row in reruns]
+        st.metric("rerun당 API 호출 (평균)", f"{sum(api_calls) / len(api_calls):.1f}" if api_calls else "-")
+    with col3:
+        durations = [row["duration_ms"] for row in reruns]
+        st.metric("rerun p95", f"{percentile(durations, 95):.0f}ms" if durations else "-")
+
+    st.subheader("헬퍼 함수별 지연 (p50 / p95)")
+    st.dataframe(pd.DataFrame(helper_latency(spans)), hide_index=True, use_container_width=True)
+
+    st.subheader("외부 API 엔드포인트")
+    endpoints = summarize([s for s in spans if s["kind"] == "client"])
+    st.dataframe(
+        pd.DataFrame([
+            {"endpoint": name, **{k: v for k, v in row.items() if k != "kind"}}
+            for name, row in endpoints.items()
+        ]),
+        hide_index=True, use_container_width=True
+    )
+
+    st.subheader("회로 차단기")
+    breakers = breaker_states()
+    if breakers:
+        st.dataframe(pd.DataFrame([{"endpoint": name, **row} for name, row in breakers.items()]),
+                     hide_index=True, use_container_width=True)
+    else:
+        st.write("외부 API 호출 기록이 없습니다.")
+
+    st.subheader("캐시 적중률")
+    rates = cache_hit_rates(spans)
+    if rates:
+        st.dataframe(pd.DataFrame(rates), hide_index=True, use_container_width=True)
+    else:
+        st.write("캐시 조회 기록이 없습니다.")
+
+    st.subheader("API 키별 쿼터 소모량")
+    st.dataframe(pd.DataFrame(quota_usage(spans)), hide_index=True, use_container_width=True)
+
+    st.subheader("가장 느린 세션")
+    st.dataframe(pd.DataFrame(slowest_sessions(spans)), hide_index=True, use_container_width=True)
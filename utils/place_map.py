@@ -0,0 +1,153 @@
+"""
+검색 결과 지도 (pydeck).
+
+섹션마다 지도 하나에 후보 전체(호텔, 음식점, 관광지, 일정 방문지)를 그립니다. 장소들은 종류별 색을 가진
+열(column) 배열 하나로 모아 ScatterplotLayer 하나로 보내고, 날짜별 이동 경로는 PathLayer로 더합니다.
+장소마다 st.map과 DataFrame을 만들던 방식보다 rerun당 위젯과 전송 데이터가 하나로 줄어듭니다.
+
+Streamlit 1.32의 pydeck_chart는 클릭 이벤트를 돌려주지 않으므로, 지도 위 selectbox로 고른 장소를
+크게 표시하고 지도 중심을 옮깁니다 (마우스를 올리면 이름 툴팁 표시).
+
+Example:
+    render_place_map({"hotel": hotels}, center=center, key="hotel_map")
+    render_place_map({"hotel": [plan["hotel"]], "stop": plan["places"]},
+                     routes=day_routes(plan["daily_places"], plan["hotel"]), key="plan_map")
+"""
+import math
+from typing import Dict, List, Optional, Sequence
+
+from utils.geo import coordinates
+from utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+pd = lazy_module("pandas")
+pdk = lazy_module("pydeck")
+
+# 종류 → (표시 이름, RGB)
+KIND_STYLES = {
+    "center": ("여행지", (38, 70, 83)),
+    "hotel": ("호텔", (230, 57, 70)),
+    "restaurant": ("음식점", (244, 162, 97)),
+    "attraction": ("관광지", (42, 157, 143)),
+    "stop": ("방문지", (69, 123, 157)),
+}
+# 날짜별 경로 색 (날짜가 더 많으면 반복)
+ROUTE_COLORS = [(230, 57, 70), (42, 157, 143), (233, 196, 106), (69, 123, 157), (157, 78, 221)]
+
+POINT_RADIUS = 60    # 미터
+FOCUS_SCALE = 3.0    # 선택한 장소의 반경 배율
+FOCUS_ZOOM = 15
+ALL_PLACES = "전체 보기"
+
+
+def map_points(groups: Dict[str, Sequence[Dict]], center: Optional[Dict[str, float]] = None,
+               focus_id: Optional[str] = None) -> "pd.DataFrame":
+    """
+    종류별 장소 목록을 지도용 열 배열 하나(DataFrame)로 합칩니다. 위치가 없는 장소는 뺍니다.
+    같은 장소가 여러 종류에 있으면 먼저 나온 종류로 한 번만 그립니다.
+    """
+    names, kinds, place_ids, locations = [], [], [], []
+    if center:
+        names.append(KIND_STYLES["center"][0])
+        kinds.append("center")
+        place_ids.append("")
+        locations.append(center)
+    seen = set()
+    for kind, places in groups.items():
+        for place in places or []:
+            place_id = place.get("place_id", "")
+            if not place.get("location") or (place_id and place_id in seen):
+                continue
+            seen.add(place_id)
+            names.append(place.get("name", ""))
+            kinds.append(kind)
+            place_ids.append(place_id)
+            locations.append(place["location"])
+
+    coords = coordinates(locations)
+    colors = np.array([KIND_STYLES[kind][1] for kind in kinds], dtype=np.uint8).reshape(-1, 3)
+    radius = np.full(len(kinds), POINT_RADIUS, dtype=np.float32)
+    if focus_id:
+        radius[np.array(place_ids) == focus_id] *= FOCUS_SCALE
+    return pd.DataFrame({
+        "lat": coords[:, 0],
+        "lng": coords[:, 1],
+        "r": colors[:, 0],
+        "g": colors[:, 1],
+        "b": colors[:, 2],
+        "radius": radius,
+        "name": names,
+        "kind": [KIND_STYLES[kind][0] for kind in kinds],
+        "place_id": place_ids,
+    })
+
+
+def day_routes(daily_places: List[List[Dict]], hotel: Optional[Dict] = None) -> "pd.DataFrame":
+    """날짜별 방문 순서를 경로로 (호텔이 있으면 호텔에서 출발해 호텔로 돌아옴)"""
+    rows = []
+    for day, places in enumerate(daily_places, start=1):
+        stops = [place["location"] for place in places if place.get("location")]
+        if hotel and hotel.get("location") and stops:
+            stops = [hotel["location"], *stops, hotel["location"]]
+        if len(stops) < 2:
+            continue
+        color = ROUTE_COLORS[(day - 1) % len(ROUTE_COLORS)]
+        rows.append({
+            "kind": "경로",
+            "name": f"{day}일차",
+            "path": [[stop["lng"], stop["lat"]] for stop in stops],
+            "r": color[0], "g": color[1], "b": color[2],
+        })
+    return pd.DataFrame(rows, columns=["kind", "name", "path", "r", "g", "b"])
+
+
+def view_state(points: "pd.DataFrame", focus_id: Optional[str] = None) -> "pdk.ViewState":
+    """선택한 장소가 있으면 그 장소로, 없으면 모든 장소가 보이도록 지도 중심과 확대 수준을 정합니다."""
+    if focus_id:
+        focused = points[points["place_id"] == focus_id]
+        if len(focused):
+            return pdk.ViewState(latitude=float(focused["lat"].iloc[0]), longitude=float(focused["lng"].iloc[0]),
+                                 zoom=FOCUS_ZOOM)
+    lat, lng = points["lat"].to_numpy(), points["lng"].to_numpy()
+    span = max(float(np.nanmax(lat) - np.nanmin(lat)), float(np.nanmax(lng) - np.nanmin(lng)), 1e-3)
+    zoom = min(max(math.log2(360 / span) - 1, 3), FOCUS_ZOOM)
+    return pdk.ViewState(latitude=float(np.nanmean(lat)), longitude=float(np.nanmean(lng)), zoom=zoom)
+
+
+def render_place_map(groups: Dict[str, Sequence[Dict]], center: Optional[Dict[str, float]] = None,
+                     routes: Optional["pd.DataFrame"] = None, key: str = "place_map") -> Optional[str]:
+    """
+    섹션 지도 하나를 그리고, selectbox로 선택한 장소의 place_id를 반환합니다 (전체 보기면 None).
+    key는 섹션마다 달라야 합니다 (selectbox 위젯 키).
+    """
+    import streamlit as st
+
+    labels: Dict[str, str] = {}
+    for kind, places in groups.items():
+        for place in places or []:
+            if place.get("location") and place.get("place_id"):
+                labels.setdefault(place["place_id"], f"{KIND_STYLES[kind][0]} · {place.get('name', '')}")
+    if not labels and not center:
+        return None
+    if st.session_state.get(key) is not None and st.session_state[key] not in labels:
+        # 필터를 바꿔 선택했던 장소가 목록에서 빠지면 전체 보기로 (없는 값이면 selectbox가 오류를 냄)
+        st.session_state[key] = None
+    focus_id = st.selectbox("지도에서 볼 장소", [None, *labels], key=key,
+                            format_func=lambda place_id: labels.get(place_id, ALL_PLACES))
+
+    points = map_points(groups, center, focus_id)
+    layers = [pdk.Layer(
+        "ScatterplotLayer", data=points, get_position="[lng, lat]", get_fill_color="[r, g, b, 200]",
+        get_radius="radius", radius_min_pixels=4, radius_max_pixels=24, pickable=True
+    )]
+    if routes is not None and len(routes):
+        layers.insert(0, pdk.Layer(
+            "PathLayer", data=routes, get_path="path", get_color="[r, g, b]", width_min_pixels=3, pickable=True
+        ))
+    st.pydeck_chart(pdk.Deck(
+        layers=layers,
+        initial_view_state=view_state(points, focus_id),
+        map_style=None,
+        tooltip={"text": "{kind} {name}"}
+    ))
+    return focus_id
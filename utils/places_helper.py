@@ -1,10 +1,12 @@
-import requests
 from typing import List, Dict, Optional
 import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import GOOGLE_CLOUD_API_KEY
+from utils.cache import get_cache
+from utils.query_planner import NearbyQuery
+from utils.tracing import record_cache, traced, traced_request
 
 # Places API 타입으로 매핑
 THEME_TO_PLACE_TYPE = {
@@ -18,200 +20,261 @@ THEME_TO_PLACE_TYPE = {
     "휴양/힐링": ["spa", "beauty_salon", "amusement_park", "zoo", "hot_spring", "hair_care", "massage", "gym"]
 }
 
+DEFAULT_CITY_RADIUS = 30000
+MAX_RESULTS_PER_TYPE = 60  # Nearby Search는 요청당 최대 3페이지(60개)
+CITY_RADIUS_TTL = 30 * 24 * 60 * 60  # 도시 크기는 거의 바뀌지 않음
+
+# Google Maps API 주소 (부하 테스트에서는 NAVI_GOOGLE_API_BASE로 가짜 API 서버를 가리킴)
+GOOGLE_API_BASE = os.environ.get("NAVI_GOOGLE_API_BASE", "https://maps.googleapis.com").rstrip("/")
+GEOCODE_URL = f"{GOOGLE_API_BASE}/maps/api/geocode/json"
+AUTOCOMPLETE_URL = f"{GOOGLE_API_BASE}/maps/api/place/autocomplete/json"
+NEARBY_SEARCH_URL = f"{GOOGLE_API_BASE}/maps/api/place/nearbysearch/json"
+PLACE_DETAILS_URL = f"{GOOGLE_API_BASE}/maps/api/place/details/json"
+PLACE_PHOTO_URL = f"{GOOGLE_API_BASE}/maps/api/place/photo"
+# 결과가 없는 것으로 보는 Nearby Search 상태 (INVALID_REQUEST는 type 필터를 지원하지 않을 때도 반환됨)
+NEARBY_EMPTY_STATUSES = ("ZERO_RESULTS", "INVALID_REQUEST")
+PLACE_DETAILS_FIELDS = "name,formatted_address,geometry,opening_hours,rating,reviews,price_level,photos,website,formatted_phone_number"
+
+def radius_from_geocode(data: Dict) -> Optional[int]:
+    """
+    Geocoding 응답에서 도시(locality)의 viewport 크기로 검색 반경을 결정합니다.
+    """
+    # 도시 정보를 찾기 위해 결과를 순회
+    for result in data.get("results") or []:
+        if "locality" in result["types"]:
+            viewport = result["geometry"]["viewport"]
+            ne = viewport["northeast"]
+            sw = viewport["southwest"]
+            
+            # 위도/경도 차이를 km로 변환하여 대략적인 도시 크기 계산
+            lat_diff = abs(ne["lat"] - sw["lat"])
+            lng_diff = abs(ne["lng"] - sw["lng"])
+            
+            # 도시의 대각선 길이를 기준으로 반경 결정
+            city_size = (lat_diff ** 2 + lng_diff ** 2) ** 0.5
+            
+            if city_size > 0.5:  # 대도시 (예: 뉴욕, 도쿄)
+                return 50000
+            elif city_size > 0.2:  # 중간 크기 도시
+                return 30000
+            else:  # 작은 도시
+                return 15000
+    return None
+
+def city_radius_cache():
+    """위치별 검색 반경 캐시 (약 100m 단위 위치를 키로 사용)"""
+    return get_cache("city_radius", ttl=CITY_RADIUS_TTL, maxsize=4096)
+
+def city_radius_key(location: Dict[str, float]) -> tuple:
+    return (round(float(location["lat"]), 3), round(float(location["lng"]), 3))
+
+def themes_to_place_types(selected_themes: List[str]) -> List[str]:
+    """선택된 테마에 해당하는 place type들을 모두 가져옴"""
+    place_types = []
+    for theme in selected_themes:
+        place_types.extend(THEME_TO_PLACE_TYPE.get(theme, []))
+    return place_types
+
+def parse_nearby_place(place: Dict, place_type: str) -> Dict:
+    """Nearby Search 결과 한 건을 내부 장소 dict로 변환"""
+    place_details = {
+        "place_id": place["place_id"],
+        "name": place["name"],
+        "location": place["geometry"]["location"],
+        "rating": place.get("rating", 0),
+        "user_ratings_total": place.get("user_ratings_total", 0),
+        "types": place["types"],
+        "place_type": place_type
+    }
+    
+    if "photos" in place:
+        place_details["photo_reference"] = place["photos"][0]["photo_reference"]
+    
+    if "price_level" in place:
+        place_details["price_level"] = place["price_level"]
+    
+    return place_details
+
+def calculate_place_score(place: Dict) -> float:
+    """평점과 리뷰 수 기반 장소 점수 (조건 미달 시 -1)"""
+    rating = place.get("rating", 0)
+    reviews = place.get("user_ratings_total", 0)
+    
+    if reviews < 100 or rating < 4.0:
+        return -1
+    
+    max_reviews = 5000
+    review_weight = min(reviews / max_reviews, 1.0)
+    rating_weight = rating / 5
+    
+    score = (review_weight * 0.6 + rating_weight * 0.4) * 100
+    return round(score, 1)
+
+def rank_places(all_places: List[Dict], limit: int = 50) -> List[Dict]:
+    """중복 제거 후 점수 조건을 만족하는 장소를 점수순으로 반환"""
+    # 중복 제거
+    unique_places = {place["place_id"]: place for place in all_places}
+    
+    # 필터링 및 정렬
+    filtered_places = [place for place in unique_places.values() if calculate_place_score(place) != -1]
+    sorted_places = sorted(filtered_places, key=calculate_place_score, reverse=True)
+    
+    return sorted_places[:limit]
+
+def parse_place_details(result: Dict) -> Dict:
+    """Place Details 응답의 result를 화면 표시용 dict로 변환"""
+    return {
+        "name": result.get("name"),
+        "address": result.get("formatted_address"),
+        "location": result.get("geometry", {}).get("location"),
+        "opening_hours": result.get("opening_hours", {}).get("weekday_text", []),
+        "opening_periods": result.get("opening_hours", {}).get("periods", []),  # 영업시간 색인용
+        "rating": result.get("rating"),
+        "reviews": [
+            {
+                "text": review.get("text"),
+                "rating": review.get("rating"),
+                "time": review.get("relative_time_description")
+            }
+            for review in result.get("reviews", [])
+            if len(review.get("text", "")) > 30  # 30자 이상 리뷰만 필터링
+            and review.get("rating", 0) >= 4     # 4점 이상 리뷰만 표시
+        ][:3],  # 상위 3개 리뷰만
+        # 리뷰 분석(review_pipeline)용 전체 리뷰 (필터링 없음)
+        "all_reviews": [
+            {"text": review.get("text"), "rating": review.get("rating")}
+            for review in result.get("reviews", [])
+        ],
+        "price_level": result.get("price_level"),
+        "photos": [photo.get("photo_reference") for photo in result.get("photos", [])[:5]],  # 최대 5장
+        "website": result.get("website"),
+        "phone": result.get("formatted_phone_number")
+    }
+
+@traced("places.calculate_city_radius")
 def calculate_city_radius(location: Dict[str, float]) -> int:
     """
     도시의 viewport 정보를 기반으로 적절한 검색 반경을 계산
     """
-    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+    cache = city_radius_cache()
+    radius = cache.get(city_radius_key(location))
+    record_cache(radius is not None)
+    if radius is not None:
+        return radius
+    
+    base_url = GEOCODE_URL
     params = {
         "latlng": f"{location['lat']},{location['lng']}",
         "key": GOOGLE_CLOUD_API_KEY
     }
     
     try:
-        response = requests.get(base_url, params=params)
+        response = traced_request("GET", base_url, endpoint="google.geocode", params=params)
         data = response.json()
         
-        if data.get("results"):
-            # 도시 정보를 찾기 위해 결과를 순회
-            for result in data["results"]:
-                if "locality" in result["types"]:
-                    viewport = result["geometry"]["viewport"]
-                    ne = viewport["northeast"]
-                    sw = viewport["southwest"]
-                    
-                    # 위도/경도 차이를 km로 변환하여 대략적인 도시 크기 계산
-                    lat_diff = abs(ne["lat"] - sw["lat"])
-                    lng_diff = abs(ne["lng"] - sw["lng"])
-                    
-                    # 도시의 대각선 길이를 기준으로 반경 결정
-                    city_size = (lat_diff ** 2 + lng_diff ** 2) ** 0.5
-                    
-                    if city_size > 0.5:  # 대도시 (예: 뉴욕, 도쿄)
-                        return 50000
-                    elif city_size > 0.2:  # 중간 크기 도시
-                        return 30000
-                    else:  # 작은 도시
-                        return 15000
+        radius = radius_from_geocode(data)
+        if radius is not None:
+            cache.set(city_radius_key(location), radius)
+            return radius
     except Exception as e:
         print(f"Error calculating city radius: {str(e)}")
     
-    return 30000  # 기본값으로 30km 반환
+    return DEFAULT_CITY_RADIUS  # 기본값으로 30km 반환
 
-def get_nearby_places(location: Dict[str, float], selected_themes: List[str]) -> List[Dict]:
+def search_nearby(location: Dict[str, float], radius: int, query: NearbyQuery, max_pages: Optional[int] = None,
+                  max_results: int = MAX_RESULTS_PER_TYPE) -> List[Dict]:
     """
-    선택된 위치 주변의 관광지를 검색합니다.
-    동적 반경 조정과 결과 수에 따른 최적화를 포함합니다.
+    Nearby Search 요청(NearbyQuery) 하나의 결과를 next_page_token을 따라가며 모읍니다.
+    첫 페이지가 일시적 오류(OVER_QUERY_LIMIT 등)이면 결과 없음과 구분되도록 예외를 냅니다.
     """
-    # 도시 크기에 따른 초기 검색 반경 계산
-    initial_radius = calculate_city_radius(location)
-    print(f"Initial search radius: {initial_radius}m")
-    
-    # 선택된 테마에 해당하는 place type들을 모두 가져옴
-    place_types = []
-    for theme in selected_themes:
-        place_types.extend(THEME_TO_PLACE_TYPE.get(theme, []))
-    
-    all_places = []
-    current_radius = initial_radius
+    params = {
+        "location": f"{location['lat']},{location['lng']}",
+        "radius": radius,
+        **query.params(),
+        "language": "ko",
+        "key": GOOGLE_CLOUD_API_KEY
+    }
+    results = []
+    pages = 0
     
-    for place_type in place_types:
-        results = []
-        next_page_token = None
-        
-        while True:
-            base_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-            params = {
-                "location": f"{location['lat']},{location['lng']}",
-                "radius": current_radius,
-                "type": place_type,
-                "language": "ko",
-                "key": GOOGLE_CLOUD_API_KEY
-            }
+    while True:
+        try:
+            response = traced_request("GET", NEARBY_SEARCH_URL, endpoint="google.places.nearbysearch", params=params)
+            response.raise_for_status()
+            data = response.json()
             
-            if next_page_token:
-                params["pagetoken"] = next_page_token
-            
-            try:
-                response = requests.get(base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                # 결과 처리
-                batch_results = data.get("results", [])
-                results.extend(batch_results)
-                
-                # 다음 페이지 토큰 확인
-                next_page_token = data.get("next_page_token")
-                
-                # 결과가 너무 많으면 반경 줄이기
-                if len(results) >= 60 and not next_page_token:
-                    current_radius = int(current_radius * 0.8)  # 40% 감소
-                    print(f"Too many results, reducing radius to {current_radius}m")
-                    results = results[:60]  # 최대 60개로 제한
-                    break
-                
-                if not next_page_token:
-                    break
-                
-                # API 제한을 위한 대기
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"Error fetching places for type {place_type}: {str(e)}")
-                break
+            # 할당량 초과 등 일시적 오류는 결과 없음으로 기록하지 않음
+            status = data.get("status")
+            if status != "OK" and status not in NEARBY_EMPTY_STATUSES:
+                raise RuntimeError(f"Nearby Search failed: {status}")
+        except Exception as e:
+            if pages == 0:
+                raise
+            # 다음 페이지 실패는 이미 받은 결과만 사용
+            print(f"Error fetching next page for type {query.label}: {str(e)}")
+            break
         
-        # 결과 처리 및 중복 제거를 위한 정보 저장
-        for place in results:
-            place_details = {
-                "place_id": place["place_id"],
-                "name": place["name"],
-                "location": place["geometry"]["location"],
-                "rating": place.get("rating", 0),
-                "user_ratings_total": place.get("user_ratings_total", 0),
-                "types": place["types"],
-                "place_type": place_type
-            }
-            
-            if "photos" in place:
-                place_details["photo_reference"] = place["photos"][0]["photo_reference"]
-            
-            if "price_level" in place:
-                place_details["price_level"] = place["price_level"]
-            
-            all_places.append(place_details)
-    
-    # 중복 제거
-    unique_places = {place["place_id"]: place for place in all_places}
-    
-    def calculate_score(place):
-        rating = place.get("rating", 0)
-        reviews = place.get("user_ratings_total", 0)
-        
-        if reviews < 100 or rating < 4.0:
-            return -1
+        results.extend(data.get("results", []))
+        pages += 1
         
-        max_reviews = 5000
-        review_weight = min(reviews / max_reviews, 1.0)
-        rating_weight = rating / 5
+        # 다음 페이지 토큰 확인
+        next_page_token = data.get("next_page_token")
+        if (not next_page_token or len(results) >= max_results
+                or (max_pages is not None and pages >= max_pages)):
+            break
         
-        score = (review_weight * 0.6 + rating_weight * 0.4) * 100
-        return round(score, 1)
+        # 토큰은 발급 직후 바로 사용할 수 없어 잠시 대기
+        time.sleep(2)
+        params["pagetoken"] = next_page_token
     
-    # 필터링 및 정렬
-    filtered_places = [place for place in unique_places.values() if calculate_score(place) != -1]
-    sorted_places = sorted(filtered_places, key=calculate_score, reverse=True)
+    return results[:max_results]
+
+@traced("places.get_nearby_places")
+def get_nearby_places(location: Dict[str, float], selected_themes: List[str]) -> List[Dict]:
+    """
+    선택된 위치 주변의 관광지를 검색합니다.
+    여행지별 후보 풀(candidate_pool)을 사용하므로 이미 검색한 type은 다시 요청하지 않습니다.
+    """
+    # candidate_pool이 이 모듈의 검색 함수를 사용하므로 호출 시점에 불러옴
+    from utils.candidate_pool import CandidatePool
     
-    return sorted_places[:50]  # 상위 50개만 반환
+    # 상위 50개만 반환 (검색 중심으로부터의 거리 포함)
+    return CandidatePool(location).places(selected_themes)
 
+@traced("places.get_place_details")
 def get_place_details(place_id: str) -> Optional[Dict]:
     """
     특정 장소의 상세 정보를 가져옵니다.
     """
-    base_url = "https://maps.googleapis.com/maps/api/place/details/json"
+    base_url = PLACE_DETAILS_URL
     params = {
         "place_id": place_id,
-        "fields": "name,formatted_address,geometry,opening_hours,rating,reviews,price_level,photos,website,formatted_phone_number",
+        "fields": PLACE_DETAILS_FIELDS,
         "language": "ko",
         "key": GOOGLE_CLOUD_API_KEY
     }
     
     try:
-        response = requests.get(base_url, params=params)
+        response = traced_request("GET", base_url, endpoint="google.places.details", params=params)
         response.raise_for_status()
-        result = response.json().get("result", {})
+        data = response.json()
         
-        return {
-            "name": result.get("name"),
-            "address": result.get("formatted_address"),
-            "location": result.get("geometry", {}).get("location"),
-            "opening_hours": result.get("opening_hours", {}).get("weekday_text", []),
-            "rating": result.get("rating"),
-            "reviews": [
-                {
-                    "text": review.get("text"),
-                    "rating": review.get("rating"),
-                    "time": review.get("relative_time_description")
-                }
-                for review in result.get("reviews", [])
-                if len(review.get("text", "")) > 30  # 30자 이상 리뷰만 필터링
-                and review.get("rating", 0) >= 4     # 4점 이상 리뷰만 표시
-            ][:3],  # 상위 3개 리뷰만
-            "price_level": result.get("price_level"),
-            "photos": [photo.get("photo_reference") for photo in result.get("photos", [])[:5]],  # 최대 5장
-            "website": result.get("website"),
-            "phone": result.get("formatted_phone_number")
-        }
+        # OVER_QUERY_LIMIT 등은 빈 상세 정보가 캐시되지 않도록 None
+        if data.get("status") != "OK" or "result" not in data:
+            print(f"Place details unavailable for {place_id}: {data.get('status')}")
+            return None
+        return parse_place_details(data["result"])
         
     except Exception as e:
         print(f"Error fetching place details: {str(e)}")
         return None
 
+@traced("places.get_place_photo")
 def get_place_photo(photo_reference: str, max_width: int = 400) -> Optional[str]:
     """
     장소 사진의 URL을 가져옵니다.
     """
-    base_url = "https://maps.googleapis.com/maps/api/place/photo"
+    base_url = PLACE_PHOTO_URL
     params = {
         "photoreference": photo_reference,
         "maxwidth": max_width,
@@ -219,7 +282,7 @@ def get_place_photo(photo_reference: str, max_width: int = 400) -> Optional[str]
     }
     
     try:
-        response = requests.get(base_url, params=params, allow_redirects=False)
+        response = traced_request("GET", base_url, endpoint="google.places.photo", params=params, allow_redirects=False)
         if response.status_code == 302:  # Google은 리다이렉트로 실제 이미지 URL을 제공
             return response.headers["Location"]
     except Exception as e:
@@ -0,0 +1,181 @@
+"""
+여행 계획 저장/복원.
+
+계획(여행지, 날짜, 테마, 검색 결과, 예산 일정)은 장소 dict를 복사하지 않고 place_id만 담아 저장하고,
+장소 dict는 공유 장소 테이블에 place_id별로 한 번만 저장합니다. 직렬화는 msgpack(없으면 JSON)을
+zlib으로 압축한 값이며, 계획 ID는 내용 해시라서 같은 계획은 같은 ID가 됩니다.
+
+Example:
+    store = get_plan_store()
+    plan_id = store.save(plan, places={"hotel": hotels, "place": restaurants + attractions})
+    plan, places = store.load(plan_id)   # API 호출 없이 DB 조회 두 번
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.tracing import traced
+from utils.video_store import format_timestamp, utc_now
+
+logger = logging.getLogger(__name__)
+
+PLAN_VERSION = 1
+
+# 직렬화 형식 표시 (저장값의 첫 바이트)
+_MSGPACK = b"M"
+_JSON = b"J"
+
+
+def _msgpack():
+    """msgpack이 설치되어 있으면 모듈을, 아니면 None을 반환합니다."""
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+def encode(value) -> bytes:
+    msgpack = _msgpack()
+    if msgpack is not None:
+        return _MSGPACK + zlib.compress(msgpack.packb(value, use_bin_type=True))
+    payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return _JSON + zlib.compress(payload.encode("utf-8"))
+
+
+def decode(data: bytes):
+    kind, payload = data[:1], zlib.decompress(data[1:])
+    if kind == _MSGPACK:
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise RuntimeError("msgpack is required to read this plan")
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload.decode("utf-8"))
+
+
+def plan_id_for(data: bytes) -> str:
+    """저장값의 해시로 만든 공유용 ID (URL에 그대로 쓸 수 있는 12자)"""
+    return base64.urlsafe_b64encode(hashlib.sha256(data).digest()[:9]).decode("ascii")
+
+
+class PlanStore:
+    """
+    SQLite에 계획과 공유 장소 테이블을 저장합니다.
+
+    - plans: plan_id → 계획 (장소는 place_id 참조만)
+    - places: (kind, place_id) → 장소 dict. kind는 같은 place_id라도 형식이 다른 dict를 구분
+      ("hotel": 호텔 검색 결과, "place": Nearby Search 결과, "details": Place Details)
+    """
+
+    def __init__(self, db_path: str = "plans.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS plans (
+                    plan_id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS places (
+                    kind TEXT NOT NULL,
+                    place_id TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (kind, place_id)
+                );
+            """)
+
+    def put_places(self, kind: str, places: Iterable[Dict]):
+        """장소 dict를 공유 테이블에 저장합니다 (같은 place_id는 최신 값으로 갱신)."""
+        updated_at = format_timestamp(utc_now())
+        rows = [(kind, place["place_id"], encode(place), updated_at)
+                for place in places if place and place.get("place_id")]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO places (kind, place_id, data, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def get_places(self, kind: str, place_ids: List[str]) -> Dict[str, Dict]:
+        if not place_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in place_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT place_id, data FROM places WHERE kind = ? AND place_id IN ({placeholders})",
+                (kind, *place_ids)
+            ).fetchall()
+        return {place_id: decode(data) for place_id, data in rows}
+
+    @traced("plans.save")
+    def save(self, plan: Dict, places: Optional[Dict[str, Iterable[Dict]]] = None) -> str:
+        """
+        계획을 저장하고 plan_id를 반환합니다.
+        places({kind: 장소 목록})는 계획이 참조하는 장소 dict로, 공유 장소 테이블에 넣습니다.
+        """
+        for kind, items in (places or {}).items():
+            self.put_places(kind, items)
+        data = encode({"version": PLAN_VERSION, **plan})
+        plan_id = plan_id_for(data)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO plans (plan_id, data, created_at) VALUES (?, ?, ?)",
+                (plan_id, data, format_timestamp(utc_now()))
+            )
+        return plan_id
+
+    @traced("plans.load")
+    def load(self, plan_id: str, kinds: Dict[str, List[str]]) -> Tuple[Optional[Dict], Dict[str, Dict[str, Dict]]]:
+        """
+        계획과, 계획이 참조하는 장소들({kind: {place_id: 장소}})을 반환합니다.
+        kinds는 계획 dict에서 kind별 place_id 목록을 뽑는 키 이름({kind: [계획 키, ...]})입니다.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM plans WHERE plan_id = ?", (plan_id,)).fetchone()
+        if row is None:
+            return None, {}
+        plan = decode(row[0])
+        places = {}
+        for kind, keys in kinds.items():
+            place_ids = sorted({place_id for key in keys for place_id in flatten_ids(plan.get(key))})
+            places[kind] = self.get_places(kind, place_ids)
+        return plan, places
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def flatten_ids(value) -> List[str]:
+    """place_id, place_id 목록, 또는 (날짜별) 목록의 목록을 평평한 place_id 목록으로"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [place_id for item in value for place_id in flatten_ids(item)]
+
+
+def place_ids(places: Optional[Iterable[Dict]]) -> List[str]:
+    return [place["place_id"] for place in places or [] if place.get("place_id")]
+
+
+_store: Optional[PlanStore] = None
+_store_lock = threading.Lock()
+
+
+def get_plan_store() -> PlanStore:
+    """프로세스 전체에서 공유하는 PlanStore (경로: NAVI_PLAN_DB, 기본 plans.db)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PlanStore(os.environ.get("NAVI_PLAN_DB", "plans.db"))
+        return _store
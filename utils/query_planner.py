@@ -0,0 +1,159 @@
+"""
+테마 → Nearby Search 요청 계획.
+
+THEME_TO_PLACE_TYPE의 타입 중 일부(landmark, hot_spring, massage, waterfall 등)는 Nearby Search의
+type 필터로 쓸 수 없어 매번 빈 결과(INVALID_REQUEST)에 요청만 소모합니다. 계획 단계에서
+
+- 지원되는 타입은 그대로, 지원되지 않는 타입은 비슷한 지원 타입이나 키워드 검색으로 바꾸고
+- 그 결과 같아진 요청(예: landmark/town_square → tourist_attraction)은 하나로 합치며
+- 지역별로 결과가 없었던 요청은 일정 기간 건너뜁니다.
+
+Example:
+    planner = get_query_planner()
+    for query in planner.plan(["관광명소", "휴양/힐링"], location):
+        results = ...  # query.place_type / query.keyword로 Nearby Search
+        planner.record(location, query, len(results))
+"""
+import logging
+import math
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Nearby Search(legacy)의 type 필터로 쓸 수 있는 타입
+SUPPORTED_PLACE_TYPES = frozenset({
+    "accounting", "airport", "amusement_park", "aquarium", "art_gallery", "atm", "bakery", "bank", "bar",
+    "beauty_salon", "bicycle_store", "book_store", "bowling_alley", "bus_station", "cafe", "campground",
+    "car_dealer", "car_rental", "car_repair", "car_wash", "casino", "cemetery", "church", "city_hall",
+    "clothing_store", "convenience_store", "courthouse", "dentist", "department_store", "doctor",
+    "drugstore", "electrician", "electronics_store", "embassy", "fire_station", "florist", "funeral_home",
+    "furniture_store", "gas_station", "gym", "hair_care", "hardware_store", "hindu_temple",
+    "home_goods_store", "hospital", "insurance_agency", "jewelry_store", "laundry", "lawyer", "library",
+    "light_rail_station", "liquor_store", "local_government_office", "locksmith", "lodging",
+    "meal_delivery", "meal_takeaway", "mosque", "movie_rental", "movie_theater", "moving_company",
+    "museum", "night_club", "painter", "park", "parking", "pet_store", "pharmacy", "physiotherapist",
+    "plumber", "police", "post_office", "primary_school", "real_estate_agency", "restaurant",
+    "roofing_contractor", "rv_park", "school", "secondary_school", "shoe_store", "shopping_mall", "spa",
+    "stadium", "storage", "store", "subway_station", "supermarket", "synagogue", "taxi_stand",
+    "tourist_attraction", "train_station", "transit_station", "travel_agency", "university",
+    "veterinary_care", "zoo"
+})
+
+
+class NearbyQuery(NamedTuple):
+    """Nearby Search 요청 하나 (type 필터와 keyword 중 하나 이상)"""
+    place_type: Optional[str]
+    keyword: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        """결과의 place_type으로 기록할 이름"""
+        return self.place_type or self.keyword
+
+    def params(self) -> Dict[str, str]:
+        params = {}
+        if self.place_type:
+            params["type"] = self.place_type
+        if self.keyword:
+            params["keyword"] = self.keyword
+        return params
+
+
+# 지원되지 않는 타입 → 대체 요청 (비슷한 지원 타입이 있으면 그 타입, 없으면 키워드 검색)
+TYPE_ALIASES = {
+    "landmark": NearbyQuery("tourist_attraction"),
+    "town_square": NearbyQuery("tourist_attraction"),
+    "pier": NearbyQuery("tourist_attraction"),
+    "marina": NearbyQuery("tourist_attraction"),
+    "natural_feature": NearbyQuery("park"),
+    "picnic_ground": NearbyQuery("park"),
+    "ice_cream_shop": NearbyQuery("cafe"),
+    "hot_spring": NearbyQuery("spa"),
+    "massage": NearbyQuery("spa"),
+    "historic_site": NearbyQuery(None, "유적지"),
+    "archaeological_site": NearbyQuery(None, "유적지"),
+    "beach": NearbyQuery(None, "해수욕장"),
+    "waterfall": NearbyQuery(None, "폭포"),
+    "market": NearbyQuery(None, "전통시장"),
+}
+
+REGION_GRID = 0.1           # 결과 수를 기록하는 지역 격자 (약 10km)
+MIN_OBSERVATIONS = 2        # 이 횟수만큼 연속으로 결과가 없어야 건너뜀
+YIELD_TTL = 7 * 24 * 60 * 60  # 기록 유지 기간 (새 장소가 생길 수 있으므로 주기적으로 다시 시도)
+
+
+def resolve_type(place_type: str) -> Optional[NearbyQuery]:
+    """place type을 실제로 보낼 요청으로 바꿉니다 (대체할 수 없으면 None)."""
+    if place_type in SUPPORTED_PLACE_TYPES:
+        return NearbyQuery(place_type)
+    return TYPE_ALIASES.get(place_type)
+
+
+def region_key(location: Dict[str, float]) -> Tuple[int, int]:
+    return (math.floor(location["lat"] / REGION_GRID), math.floor(location["lng"] / REGION_GRID))
+
+
+class QueryPlanner:
+    """
+    테마 목록을 중복 없는 NearbyQuery 목록으로 바꾸고, 지역별 결과 수를 기억합니다.
+
+    결과 수 기록은 get_cache("query_yield")에 (지역, 요청) → (연속으로 결과가 없던 횟수, 마지막 결과 수)로
+    저장되며, 결과가 한 번이라도 나오면 횟수가 초기화됩니다.
+    """
+
+    def __init__(self, min_observations: int = MIN_OBSERVATIONS, ttl: float = YIELD_TTL):
+        self.min_observations = min_observations
+        self.stats = get_cache("query_yield", ttl=ttl, maxsize=65536)
+        self._lock = threading.Lock()
+
+    def expand(self, place_types: Iterable[str]) -> List[NearbyQuery]:
+        """place type 목록을 대체/병합한 요청 목록 (처음 나온 순서 유지)"""
+        queries = []
+        for place_type in place_types:
+            query = resolve_type(place_type)
+            if query is None:
+                logger.warning(f"Skipping unsupported place type: {place_type}")
+            elif query not in queries:
+                queries.append(query)
+        return queries
+
+    def is_barren(self, location: Dict[str, float], query: NearbyQuery) -> bool:
+        """이 지역에서 결과가 없던 요청인지"""
+        misses, _ = self.stats.get((region_key(location), query), (0, None))
+        return misses >= self.min_observations
+
+    def plan(self, selected_themes: List[str], location: Optional[Dict[str, float]] = None) -> List[NearbyQuery]:
+        """선택된 테마에 필요한 요청 목록 (location이 있으면 결과가 없던 요청은 제외)"""
+        from utils.places_helper import themes_to_place_types
+
+        queries = self.expand(themes_to_place_types(selected_themes))
+        if location is None:
+            return queries
+        planned = [query for query in queries if not self.is_barren(location, query)]
+        skipped = len(queries) - len(planned)
+        if skipped:
+            logger.info(f"Skipping {skipped} zero-yield queries near {region_key(location)}")
+        return planned
+
+    def record(self, location: Dict[str, float], query: NearbyQuery, result_count: int):
+        """요청의 결과 수를 기록합니다 (요청 자체가 실패한 경우에는 호출하지 않음)."""
+        key = (region_key(location), query)
+        with self._lock:
+            misses, _ = self.stats.get(key, (0, None))
+            self.stats.set(key, (0 if result_count else misses + 1, result_count))
+
+
+_planner: Optional[QueryPlanner] = None
+_planner_lock = threading.Lock()
+
+
+def get_query_planner() -> QueryPlanner:
+    """프로세스 전체에서 공유하는 QueryPlanner"""
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = QueryPlanner()
+        return _planner
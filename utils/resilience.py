@@ -0,0 +1,245 @@
+"""
+외부 API 장애 대응: 엔드포인트별 회로 차단기, stale-while-revalidate 캐시, degraded 표시.
+
+Google Places나 네이버 API가 느리거나 실패하면 헬퍼들은 타임아웃까지 기다린 뒤 빈 결과를 반환했습니다.
+여기서는
+
+- 연속 실패가 쌓인 엔드포인트의 회로를 열어 reset_timeout 동안 요청 없이 바로 실패시키고
+  (traced_request와 AsyncPlacesClient가 endpoint 이름별로 사용)
+- 만료된 캐시 값은 버리지 않고 보관해 두었다가 바로 반환하면서 백그라운드에서 갱신하며
+  (회로가 열려 있으면 갱신하지 않고 오래된 값을 계속 사용)
+- 실패하거나 오래된 값을 사용한 사실을 degraded_scope로 모아 화면에 알립니다.
+
+Example:
+    with degraded_scope() as degraded:
+        places = get_nearby_places(location, themes)
+    if degraded:
+        st.warning("일부 결과가 최신이 아닐 수 있습니다")
+
+    sweeps = StaleCache(get_cache("candidate_sweeps", ttl=STALE_TTL), fresh_ttl=6 * 3600,
+                        endpoint="google.places.nearbysearch")
+    places = sweeps.get_or_fetch(key, fetch_fn)   # fetch_fn은 실패 시 None
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = 5   # 연속 실패 횟수
+RESET_TIMEOUT = 30.0    # 회로를 연 뒤 시험 요청을 보내기까지 (초)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """회로가 열려 있어 요청을 보내지 않았을 때"""
+
+
+class CircuitBreaker:
+    """
+    엔드포인트 하나의 회로 차단기입니다.
+
+    closed: 요청을 보내고, 연속 실패가 failure_threshold번이면 open
+    open: reset_timeout 동안 요청을 보내지 않음 (allow()가 False)
+    half_open: 시험 요청 하나만 보내고, 성공하면 closed, 실패하면 다시 open
+
+    allow()가 True를 반환한 요청은 record_success, record_failure, release 중 하나로 끝나야 합니다.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """요청을 보내도 되는지 (half_open에서는 시험 요청 하나만 허용)"""
+        with self._lock:
+            state = self._state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit closed: {self.name}")
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or (self._opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning(f"Circuit opened: {self.name} ({self.failures} consecutive failures)")
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self):
+        """
+        요청이 성공/실패를 기록하지 못하고 끝났을 때 (취소, 예상 밖의 예외 등) 호출합니다.
+        상태는 바꾸지 않고 시험 요청 표시만 풀어, 다음 요청이 다시 시험 요청이 될 수 있게 합니다.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def to_dict(self) -> Dict:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """엔드포인트 이름(예: google.places.nearbysearch)별로 공유되는 회로 차단기"""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.to_dict() for breaker in breakers}
+
+
+def open_circuits() -> Set[str]:
+    """
+    회로가 열려 있는 엔드포인트. half_open은 다음 요청이 시험 요청이 되므로 포함하지 않습니다
+    (요청이 없는 엔드포인트가 계속 장애로 표시되지 않도록).
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name for breaker in breakers if breaker.state == OPEN}
+
+
+# 현재 작업에서 실패했거나 오래된 값을 사용한 엔드포인트 (degraded_scope 밖에서는 None)
+_degraded = contextvars.ContextVar("degraded", default=None)
+
+
+@contextmanager
+def degraded_scope():
+    """
+    블록 안에서 외부 API 실패, 회로 차단, 오래된 캐시 사용이 있었던 엔드포인트 집합을 모읍니다.
+    중첩되면 안쪽에서 모은 값이 바깥 scope에도 더해집니다.
+    """
+    outer = _degraded.get()
+    reasons: Set[str] = set()
+    token = _degraded.set(reasons)
+    try:
+        yield reasons
+    finally:
+        _degraded.reset(token)
+        if outer is not None:
+            outer.update(reasons)
+
+
+def mark_degraded(endpoint: str):
+    reasons = _degraded.get()
+    if reasons is not None:
+        reasons.add(endpoint)
+
+
+class StaleCache:
+    """
+    stale-while-revalidate 캐시 래퍼입니다.
+
+    캐시에는 (가져온 시각, 값)을 저장하며, 캐시 자체의 TTL은 오래된 값을 보관할 기간입니다.
+    fresh_ttl이 지난 값은 바로 반환하고 백그라운드 스레드에서 한 번만 갱신합니다.
+    endpoint의 회로가 열려 있으면 갱신하지 않고 오래된 값을 그대로 사용합니다 (degraded로 표시).
+    """
+
+    def __init__(self, cache, fresh_ttl: float, endpoint: Optional[str] = None):
+        self.cache = cache
+        self.fresh_ttl = fresh_ttl
+        self.endpoint = endpoint
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable) -> Tuple[Any, bool]:
+        """(값, 신선한지). 값이 없으면 (None, False)"""
+        entry = self.cache.get(key)
+        if not isinstance(entry, tuple) or len(entry) != 2:
+            # 없거나 StaleCache 이전 형식으로 저장된 값
+            return None, False
+        fetched_at, value = entry
+        return value, time.time() - fetched_at < self.fresh_ttl
+
+    def set(self, key: Hashable, value: Any):
+        self.cache.set(key, (time.time(), value))
+
+    def circuit_open(self) -> bool:
+        return self.endpoint is not None and get_breaker(self.endpoint).state == OPEN
+
+    def get_or_fetch(self, key: Hashable, fetch_fn: Callable[[], Any]) -> Any:
+        """
+        신선한 값 → 그대로, 오래된 값 → 그대로 반환하고 백그라운드 갱신, 없음 → fetch_fn 호출.
+        fetch_fn은 실패 시 None을 반환하며, 실패한 결과는 저장하지 않습니다.
+        """
+        value, fresh = self.lookup(key)
+        if value is not None:
+            if not fresh:
+                if self.circuit_open():
+                    mark_degraded(self.endpoint)
+                else:
+                    self.revalidate(key, fetch_fn)
+            return value
+
+        value = fetch_fn()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def revalidate(self, key: Hashable, fetch_fn: Callable[[], Any]):
+        """백그라운드에서 값을 갱신합니다 (같은 키는 동시에 하나만)."""
+        # tracing이 이 모듈을 사용하므로 호출 시점에 불러옴
+        from utils.tracing import propagate
+
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch_fn()
+                if value is not None:
+                    self.set(key, value)
+            except Exception as e:
+                logger.error(f"Error revalidating cache entry: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=propagate(refresh), name="cache-revalidate", daemon=True).start()
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Hashable, List, MutableMapping, Optional, Tuple
+
+from utils.cache import get_cache
+from utils.lazy import lazy_module
+from utils.resilience import degraded_scope, open_circuits
+from utils.tracing import record_cache, span
+
+np = lazy_module("numpy")
+
+# 장애 중에 가져온 결과를 표시하는 세션 키의 namespace
+DEGRADED = "_degraded"
+
+# 정렬 옵션 → (필드, 내림차순 여부). 필드가 None이면 원래 순서 유지
+HOTEL_SORT_OPTIONS = {
+    "추천순": ("relevance_score", True),
+    "인기순": ("popularity_score", True),
+    "리뷰 많은순": ("review_count", True),
+    "평점 높은순": ("rating", True),
+    "거리순": ("distance", False),
+    "가격 낮은순": ("price_level", False),
+}
+
+PLACE_SORT_OPTIONS = {
+    "추천순": (None, False),
+    "인기순": ("popularity_score", True),
+    "리뷰 많은순": ("user_ratings_total", True),
+    "평점 높은순": ("rating", True),
+    "거리순": ("distance", False),
+}
+
+# 값이 없는 레코드에 쓸 값 (기본 0). 위치가 없어 거리를 모르는 장소는 거리순에서 맨 뒤로 가고
+# 최대 거리 필터를 통과하지 못하도록 inf
+MISSING_VALUES = {
+    "distance": float("inf"),
+}
+
+
+def location_key(location: Dict[str, float]) -> Tuple[float, float]:
+    """위치 dict를 캐시 키로 쓰기 위한 (lat, lng) 튜플 (약 1m 단위로 반올림)"""
+    return (round(float(location["lat"]), 5), round(float(location["lng"]), 5))
+
+
+class ResultView:
+    """
+    검색 결과 목록의 숫자 필드를 배열로 만들고 정렬 순서를 미리 계산해 둔 뷰입니다.
+    필터/정렬 위젯을 바꿀 때는 미리 정렬된 인덱스를 마스크로 잘라내기만 합니다.
+    """
+
+    def __init__(self, records: List[Dict], sort_options: Dict[str, Tuple[Optional[str], bool]]):
+        self.records = records
+        self._columns: Dict[str, np.ndarray] = {}
+        self._orders: Dict[str, np.ndarray] = {}
+        for option, (field, descending) in sort_options.items():
+            if field is None:
+                self._orders[option] = np.arange(len(records))
+                continue
+            values = self.column(field)
+            # 안정 정렬로 동점일 때 원래 순서 유지 (list.sort와 동일)
+            self._orders[option] = np.argsort(-values if descending else values, kind="stable")
+
+    def column(self, field: str) -> np.ndarray:
+        if field not in self._columns:
+            missing = MISSING_VALUES.get(field, 0.0)
+            values = []
+            for record in self.records:
+                value = record.get(field)
+                if value is None:
+                    values.append(missing)
+                    continue
+                try:
+                    values.append(float(value or 0))
+                except (TypeError, ValueError):
+                    values.append(missing)
+            self._columns[field] = np.asarray(values, dtype=np.float64)
+        return self._columns[field]
+
+    def select(self, sort_option: str, minimums: Optional[Dict[str, float]] = None,
+               maximums: Optional[Dict[str, float]] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        필드별 최솟값/최댓값 조건을 만족하는 결과를 sort_option 순서로 반환합니다.
+
+        Example:
+            view.select("평점 높은순", minimums={"rating": 4.0}, maximums={"price_level": 3})
+        """
+        mask = np.ones(len(self.records), dtype=bool)
+        for field, value in (minimums or {}).items():
+            mask &= self.column(field) >= value
+        for field, value in (maximums or {}).items():
+            mask &= self.column(field) <= value
+        order = self._orders[sort_option]
+        indices = order[mask[order]]
+        if limit is not None:
+            indices = indices[:limit]
+        return [self.records[i] for i in indices]
+
+
+class ResultStore:
+    """
+    rerun 사이에 검색 결과를 보존하는 저장소입니다.
+
+    세션 상태(session_state)를 먼저 확인하고, 없으면 프로세스 공유 캐시를 확인한 뒤
+    둘 다 없을 때만 fetch 함수를 호출합니다. 빈 결과는 재시도할 수 있도록 저장하지 않지만,
+    put으로 넣은 빈 결과(저장된 계획 복원 등)는 이 세션에만 저장합니다.
+
+    외부 API 장애 중에 가져온(degraded) 결과는 세션에만 두고 공유 캐시에는 넣지 않으며,
+    모든 회로가 닫히면 다음 rerun에서 다시 가져옵니다.
+    """
+
+    SESSION_KEY = "_result_store"
+
+    def __init__(self, session_state: MutableMapping, shared_ttl: float = 3600):
+        if self.SESSION_KEY not in session_state:
+            session_state[self.SESSION_KEY] = {}
+        self._session: Dict[Tuple[str, Hashable], Any] = session_state[self.SESSION_KEY]
+        self.shared_ttl = shared_ttl
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        return self._session.get((namespace, key))
+
+    def put(self, namespace: str, key: Hashable, value: Any):
+        """
+        미리 가져온 결과(동시 조회, 계획 복원 등)를 세션과 공유 캐시에 저장합니다.
+        None은 무시하고, 빈 결과는 다른 세션이 재시도할 수 있도록 세션에만 저장합니다.
+        """
+        if value is None:
+            return
+        self._session[(namespace, key)] = value
+        if value:
+            get_cache(f"results.{namespace}", ttl=self.shared_ttl).set(key, value)
+
+    def get_or_fetch(self, namespace: str, key: Hashable, fetch_fn: Callable[[], Any]) -> Any:
+        with span(f"results.{namespace}"):
+            value = self._session.get((namespace, key))
+            if value is not None and (DEGRADED, (namespace, key)) in self._session and not open_circuits():
+                # 장애가 끝났으므로 불완전했던 결과를 버리고 다시 가져옴
+                del self._session[(DEGRADED, (namespace, key))]
+                value = None
+            if value is None:
+                value = get_cache(f"results.{namespace}", ttl=self.shared_ttl).get(key)
+                if value is not None:
+                    self._session[(namespace, key)] = value
+            record_cache(value is not None)
+            if value is not None:
+                return value
+
+            with degraded_scope() as degraded:
+                value = fetch_fn()
+            if degraded:
+                if value:
+                    self._session[(namespace, key)] = value
+                    self._session[(DEGRADED, (namespace, key))] = True
+            elif value:
+                self.put(namespace, key, value)
+            return value
+
+    def view(self, namespace: str, key: Hashable,
+             sort_options: Dict[str, Tuple[Optional[str], bool]]) -> Optional[ResultView]:
+        """저장된 결과의 ResultView (세션에 한 번만 생성)"""
+        records = self._session.get((namespace, key))
+        if not records:
+            return None
+        view_key = (f"{namespace}.view", key)
+        view = self._session.get(view_key)
+        if view is None or view.records is not records:
+            view = self._session[view_key] = ResultView(records, sort_options)
+        return view
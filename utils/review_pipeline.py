@@ -0,0 +1,257 @@
+"""
+장소 리뷰 분석 파이프라인: 키워드(TF-IDF), 감성 점수(사전 기반), 요약(추출식 또는 LLM).
+
+결과는 (place_id, 리뷰 해시)로 캐시되므로 리뷰가 바뀌지 않는 한 한 번만 계산됩니다.
+
+Example:
+    pipeline = get_review_pipeline()
+    insight = pipeline.process(place_id, details["all_reviews"])
+    insights = pipeline.process_many([(hotel["place_id"], hotel["reviews"]) for hotel in hotels])
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.cache import get_cache
+from utils.tracing import propagate, record_cache, span, traced
+
+logger = logging.getLogger(__name__)
+
+# 요약 함수: (리뷰 본문 목록, 키워드 목록) → 요약문 (실패 시 None)
+Summarizer = Callable[[List[str], List[str]], Optional[str]]
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]{2,}|[a-zA-Z]{3,}")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+# 긴 것부터 제거해야 "에서"가 "서"보다 먼저 떨어짐
+_PARTICLES = sorted(["은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "으로", "에서", "와", "과",
+                     "까지", "부터", "보다", "에게", "한테", "이라", "라서", "이고", "하고", "이나"],
+                    key=len, reverse=True)
+
+STOPWORDS = {
+    "정말", "너무", "진짜", "아주", "그냥", "그리고", "하지만", "그래서", "그래도", "대비", "조금", "다시", "많이",
+    "있어요", "있습니다", "했어요", "했습니다", "같아요", "입니다", "있는", "없는", "하는", "해서",
+    "the", "and", "was", "were", "for", "with", "this", "that", "very", "but", "are", "not", "have",
+    "had", "you", "they", "there", "place", "here"
+}
+
+# 어간(접두) 기준 감성 사전
+POSITIVE_STEMS = (
+    "좋", "맛있", "친절", "깨끗", "최고", "추천", "훌륭", "만족", "편안", "편리", "예쁘", "예뻐",
+    "멋지", "멋있", "아름답", "행복", "재밌", "재미있", "감동", "저렴", "신선",
+    "good", "great", "excellent", "clean", "friendly", "amazing", "love", "nice", "recommend",
+    "beautiful", "delicious", "perfect", "comfortable"
+)
+NEGATIVE_STEMS = (
+    "별로", "나쁘", "나빠", "불친절", "더럽", "더러", "비싸", "비쌈", "실망", "최악", "시끄럽", "시끄러", "좁", "불편",
+    "아쉽", "아쉬", "짜증", "불결", "냄새", "후회",
+    "bad", "dirty", "rude", "terrible", "worst", "expensive", "noisy", "disappoint", "small", "poor"
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """한글 2자 이상/영문 3자 이상 단어를 뽑고 조사와 불용어를 제거합니다."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall((text or "").lower()):
+        for particle in _PARTICLES:
+            if len(token) > len(particle) + 1 and token.endswith(particle):
+                token = token[:-len(particle)]
+                break
+        if token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def review_text(review: Dict) -> str:
+    return (review.get("text") or "").strip()
+
+
+def review_hash(reviews: Iterable[Dict]) -> str:
+    """리뷰 목록의 내용 해시 (순서 무관). 리뷰가 바뀌면 캐시가 자연히 무효화됩니다."""
+    items = sorted((review_text(review), review.get("rating") or 0) for review in reviews)
+    payload = json.dumps(items, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def lexicon_sentiment(text: str, rating: Optional[float] = None) -> float:
+    """
+    -1(부정) ~ 1(긍정) 사이 감성 점수.
+    사전 단어 비율과 별점((rating-3)/2)을 반반 섞으며, 둘 중 하나만 있으면 그 값을 씁니다.
+    """
+    tokens = _TOKEN_PATTERN.findall((text or "").lower())
+    positive = sum(1 for token in tokens if token.startswith(POSITIVE_STEMS))
+    negative = sum(1 for token in tokens if token.startswith(NEGATIVE_STEMS))
+    scores = []
+    if positive + negative:
+        scores.append((positive - negative) / (positive + negative))
+    if rating:
+        scores.append(max(-1.0, min(1.0, (float(rating) - 3) / 2)))
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def sentiment_label(score: float) -> str:
+    if score >= 0.3:
+        return "긍정"
+    if score <= -0.3:
+        return "부정"
+    return "중립"
+
+
+def extractive_summary(texts: List[str], keywords: List[str], max_sentences: int = 2) -> Optional[str]:
+    """키워드를 가장 많이 포함한 문장을 골라 요약으로 사용합니다."""
+    sentences = []
+    for text in texts:
+        sentences.extend(s.strip() for s in _SENTENCE_PATTERN.split(text) if len(s.strip()) >= 10)
+    if not sentences:
+        return None
+    keyword_set = set(keywords)
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (-len(keyword_set & set(tokenize(sentences[i]))), len(sentences[i]))
+    )
+    # 원래 순서를 유지해 자연스럽게 읽히도록 함
+    return " ".join(sentences[i] for i in sorted(ranked[:max_sentences]))
+
+
+class GeminiSummarizer:
+    """
+    google-generativeai로 리뷰를 요약합니다. 라이브러리는 첫 호출 때 불러옵니다.
+    호출에 실패하면 None을 반환하여 추출식 요약으로 대체되게 합니다.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-pro", max_chars: int = 4000):
+        self.api_key = api_key
+        self.model_name = model
+        self.max_chars = max_chars
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+                api_key = self.api_key
+                if api_key is None:
+                    import config0
+                    api_key = config0.GEMINI_API_KEY
+                genai.configure(api_key=api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def __call__(self, texts: List[str], keywords: List[str]) -> Optional[str]:
+        body = "\n".join(f"- {text}" for text in texts)[:self.max_chars]
+        prompt = (
+            "다음은 한 장소에 대한 방문자 리뷰입니다. 여행자가 참고할 수 있도록 장점과 단점을 "
+            f"두 문장 이내의 한국어로 요약해주세요. (주요 키워드: {', '.join(keywords)})\n\n{body}"
+        )
+        try:
+            with span("gemini.generate_content", kind="client", endpoint="gemini.generate_content"):
+                response = self._get_model().generate_content(prompt)
+            return (response.text or "").strip() or None
+        except Exception as e:
+            logger.error(f"Error summarizing reviews: {str(e)}")
+            return None
+
+
+class ReviewPipeline:
+    """
+    리뷰 목록에서 키워드/감성/요약을 만들고 (place_id, 리뷰 해시)별로 캐시합니다.
+
+    TF-IDF의 문서 빈도는 지금까지 처리한 장소들로 누적되므로 장소가 많아질수록
+    "좋아요"처럼 어디에나 나오는 단어의 비중이 낮아집니다.
+    """
+
+    def __init__(self, summarizer: Optional[Summarizer] = None, top_k: int = 5,
+                 max_workers: int = 4, cache_ttl: float = 7 * 24 * 60 * 60):
+        self.summarizer = summarizer
+        self.top_k = top_k
+        self.max_workers = max_workers
+        self.cache = get_cache("review_insights", ttl=cache_ttl, maxsize=8192)
+        self._document_frequency: Counter = Counter()
+        self._documents = 0
+        self._lock = threading.Lock()
+
+    def _keywords(self, token_lists: List[List[str]]) -> List[str]:
+        term_frequency = Counter(token for tokens in token_lists for token in tokens)
+        if not term_frequency:
+            return []
+        with self._lock:
+            self._document_frequency.update(set(term_frequency))
+            self._documents += 1
+            documents = self._documents
+            idf = {term: math.log((1 + documents) / (1 + self._document_frequency[term])) + 1
+                   for term in term_frequency}
+        scores = {term: count * idf[term] for term, count in term_frequency.items()}
+        return sorted(scores, key=lambda term: (-scores[term], term))[:self.top_k]
+
+    def _analyze(self, place_id: str, reviews: List[Dict], digest: str) -> Dict:
+        texts = [review_text(review) for review in reviews if review_text(review)]
+        keywords = self._keywords([tokenize(text) for text in texts])
+        sentiments = [lexicon_sentiment(review_text(review), review.get("rating")) for review in reviews]
+        sentiment = round(sum(sentiments) / len(sentiments), 3) if sentiments else 0.0
+
+        summary, source = None, None
+        if self.summarizer is not None and texts:
+            summary, source = self.summarizer(texts, keywords), "llm"
+        if summary is None:
+            summary, source = extractive_summary(texts, keywords), "extractive"
+
+        return {
+            "place_id": place_id,
+            "review_hash": digest,
+            "review_count": len(reviews),
+            "keywords": keywords,
+            "sentiment": sentiment,
+            "sentiment_label": sentiment_label(sentiment),
+            "summary": summary,
+            "summary_source": source if summary else None
+        }
+
+    @traced("reviews.process")
+    def process(self, place_id: str, reviews: Optional[List[Dict]]) -> Dict:
+        """한 장소의 리뷰를 분석합니다 (캐시 적중 시 바로 반환)."""
+        reviews = reviews or []
+        digest = review_hash(reviews)
+        insight = self.cache.get((place_id, digest))
+        record_cache(insight is not None)
+        if insight is None:
+            insight = self._analyze(place_id, reviews, digest)
+            self.cache.set((place_id, digest), insight)
+        return insight
+
+    @traced("reviews.process_many")
+    def process_many(self, items: Iterable[Tuple[str, Optional[List[Dict]]]]) -> Dict[str, Dict]:
+        """
+        여러 장소를 한 번에 처리합니다. 캐시에 없는 장소만 계산하며,
+        LLM 요약을 쓰는 경우 max_workers개씩 동시에 호출합니다.
+        """
+        items = list(items)
+        if self.summarizer is None or self.max_workers <= 1:
+            return {place_id: self.process(place_id, reviews) for place_id, reviews in items}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            insights = executor.map(propagate(lambda item: self.process(*item)), items)
+            return {place_id: insight for (place_id, _), insight in zip(items, insights)}
+
+
+_pipeline: Optional[ReviewPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_review_pipeline() -> ReviewPipeline:
+    """
+    프로세스 전체에서 공유하는 파이프라인.
+    NAVI_REVIEW_SUMMARIZER=gemini이면 Gemini 요약을, 아니면 추출식 요약을 사용합니다.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            summarizer = GeminiSummarizer() if os.environ.get("NAVI_REVIEW_SUMMARIZER") == "gemini" else None
+            _pipeline = ReviewPipeline(summarizer=summarizer)
+        return _pipeline
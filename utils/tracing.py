@@ -0,0 +1,302 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from utils.resilience import CircuitOpenError, get_breaker, mark_degraded
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+# 외부 API 요청의 기본 타임아웃 (초). 지정하지 않으면 requests는 응답을 무한정 기다림
+DEFAULT_TIMEOUT = float(os.environ.get("NAVI_HTTP_TIMEOUT", 10))
+
+
+class Span:
+    """
+    하나의 작업(사용자 동작, 헬퍼 함수, 외부 API 호출) 구간입니다.
+
+    kind:
+        action  - 사용자 동작 (검색 버튼 클릭 등)
+        internal - 헬퍼 함수
+        client  - 외부 API 호출 (endpoint, status, payload_bytes, cache_hit, retries 기록)
+    """
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id",
+                 "start_time", "duration_ms", "attributes", "error", "_start")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], attributes: Dict):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_time = time.time()
+        self.duration_ms = None
+        self.attributes = dict(attributes)
+        self.error = None
+        self._start = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class JsonlExporter:
+    """종료된 span을 JSONL 파일에 한 줄씩 기록합니다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class RingBufferExporter:
+    """
+    최근 span을 고정 크기 메모리 버퍼에 보관합니다 (성능 대시보드용).
+    기록은 deque append 한 번이며, 집계는 대시보드를 열 때만 수행됩니다.
+    """
+
+    def __init__(self, maxlen: int = 5000):
+        self._buffer = deque(maxlen=maxlen)
+
+    def export(self, span: Span):
+        self._buffer.append(span)
+
+    def snapshot(self) -> List[Dict]:
+        return [s.to_dict() for s in list(self._buffer)]
+
+    def clear(self):
+        self._buffer.clear()
+
+
+class ConsoleExporter:
+    """종료된 span을 로그로 출력합니다."""
+
+    def export(self, span: Span):
+        endpoint = span.attributes.get("endpoint", "")
+        logger.info(f"[trace] {span.kind} {span.name} {endpoint} {span.duration_ms:.1f}ms")
+
+
+# 항상 켜져 있는 프로세스 내 링 버퍼 (성능 대시보드에서 사용)
+recent_spans = RingBufferExporter(maxlen=int(os.environ.get("NAVI_TRACE_BUFFER", 5000)))
+
+_exporters: List[Any] = [recent_spans]
+if os.environ.get("NAVI_TRACE_FILE"):
+    _exporters.append(JsonlExporter(os.environ["NAVI_TRACE_FILE"]))
+if os.environ.get("NAVI_TRACE_CONSOLE"):
+    _exporters.append(ConsoleExporter())
+
+
+def add_exporter(exporter):
+    """span 종료 시 export(span)가 호출될 exporter를 등록합니다."""
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter):
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """
+    현재 span의 하위 span을 엽니다.
+
+    Example:
+        with span("ui.hotel_search", kind="action"):
+            hotels = helper.search_hotels(location)
+    """
+    new_span = Span(name, kind, _current_span.get(), attributes)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except Exception as e:
+        new_span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        new_span.duration_ms = (time.perf_counter() - new_span._start) * 1000
+        _current_span.reset(token)
+        for exporter in list(_exporters):
+            try:
+                exporter.export(new_span)
+            except Exception as e:
+                logger.error(f"Error exporting span: {str(e)}")
+
+
+def traced(name: str, kind: str = "internal"):
+    """함수 호출 전체를 span으로 기록하는 데코레이터"""
+    def decorator(func: Callable):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(hit: bool):
+    """현재 span에 캐시 적중 여부를 기록합니다."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(cache_hit=hit)
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    스레드 풀에 넘기는 함수가 현재 span 아래에 기록되도록 컨텍스트를 복사합니다.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def is_upstream_failure(status_code: int) -> bool:
+    """회로 차단기에 실패로 기록할 응답 (서버 오류, 요청 한도 초과)"""
+    return status_code >= 500 or status_code == 429
+
+
+def traced_request(method: str, url: str, endpoint: str, max_retries: int = 0,
+                   **kwargs) -> requests.Response:
+    """
+    requests 호출을 client span으로 기록합니다.
+    연결 오류나 5xx 응답은 max_retries 만큼 재시도하며 재시도 횟수를 함께 기록합니다.
+
+    endpoint별 회로 차단기(utils.resilience)가 열려 있으면 요청 없이 CircuitOpenError를 내고,
+    timeout을 주지 않으면 DEFAULT_TIMEOUT초를 사용합니다.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    breaker = get_breaker(endpoint)
+    with span(endpoint, kind="client", endpoint=endpoint, method=method, retries=0) as s:
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                s.set(circuit="open")
+                mark_degraded(endpoint)
+                raise CircuitOpenError(f"{endpoint} circuit is open")
+            try:
+                response = requests.request(method, url, **kwargs)
+            except requests.RequestException:
+                breaker.record_failure()
+                if attempt >= max_retries:
+                    mark_degraded(endpoint)
+                    raise
+                attempt += 1
+                s.set(retries=attempt)
+                continue
+            except BaseException:
+                # 응답 없이 끝난 요청이 시험 요청이었다면 회로가 half_open에 묶이지 않도록
+                breaker.release()
+                raise
+            if is_upstream_failure(response.status_code):
+                breaker.record_failure()
+                if attempt < max_retries:
+                    attempt += 1
+                    s.set(retries=attempt)
+                    continue
+                mark_degraded(endpoint)
+            else:
+                breaker.record_success()
+            break
+
+        payload_bytes = response.headers.get("Content-Length")
+        if payload_bytes is None:
+            payload_bytes = len(response.content) if kwargs.get("stream") is not True else 0
+        s.set(status=response.status_code, payload_bytes=int(payload_bytes))
+        return response
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q / 100 * (len(values) - 1)))))
+    return values[index]
+
+
+def summarize(spans: List[Dict]) -> Dict[str, Dict]:
+    """
+    span dict 목록을 이름별로 집계합니다 (호출 수, p50/p95 지연, 오류, 전송량, 캐시 적중률).
+    """
+    groups: Dict[str, List[Dict]] = {}
+    for s in spans:
+        groups.setdefault(s["name"], []).append(s)
+
+    summary = {}
+    for name, items in groups.items():
+        durations = [s["duration_ms"] for s in items if s.get("duration_ms") is not None]
+        cache_flags = [s["attributes"]["cache_hit"] for s in items if "cache_hit" in s.get("attributes", {})]
+        summary[name] = {
+            "kind": items[0].get("kind"),
+            "count": len(items),
+            "p50_ms": round(percentile(durations, 50), 1),
+            "p95_ms": round(percentile(durations, 95), 1),
+            "max_ms": round(max(durations), 1) if durations else 0.0,
+            "errors": sum(
+                1 for s in items
+                if s.get("error") or s.get("attributes", {}).get("status", 200) >= 400
+            ),
+            "retries": sum(s.get("attributes", {}).get("retries", 0) for s in items),
+            "payload_bytes": sum(s.get("attributes", {}).get("payload_bytes", 0) for s in items),
+            "cache_hit_rate": round(sum(cache_flags) / len(cache_flags), 3) if cache_flags else None
+        }
+    return summary
+
+
+def load_spans(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def format_summary(summary: Dict[str, Dict]) -> str:
+    header = f"{'span':<40} {'kind':<8} {'count':>6} {'p50ms':>8} {'p95ms':>8} {'errors':>6} {'bytes':>10} {'cache':>6}"
+    lines = [header, "-" * len(header)]
+    for name, row in sorted(summary.items(), key=lambda item: -item[1]["p95_ms"]):
+        cache = "-" if row["cache_hit_rate"] is None else f"{row['cache_hit_rate']:.0%}"
+        lines.append(
+            f"{name:<40} {row['kind']:<8} {row['count']:>6} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['errors']:>6} {row['payload_bytes']:>10} {cache:>6}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # 사용법: python -m utils.tracing trace.jsonl
+    if len(sys.argv) != 2:
+        print("Usage: python -m utils.tracing <trace.jsonl>")
+        sys.exit(1)
+    print(format_summary(summarize(load_spans(sys.argv[1]))))
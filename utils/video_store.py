@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+# YouTube API와 동일한 UTC 타임스탬프 형식 (문자열 비교로 시간 순서 비교 가능)
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+STATS_FIELDS = ["view_count", "like_count", "comment_count"]
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def format_timestamp(dt: datetime) -> str:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime(TIMESTAMP_FORMAT)
+
+
+class VideoStore:
+    """
+    YouTube 영상 정보를 실행 간에 보존하는 SQLite 저장소입니다.
+
+    - 영상 메타데이터(제목, 설명 등)는 videoId 기준으로 한 번만 저장
+    - 통계(조회수 등)는 수집 시각과 함께 저장하여 오래된 것만 갱신
+    - 검색어별 마지막 성공 실행 시각을 기록하여 증분 검색에 사용
+    """
+
+    def __init__(self, db_path: str = "youtube_videos.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # 여러 프로세스가 동시에 읽고 쓸 수 있도록 WAL 모드 사용
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    description TEXT,
+                    published_at TEXT,
+                    channel_title TEXT,
+                    metadata_fetched_at TEXT NOT NULL,
+                    view_count INTEGER,
+                    like_count INTEGER,
+                    comment_count INTEGER,
+                    stats_fetched_at TEXT
+                );
+                CREATE TABLE IF NOT EXISTS query_videos (
+                    query TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    PRIMARY KEY (query, video_id)
+                );
+                CREATE TABLE IF NOT EXISTS search_runs (
+                    query TEXT PRIMARY KEY,
+                    last_run_at TEXT NOT NULL
+                );
+            """)
+
+    def add_videos(self, query: str, videos: Iterable[Dict]):
+        """
+        검색 결과 영상을 저장합니다. 이미 저장된 영상의 메타데이터는 덮어쓰지 않습니다.
+        """
+        fetched_at = format_timestamp(utc_now())
+        videos = list(videos)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO videos
+                    (video_id, title, description, published_at, channel_title, metadata_fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (v["video_id"], v["title"], v["description"],
+                     v["published_at"], v["channel_title"], fetched_at)
+                    for v in videos
+                ]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO query_videos (query, video_id) VALUES (?, ?)",
+                [(query, v["video_id"]) for v in videos]
+            )
+
+    def get_videos(self, query: str, published_after: Optional[datetime] = None) -> List[Dict]:
+        """검색어에 연결된 영상 메타데이터를 반환합니다."""
+        sql = """
+            SELECT v.video_id, v.title, v.description, v.published_at, v.channel_title
+            FROM videos v JOIN query_videos q ON q.video_id = v.video_id
+            WHERE q.query = ?
+        """
+        params = [query]
+        if published_after is not None:
+            sql += " AND v.published_at >= ?"
+            params.append(format_timestamp(published_after))
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY v.published_at DESC", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def stale_video_ids(self, video_ids: List[str], max_age: timedelta) -> List[str]:
+        """통계가 없거나 max_age보다 오래된 영상 ID 목록을 반환합니다."""
+        if not video_ids:
+            return []
+        cutoff = format_timestamp(utc_now() - max_age)
+        fresh = set()
+        with self._lock:
+            for i in range(0, len(video_ids), 500):
+                chunk = video_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT video_id FROM videos WHERE video_id IN ({placeholders}) "
+                    "AND stats_fetched_at IS NOT NULL AND stats_fetched_at >= ?",
+                    chunk + [cutoff]
+                ).fetchall()
+                fresh.update(row["video_id"] for row in rows)
+        return [video_id for video_id in video_ids if video_id not in fresh]
+
+    def update_stats(self, stats: Dict[str, Dict]):
+        """videoId → 통계 dict를 수집 시각과 함께 저장합니다."""
+        fetched_at = format_timestamp(utc_now())
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                UPDATE videos
+                SET view_count = ?, like_count = ?, comment_count = ?, stats_fetched_at = ?
+                WHERE video_id = ?
+                """,
+                [
+                    (s["view_count"], s["like_count"], s["comment_count"], fetched_at, video_id)
+                    for video_id, s in stats.items()
+                ]
+            )
+
+    def get_stats(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """저장된 통계를 videoId → 통계 dict로 반환합니다 (통계가 없는 영상은 제외)."""
+        stats = {}
+        with self._lock:
+            for i in range(0, len(video_ids), 500):
+                chunk = video_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT video_id, {', '.join(STATS_FIELDS)} FROM videos "
+                    f"WHERE video_id IN ({placeholders}) AND stats_fetched_at IS NOT NULL",
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    stats[row["video_id"]] = {field: row[field] for field in STATS_FIELDS}
+        return stats
+
+    def get_last_run(self, query: str) -> Optional[datetime]:
+        """검색어의 마지막 성공 실행 시각을 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_run_at FROM search_runs WHERE query = ?", (query,)
+            ).fetchone()
+        if row is None:
+            return None
+        return datetime.strptime(row["last_run_at"], TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+    def set_last_run(self, query: str, run_at: datetime):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_runs (query, last_run_at) VALUES (?, ?)",
+                (query, format_timestamp(run_at))
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()